@@ -5,6 +5,20 @@ from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
 from bson.objectid import ObjectId
 from dotenv import load_dotenv
+from .services.http_transport import transport
+from .services.market_cache import market_cache
+from .services.history_store import history_store
+from .services.strikes import strike_ladders
+from .services.order_queue import order_queue
+from .services.user_cache import user_cache, USER_FIELDS
+from .services.quote_stream import quote_hub
+from .services.order_history import order_history
+from .services.accounts import account_aggregator
+from .services.rate_limit import rate_limiter, single_flight
+from .services.greeks import chain_analytics
+from .services.metrics import metrics
+from .research.level_tracker import level_store
+from .autotrade.scanner import autotrade_scanner
 
 load_dotenv()
 
@@ -25,18 +39,47 @@ def create_app():
     # Load configuration from environment variables
     app.config.from_mapping(
         SECRET_KEY=os.environ.get('SECRET_KEY'),
-        MONGO_URI=os.environ.get('MONGO_URI')
+        MONGO_URI=os.environ.get('MONGO_URI'),
+        DASHBOARD_CALL_TIMEOUT=float(os.environ.get('DASHBOARD_CALL_TIMEOUT', 4.0)),
+        SCAN_FETCH_CONCURRENCY=int(os.environ.get('SCAN_FETCH_CONCURRENCY', 8)),
+        SCAN_PROCESS_WORKERS=int(os.environ.get('SCAN_PROCESS_WORKERS', 0)),
+        RESEARCH_CHART_MAX_POINTS=int(os.environ.get('RESEARCH_CHART_MAX_POINTS', 500)),
+        RESEARCH_CHART_CACHE_TTL=int(os.environ.get('RESEARCH_CHART_CACHE_TTL', 300)),
+        AUTOTRADE_PRICE_OFFSET=float(os.environ.get('AUTOTRADE_PRICE_OFFSET', 0.0)),
+        AUTOTRADE_REPRICE_STEPS=int(os.environ.get('AUTOTRADE_REPRICE_STEPS', 4)),
+        AUTOTRADE_REPRICE_BUDGET=float(os.environ.get('AUTOTRADE_REPRICE_BUDGET', 5.0))
     )
     
     # Initialize the extensions with our app instance
+    metrics.init_app(app)  # before mongo, so its command listener sees the client
     mongo.init_app(app)
     bcrypt.init_app(app)
     login_manager.init_app(app)
+    transport.init_app(app)
+    rate_limiter.init_app(app)
+    single_flight.init_app(app)
+    market_cache.init_app(app)
+    history_store.init_app(app)
+    strike_ladders.init_app(app)
+    order_queue.init_app(app)
+    user_cache.init_app(app)
+    quote_hub.init_app(app)
+    order_history.init_app(app)
+    account_aggregator.init_app(app)
+    chain_analytics.init_app(app)
+    level_store.init_app(app)
+    autotrade_scanner.init_app(app)
+    for name, component in (('market_cache', market_cache), ('user_cache', user_cache),
+                            ('rate_limiter', rate_limiter), ('single_flight', single_flight),
+                            ('quote_stream', quote_hub), ('history_store', history_store),
+                            ('chain_analytics', chain_analytics), ('level_store', level_store)):
+        metrics.register_stats(name, component.stats)
 
     @login_manager.user_loader
     def load_user(user_id):
         from .models import User
-        user_data = mongo.db.users.find_one({"_id": ObjectId(user_id)})
+        user_data = user_cache.get_or_fetch(
+            user_id, lambda: mongo.db.users.find_one({"_id": ObjectId(user_id)}, USER_FIELDS))
         return User(user_data) if user_data else None
 
     with app.app_context():
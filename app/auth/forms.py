@@ -38,4 +38,15 @@ class UpdateAccountForm(FlaskForm):
     """Form for users to update their optional account details."""
     tradier_api_key = StringField('Tradier API Key', validators=[Optional(), Length(max=100)])
     tradier_account_number = StringField('Tradier Account Number', validators=[Optional(), Length(max=100)])
-    submit = SubmitField('Update Details')
\ No newline at end of file
+    submit = SubmitField('Update Details')
+
+class LinkAccountForm(FlaskForm):
+    """Form for attaching another Tradier account to the consolidated dashboard."""
+    nickname = StringField('Nickname', validators=[Optional(), Length(max=40)])
+    api_key = StringField('Tradier API Key', validators=[DataRequired(), Length(max=100)])
+    account_number = StringField('Tradier Account Number', validators=[DataRequired(), Length(max=100)])
+    submit = SubmitField('Link Account')
+
+class UnlinkAccountForm(FlaskForm):
+    """Carries the CSRF token for removing a linked account."""
+    submit = SubmitField('Unlink')
@@ -1,5 +1,5 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, SubmitField, HiddenField, IntegerField, DecimalField
+from wtforms import StringField, SubmitField, HiddenField, IntegerField, DecimalField, BooleanField
 from wtforms.validators import DataRequired, NumberRange
 
 class AutoTradeForm(FlaskForm):
@@ -7,6 +7,15 @@ class AutoTradeForm(FlaskForm):
     symbol = StringField('Stock Symbol', validators=[DataRequired()], default='TSLA')
     submit = SubmitField('Find Spreads')
 
+class WatchlistForm(FlaskForm):
+    """Symbols the scheduler analyzes ahead of time, comma or space separated."""
+    symbols = StringField('Watchlist', validators=[DataRequired()])
+    submit = SubmitField('Save Watchlist')
+
+class ScanNowForm(FlaskForm):
+    """Carries the CSRF token for an on-demand watchlist scan."""
+    submit = SubmitField('Scan Now')
+
 class ExecuteTradeForm(FlaskForm):
     """
     Form to execute a single proposed multi-leg trade.
@@ -23,5 +32,6 @@ class ExecuteTradeForm(FlaskForm):
     # Visible fields for user adjustment
     quantity = IntegerField('Quantity', default=1, validators=[DataRequired(), NumberRange(min=1)])
     limit_price = DecimalField('Limit Price (Net)', places=2, validators=[DataRequired()])
+    reprice = BooleanField('Walk limit toward natural until filled')
     
     submit = SubmitField('Execute Trade')
\ No newline at end of file
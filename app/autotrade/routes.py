@@ -1,132 +1,79 @@
-import pandas as pd
-from flask import render_template, redirect, url_for, flash, Blueprint, request
-from flask_login import login_required
+from decimal import Decimal
+from flask import render_template, redirect, url_for, flash, Blueprint, request, current_app
+from flask_login import login_required, current_user
 
 from app.services.tradier_api import get_api_for_current_user
-from app.research.routes import find_support_resistance
+from app.services.spread_pricing import quote_credit_spreads, limit_ladder
+from app.services.order_queue import order_queue
 from app.trade.utils import generate_occ_symbol
-from .forms import AutoTradeForm, ExecuteTradeForm
+from .forms import AutoTradeForm, ExecuteTradeForm, ScanNowForm, WatchlistForm
+from .scanner import analyze_symbol, spread_symbols, autotrade_scanner
 
 autotrade = Blueprint('autotrade', __name__)
 
-def round_to_nearest_five(price):
-    """Rounds a given price to the nearest number ending in 0 or 5."""
-    return round(price / 5) * 5
-
-def execute_put_spread(api, trade_details):
-    """Places a put credit spread order."""
-    short_put_symbol = generate_occ_symbol(trade_details['symbol'], trade_details['expiration'], 'put', trade_details['put_spread']['sell_strike'])
-    long_put_symbol = generate_occ_symbol(trade_details['symbol'], trade_details['expiration'], 'put', trade_details['put_spread']['buy_strike'])
-    
-    payload = {
-        'class': 'multileg', 'symbol': trade_details['symbol'].upper(), 'type': 'credit', 'duration': 'day',
-        'price': '0.10', # Defaulting to a safe, low credit to ensure execution for auto-trading
-        'option_symbol[0]': short_put_symbol, 'side[0]': 'sell_to_open', 'quantity[0]': '1',
-        'option_symbol[1]': long_put_symbol, 'side[1]': 'buy_to_open', 'quantity[1]': '1'
+def _pricing_settings():
+    config = current_app.config
+    return (config.get('AUTOTRADE_PRICE_OFFSET', 0.0), config.get('AUTOTRADE_REPRICE_STEPS', 4),
+            config.get('AUTOTRADE_REPRICE_BUDGET', 5.0))
+
+def _prefill(exec_form, trades, option_type):
+    """Pre-populates an ExecuteTradeForm from a proposed spread."""
+    spread = trades[f'{option_type}_spread']
+    exec_form.underlying_symbol.data = trades['symbol']
+    exec_form.expiration_date.data = trades['expiration']
+    exec_form.spread_type.data = option_type
+    exec_form.credit_debit.data = 'credit'
+    exec_form.strike_short.data = spread['sell_strike']
+    exec_form.strike_long.data = spread['buy_strike']
+    if 'limit' in spread:
+        exec_form.limit_price.data = Decimal(f"{spread['limit']:.2f}")
+
+def _details_from_form(exec_form):
+    """Rebuilds trade details from a submitted ExecuteTradeForm."""
+    option_type = exec_form.spread_type.data
+    return {
+        'symbol': exec_form.underlying_symbol.data.upper(),
+        'expiration': exec_form.expiration_date.data,
+        f'{option_type}_spread': {'sell_strike': exec_form.strike_short.data, 'buy_strike': exec_form.strike_long.data}
     }
-    response = api.place_order(payload)
-    if response and response.get('order'):
-        flash('Automatic Put Credit Spread order submitted successfully!', 'success')
-    else:
-        flash(f"Automatic Put Credit Spread order failed: {response.get('errors', 'Unknown error')}", 'danger')
-
-def execute_call_spread(api, trade_details):
-    """Places a call credit spread order."""
-    short_call_symbol = generate_occ_symbol(trade_details['symbol'], trade_details['expiration'], 'call', trade_details['call_spread']['sell_strike'])
-    long_call_symbol = generate_occ_symbol(trade_details['symbol'], trade_details['expiration'], 'call', trade_details['call_spread']['buy_strike'])
 
+def _execute_credit_spread(api, trade_details, option_type, quantity=1, start_price=None):
+    """
+    Prices a credit spread off live quotes for both legs and queues it, to be
+    worked from mid (or start_price) toward the natural credit within the
+    reprice budget.
+
+    Returns:
+        str: The order job id, or None when the legs have no usable quotes.
+    """
+    label = f"{option_type.capitalize()} Credit Spread"
+    short_symbol, long_symbol = spread_symbols(trade_details, option_type)
+    quote = quote_credit_spreads(api, {option_type: (short_symbol, long_symbol)})[option_type]
+    if quote is None:
+        flash(f"Automatic {label} order not sent: no live bid/ask for its legs.", 'danger')
+        return None
+
+    offset, steps, budget = _pricing_settings()
     payload = {
         'class': 'multileg', 'symbol': trade_details['symbol'].upper(), 'type': 'credit', 'duration': 'day',
-        'price': '0.10', # Defaulting to a safe, low credit
-        'option_symbol[0]': short_call_symbol, 'side[0]': 'sell_to_open', 'quantity[0]': '1',
-        'option_symbol[1]': long_call_symbol, 'side[1]': 'buy_to_open', 'quantity[1]': '1'
+        'option_symbol[0]': short_symbol, 'side[0]': 'sell_to_open', 'quantity[0]': str(quantity),
+        'option_symbol[1]': long_symbol, 'side[1]': 'buy_to_open', 'quantity[1]': str(quantity)
     }
-    response = api.place_order(payload)
-    if response and response.get('order'):
-        flash('Automatic Call Credit Spread order submitted successfully!', 'success')
-    else:
-        flash(f"Automatic Call Credit Spread order failed: {response.get('errors', 'Unknown error')}", 'danger')
-
-
-@autotrade.route('/autotrade', methods=['GET', 'POST'])
-@login_required
-def autotrade_page():
-    form = AutoTradeForm()
-    put_exec_form = ExecuteTradeForm(prefix='put')
-    call_exec_form = ExecuteTradeForm(prefix='call')
-    proposed_trades = {}
+    prices = limit_ladder(quote, offset, steps, start_price)
+    job_id = order_queue.submit(api, payload, current_user.id, f"Automatic {label}", ladder=prices, ladder_budget=budget)
+    flash(f"Automatic {label} order queued at ${prices[0]:.2f} credit (mid ${quote['mid']:.2f}, "
+          f"natural ${quote['natural']:.2f}); it steps toward ${prices[-1]:.2f} if unfilled. "
+          f"Follow it under Recent Orders on the Trade page.", 'success')
+    return job_id
 
-    if form.validate_on_submit():
-        api = get_api_for_current_user()
-        if not api:
-            flash('Cannot perform analysis. Please check your API credentials.', 'danger')
-            return redirect(url_for('autotrade.autotrade_page'))
-        try:
-            symbol = form.symbol.data.upper()
-            quote_data = api.get_quotes([symbol])
-            current_price = quote_data['quotes']['quote']['last']
-            history_data = api.get_historical_prices(symbol)
-            day_data = history_data['history']['day']
-            stock_df = pd.DataFrame(day_data)
-            stock_df.rename(columns={'close': 'Close'}, inplace=True)
-            support, resistance = find_support_resistance(stock_df)
-            exp_data = api.get_option_expirations(symbol)
-            expirations = exp_data['expirations']['date']
-            
-            trade_details = {'symbol': symbol}
-
-            spread_width = 1 if current_price <= 101 else 5
-
-            valid_supports = [s for s in reversed(support) if s < current_price]
-            if valid_supports:
-                sell_put_strike = round_to_nearest_five(valid_supports[0])
-                buy_put_strike = sell_put_strike - spread_width # Use dynamic spread width
-                trade_details['put_spread'] = {'sell_strike': sell_put_strike, 'buy_strike': buy_put_strike}
-            
-            valid_resistances = [r for r in resistance if r > current_price]
-            if valid_resistances:
-                sell_call_strike = round_to_nearest_five(valid_resistances[0])
-                buy_call_strike = sell_call_strike + spread_width # Use dynamic spread width
-                trade_details['call_spread'] = {'sell_strike': sell_call_strike, 'buy_strike': buy_call_strike}
-
-            if len(expirations) > 3:
-                trade_details['expiration'] = expirations[3]
-            elif expirations:
-                trade_details['expiration'] = expirations[-1]
-            
-            trade_details['current_price'] = current_price
+def execute_put_spread(api, trade_details, quantity=1, start_price=None):
+    """Places a put credit spread order priced from live quotes."""
+    return _execute_credit_spread(api, trade_details, 'put', quantity, start_price)
 
-            if trade_details.get('expiration'):
-                if trade_details.get('put_spread'):
-                    execute_put_spread(api, trade_details)
-                if trade_details.get('call_spread'):
-                    execute_call_spread(api, trade_details)
+def execute_call_spread(api, trade_details, quantity=1, start_price=None):
+    """Places a call credit spread order priced from live quotes."""
+    return _execute_credit_spread(api, trade_details, 'call', quantity, start_price)
 
-            flash('Analysis and automatic trade execution complete.', 'success')
-            proposed_trades = trade_details
-
-        except Exception as e:
-            flash(f"An error occurred during analysis: {e}", 'danger')
-
-    return render_template('autotrade/autotrade.html', 
-                           title='AutoTrade', 
-                           form=form, 
-                           trades=proposed_trades,
-                           put_exec_form=put_exec_form,
-                           call_exec_form=call_exec_form)
-from flask import render_template, redirect, url_for, flash, Blueprint, request
-from flask_login import login_required
-
-from app.services.tradier_api import get_api_for_current_user
-from app.research.routes import find_support_resistance
-from app.trade.utils import generate_occ_symbol
-from .forms import AutoTradeForm, ExecuteTradeForm
-
-autotrade = Blueprint('autotrade', __name__)
-
-def round_to_nearest_five(price):
-    """Rounds a given price to the nearest number ending in 0 or 5."""
-    return round(price / 5) * 5
 
 @autotrade.route('/autotrade', methods=['GET', 'POST'])
 @login_required
@@ -144,6 +91,11 @@ def autotrade_page():
                 flash('Cannot place order. Please check your API credentials.', 'danger')
                 return redirect(url_for('autotrade.autotrade_page'))
 
+            if put_exec_form.reprice.data:
+                execute_put_spread(api, _details_from_form(put_exec_form), quantity=put_exec_form.quantity.data,
+                                  start_price=float(put_exec_form.limit_price.data))
+                return redirect(url_for('autotrade.autotrade_page'))
+
             short_put_symbol = generate_occ_symbol(put_exec_form.underlying_symbol.data, put_exec_form.expiration_date.data, 'put', put_exec_form.strike_short.data)
             long_put_symbol = generate_occ_symbol(put_exec_form.underlying_symbol.data, put_exec_form.expiration_date.data, 'put', put_exec_form.strike_long.data)
             
@@ -170,6 +122,11 @@ def autotrade_page():
                 flash('Cannot place order. Please check your API credentials.', 'danger')
                 return redirect(url_for('autotrade.autotrade_page'))
 
+            if call_exec_form.reprice.data:
+                execute_call_spread(api, _details_from_form(call_exec_form), quantity=call_exec_form.quantity.data,
+                                  start_price=float(call_exec_form.limit_price.data))
+                return redirect(url_for('autotrade.autotrade_page'))
+
             short_call_symbol = generate_occ_symbol(call_exec_form.underlying_symbol.data, call_exec_form.expiration_date.data, 'call', call_exec_form.strike_short.data)
             long_call_symbol = generate_occ_symbol(call_exec_form.underlying_symbol.data, call_exec_form.expiration_date.data, 'call', call_exec_form.strike_long.data)
 
@@ -190,71 +147,71 @@ def autotrade_page():
     
     # --- ANALYSIS LOGIC ---
     if form.validate_on_submit():
-        api = get_api_for_current_user()
-        if not api:
-            flash('Cannot perform analysis. Please check your API credentials.', 'danger')
-            return redirect(url_for('autotrade.autotrade_page'))
-        try:
-            symbol = form.symbol.data.upper()
-            quote_data = api.get_quotes([symbol])
-            current_price = quote_data['quotes']['quote']['last']
-            history_data = api.get_historical_prices(symbol)
-            day_data = history_data['history']['day']
-            stock_df = pd.DataFrame(day_data)
-            stock_df.rename(columns={'close': 'Close'}, inplace=True)
-            support, resistance = find_support_resistance(stock_df)
-            exp_data = api.get_option_expirations(symbol)
-            expirations = exp_data['expirations']['date']
-            
-            proposed_trades = {'symbol': symbol}
-
-            spread_width = 1 if current_price <= 101 else 5
-
-            valid_supports = [s for s in reversed(support) if s < current_price]
-            if valid_supports:
-                sell_put_strike = round_to_nearest_five(valid_supports[0])
-                buy_put_strike = sell_put_strike - spread_width
-                proposed_trades['put_spread'] = {'sell_strike': sell_put_strike, 'buy_strike': buy_put_strike}
-            
-            valid_resistances = [r for r in resistance if r > current_price]
-            if valid_resistances:
-                sell_call_strike = round_to_nearest_five(valid_resistances[0])
-                buy_call_strike = sell_call_strike + spread_width
-                proposed_trades['call_spread'] = {'sell_strike': sell_call_strike, 'buy_strike': buy_call_strike}
-
-            if len(expirations) > 3:
-                proposed_trades['expiration'] = expirations[3]
-            elif expirations:
-                proposed_trades['expiration'] = expirations[-1]
-            
-            proposed_trades['current_price'] = current_price
-
-            # Pre-populate execution form data
-            if proposed_trades.get('expiration'):
-                # Populate Put Form
-                if proposed_trades.get('put_spread'):
-                    put_exec_form.underlying_symbol.data = symbol
-                    put_exec_form.expiration_date.data = proposed_trades['expiration']
-                    put_exec_form.spread_type.data = 'put'
-                    put_exec_form.credit_debit.data = 'credit'
-                    put_exec_form.strike_short.data = proposed_trades['put_spread']['sell_strike']
-                    put_exec_form.strike_long.data = proposed_trades['put_spread']['buy_strike']
-                # Populate Call Form
-                if proposed_trades.get('call_spread'):
-                    call_exec_form.underlying_symbol.data = symbol
-                    call_exec_form.expiration_date.data = proposed_trades['expiration']
-                    call_exec_form.spread_type.data = 'call'
-                    call_exec_form.credit_debit.data = 'credit'
-                    call_exec_form.strike_short.data = proposed_trades['call_spread']['sell_strike']
-                    call_exec_form.strike_long.data = proposed_trades['call_spread']['buy_strike']
+        symbol = form.symbol.data.upper()
+        stored = autotrade_scanner.proposal(current_user.id, symbol)
+        if stored:
+            proposed_trades = stored['trades']
+            flash(f"Showing the proposal from the {stored['scanned_at']:%H:%M} UTC scan.", 'info')
+        else:
+            api = get_api_for_current_user()
+            if not api:
+                flash('Cannot perform analysis. Please check your API credentials.', 'danger')
+                return redirect(url_for('autotrade.autotrade_page'))
+            try:
+                proposed_trades = analyze_symbol(api, symbol, _pricing_settings()[0])
+                autotrade_scanner.save_proposal([current_user.id], symbol, trades=proposed_trades)
+                flash('Analysis complete. Review and execute the proposed trades below.', 'info')
+            except Exception as e:
+                flash(f"An error occurred during analysis: {e}", 'danger')
+    elif request.method == 'GET' and request.args.get('symbol'):
+        stored = autotrade_scanner.proposal(current_user.id, request.args['symbol'], max_age=float('inf'))
+        if stored:
+            proposed_trades = stored['trades']
+            form.symbol.data = proposed_trades['symbol']
+        else:
+            flash(f"No stored proposal for {request.args['symbol'].upper()}.", 'warning')
 
-            flash('Analysis complete. Review and execute the proposed trades below.', 'info')
-        except Exception as e:
-            flash(f"An error occurred during analysis: {e}", 'danger')
+    # Pre-populate execution form data
+    if proposed_trades.get('expiration'):
+        for exec_form, option_type in ((put_exec_form, 'put'), (call_exec_form, 'call')):
+            if proposed_trades.get(f'{option_type}_spread'):
+                _prefill(exec_form, proposed_trades, option_type)
 
+    watchlist_form = WatchlistForm(prefix='watchlist')
+    watchlist_form.symbols.data = ', '.join(autotrade_scanner.watchlist(current_user.id))
     return render_template('autotrade/autotrade.html', 
                            title='AutoTrade', 
                            form=form, 
                            trades=proposed_trades,
                            put_exec_form=put_exec_form,
-                           call_exec_form=call_exec_form)
\ No newline at end of file
+                           call_exec_form=call_exec_form,
+                           watchlist_form=watchlist_form,
+                           scan_form=ScanNowForm(prefix='scan'),
+                           proposals=autotrade_scanner.latest(current_user.id),
+                           scan_times=autotrade_scanner.settings['AUTOTRADE_SCAN_TIMES'])
+
+
+@autotrade.route('/autotrade/watchlist', methods=['POST'])
+@login_required
+def save_watchlist():
+    form = WatchlistForm(prefix='watchlist')
+    if form.validate_on_submit():
+        symbols = autotrade_scanner.save_watchlist(current_user.id, form.symbols.data.replace(',', ' ').split())
+        flash(f"Watchlist saved: {', '.join(symbols) or 'empty'}.", 'success')
+    else:
+        flash(f"Watchlist was invalid. Errors: {form.errors}", 'danger')
+    return redirect(url_for('autotrade.autotrade_page'))
+
+
+@autotrade.route('/autotrade/scan', methods=['POST'])
+@login_required
+def scan_now():
+    if not ScanNowForm(prefix='scan').validate_on_submit():
+        flash('The scan request expired. Please try again.', 'danger')
+    elif not autotrade_scanner.watchlist(current_user.id):
+        flash('Save a watchlist first.', 'warning')
+    elif autotrade_scanner.run_in_background(current_user.id) is None:
+        flash('A scan of your watchlist is already running. Refresh in a few seconds to see the new proposals.', 'info')
+    else:
+        flash('Scan started. Refresh in a few seconds to see the new proposals.', 'info')
+    return redirect(url_for('autotrade.autotrade_page'))
@@ -0,0 +1,371 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone, time as time_of_day
+
+import click
+import numpy as np
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from flask.cli import AppGroup
+from pymongo.errors import DuplicateKeyError
+
+from app.research.level_tracker import level_store
+from app.services.greeks import MARKET_CLOSE, MARKET_TZ, chain_analytics
+from app.services.history_store import history_store
+from app.services.option_chain import load_option_chain
+from app.services.spread_pricing import quote_credit_spreads, limit_ladder
+from app.services.tradier_api import TradierAPI
+from app.trade.utils import generate_occ_symbol
+from .strategy import pick_expiration, propose_spreads
+
+MARKET_OPEN = time_of_day(9, 30)
+
+
+def spread_symbols(trade_details, option_type):
+    """OCC symbols of the (short, long) legs of a proposed spread."""
+    spread = trade_details[f'{option_type}_spread']
+    return (generate_occ_symbol(trade_details['symbol'], trade_details['expiration'], option_type, spread['sell_strike']),
+            generate_occ_symbol(trade_details['symbol'], trade_details['expiration'], option_type, spread['buy_strike']))
+
+
+def analyze_symbol(api, symbol, price_offset=0.0):
+    """
+    Runs the AutoTrade analysis for one symbol: live price, support/resistance
+    from the symbol's level tracker, the target expiration's chain with computed greeks,
+    and both proposed spreads marked to market with one batched quote call.
+
+    Returns:
+        dict: 'symbol', 'current_price', optional 'expiration', and optional
+              'put_spread'/'call_spread' with strikes, the short leg's 'delta',
+              'iv' and 'prob_otm', quotes and a 'limit'.
+    """
+    symbol = symbol.upper()
+    quote_data = api.get_quotes([symbol])
+    current_price = quote_data['quotes']['quote']['last']
+    support, resistance = level_store.levels(api, symbol)
+    exp_data = api.get_option_expirations(symbol)
+    expirations = exp_data['expirations']['date']
+
+    proposed_trades = {'symbol': symbol}
+
+    expiration = pick_expiration(expirations)
+    # Snap proposed strikes to the ones actually listed for the target expiration.
+    chain = load_option_chain(api, symbol, expiration) if expiration else None
+    if chain is not None:
+        chain_analytics.apply(chain, current_price, expiration)
+    proposed_trades.update(propose_spreads(current_price, support, resistance, chain))
+    if chain is not None:
+        for option_type in ('put', 'call'):
+            spread = proposed_trades.get(f'{option_type}_spread')
+            short_leg = chain.find(option_type, spread['sell_strike']) if spread else None
+            if short_leg and not np.isnan([short_leg['delta'], short_leg['mid_iv'], short_leg['prob_otm']]).any():
+                spread.update(delta=round(short_leg['delta'], 3), iv=round(short_leg['mid_iv'], 4),
+                              prob_otm=round(short_leg['prob_otm'], 3))
+
+    if expiration:
+        proposed_trades['expiration'] = expiration
+
+    proposed_trades['current_price'] = current_price
+
+    # Mark both proposals to market with one batched quote call for all four legs
+    spreads = {t: spread_symbols(proposed_trades, t) for t in ('put', 'call') if proposed_trades.get(f'{t}_spread')}
+    if expiration and spreads:
+        for option_type, quote in quote_credit_spreads(api, spreads).items():
+            if quote:
+                proposed_trades[f'{option_type}_spread'].update(quote, limit=limit_ladder(quote, price_offset, steps=1)[0])
+    return proposed_trades
+
+
+def parse_scan_times(spec):
+    """
+    Parses AUTOTRADE_SCAN_TIMES, e.g. 'open+15, 12:00, close-30', into sorted
+    exchange-local times of day. Entries outside market hours are dropped.
+    """
+    times = set()
+    for part in (spec or '').replace(' ', '').split(','):
+        if not part:
+            continue
+        for anchor, base in (('open', MARKET_OPEN), ('close', MARKET_CLOSE)):
+            if part.startswith(anchor):
+                minutes = int(part[len(anchor):] or 0)
+                moment = datetime.combine(datetime(2000, 1, 3), base) + timedelta(minutes=minutes)
+                break
+        else:
+            hours, minutes = part.split(':')
+            moment = datetime.combine(datetime(2000, 1, 3), time_of_day(int(hours), int(minutes)))
+        if MARKET_OPEN <= moment.time() <= MARKET_CLOSE:
+            times.add(moment.time())
+    return sorted(times)
+
+
+def next_scan(now, scan_times):
+    """The first weekday scan time after `now` (an aware datetime), in MARKET_TZ."""
+    local = now.astimezone(MARKET_TZ)
+    for days in range(8):
+        day = (local + timedelta(days=days)).date()
+        if day.weekday() >= 5:
+            continue
+        for moment in scan_times:
+            candidate = datetime.combine(day, moment, tzinfo=MARKET_TZ)
+            if candidate > local:
+                return candidate
+    return None
+
+
+class AutotradeScanner:
+    """
+    Runs the AutoTrade analysis for every saved watchlist on a schedule.
+
+    At each AUTOTRADE_SCAN_TIMES slot on weekdays, the first worker to claim
+    the slot in 'autotrade_runs' analyzes each watched symbol once on a pool
+    of AUTOTRADE_SCAN_CONCURRENCY threads, no matter how many users watch it,
+    and writes the proposal for every watcher into 'autotrade_proposals'.
+    The AutoTrade page reads those documents instead of computing on submit.
+    `flask autotrade scan` runs the same pass from cron or a one-off job.
+    "Scan Now" runs one user's watchlist on a small shared pool of
+    AUTOTRADE_MANUAL_SCAN_WORKERS threads, one scan per user at a time.
+    """
+    DEFAULTS = {
+        'AUTOTRADE_SCHEDULER_ENABLED': True,
+        'AUTOTRADE_SCAN_TIMES': 'open+15',
+        'AUTOTRADE_SCAN_CONCURRENCY': 8,
+        'AUTOTRADE_PROPOSAL_MAX_AGE': 900,
+        'AUTOTRADE_MAX_WATCHLIST': 50,
+        'AUTOTRADE_MANUAL_SCAN_WORKERS': 2,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._pid = None
+        self._lock = threading.Lock()
+        self._proposals = None
+        self._executor = None
+        self._manual = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            value = os.environ.get(key, default)
+            if isinstance(default, bool) and isinstance(value, str):
+                value = value.lower() in ('1', 'true', 'yes')
+            app.config.setdefault(key, type(default)(value))
+            self._settings[key] = app.config[key]
+        self._settings['AUTOTRADE_PRICE_OFFSET'] = app.config.get('AUTOTRADE_PRICE_OFFSET', 0.0)
+        self._executor = None
+        app.cli.add_command(autotrade_cli)
+        if self._settings['AUTOTRADE_SCHEDULER_ENABLED']:
+            app.before_request(self._ensure_running)
+
+    @property
+    def settings(self):
+        return self._settings
+
+    @property
+    def db(self):
+        from app import mongo
+        return mongo.db
+
+    @property
+    def proposals(self):
+        if self._proposals is None:
+            self._proposals = self.db.autotrade_proposals
+            self._proposals.create_index([('user_id', 1), ('symbol', 1)], unique=True)
+        return self._proposals
+
+    # --- Watchlists and proposals ---
+
+    def watchlist(self, user_id):
+        doc = self.db.autotrade_watchlists.find_one({'_id': user_id})
+        return doc['symbols'] if doc else []
+
+    def save_watchlist(self, user_id, symbols):
+        symbols = list(dict.fromkeys(s.upper() for s in symbols if s))[:self._settings['AUTOTRADE_MAX_WATCHLIST']]
+        self.db.autotrade_watchlists.update_one(
+            {'_id': user_id}, {'$set': {'symbols': symbols, 'updated_at': datetime.now(timezone.utc)}}, upsert=True)
+        return symbols
+
+    def latest(self, user_id):
+        """The user's stored proposals, one per symbol, alphabetically."""
+        return list(self.proposals.find({'user_id': user_id}).sort('symbol', 1))
+
+    def proposal(self, user_id, symbol, max_age=None):
+        """
+        The stored proposal for one symbol, or None if there is none or it is
+        older than max_age seconds (default AUTOTRADE_PROPOSAL_MAX_AGE).
+        """
+        doc = self.proposals.find_one({'user_id': user_id, 'symbol': symbol.upper(), 'status': 'ok'})
+        max_age = self._settings['AUTOTRADE_PROPOSAL_MAX_AGE'] if max_age is None else max_age
+        if not doc or (datetime.now(timezone.utc) - doc['scanned_at'].replace(tzinfo=timezone.utc)).total_seconds() > max_age:
+            return None
+        return doc
+
+    def save_proposal(self, user_ids, symbol, trades=None, error=None, run_id=None):
+        now = datetime.now(timezone.utc)
+        for user_id in user_ids:
+            self.proposals.update_one({'user_id': user_id, 'symbol': symbol}, {'$set': {
+                'trades': trades, 'status': 'error' if error else 'ok', 'error': error,
+                'scanned_at': now, 'run_id': run_id
+            }}, upsert=True)
+
+    # --- Scanning ---
+
+    def run(self, run_id, user_id=None):
+        """
+        Analyzes every watched symbol (or only user_id's) and stores the proposals.
+
+        Returns:
+            dict: 'symbols' analyzed, 'proposals' written, 'errors' and 'elapsed_ms'.
+        """
+        started = time.monotonic()
+        query = {'_id': user_id} if user_id else {}
+        watchers, credentials = {}, {}
+        for watchlist in self.db.autotrade_watchlists.find(query):
+            user = self.db.users.find_one({'_id': _object_id(watchlist['_id'])},
+                                          {'tradier_api_key': 1, 'tradier_account_number': 1})
+            if not user or not user.get('tradier_api_key'):
+                continue
+            for symbol in watchlist.get('symbols', []):
+                watchers.setdefault(symbol, []).append(watchlist['_id'])
+                # Market data is the same for every account: any watcher's key will do.
+                credentials.setdefault(symbol, (user['tradier_api_key'], user.get('tradier_account_number')))
+
+        def scan(symbol):
+            api = TradierAPI(*credentials[symbol])
+            try:
+                trades = analyze_symbol(api, symbol, self._settings['AUTOTRADE_PRICE_OFFSET'])
+                self.save_proposal(watchers[symbol], symbol, trades=trades, run_id=run_id)
+                return True
+            except Exception as e:
+                print(f"AutoTrade scan failed for {symbol}: {e}")
+                self.save_proposal(watchers[symbol], symbol, error=str(e), run_id=run_id)
+                return False
+
+        with ThreadPoolExecutor(max_workers=max(self._settings['AUTOTRADE_SCAN_CONCURRENCY'], 1),
+                                thread_name_prefix='autotrade-scan') as pool:
+            results = list(pool.map(scan, watchers))
+        summary = {
+            'symbols': len(watchers),
+            'proposals': sum(len(watchers[s]) for s, ok in zip(watchers, results) if ok),
+            'errors': results.count(False),
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+        self.db.autotrade_runs.update_one({'_id': run_id}, {'$set': dict(summary, finished_at=datetime.now(timezone.utc))},
+                                          upsert=True)
+        return summary
+
+    def _pool(self):
+        # Created on first use so a preloading master never forks with live workers.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max(self._settings['AUTOTRADE_MANUAL_SCAN_WORKERS'], 1),
+                                                thread_name_prefix='autotrade-scan-now')
+        return self._executor
+
+    def run_in_background(self, user_id):
+        """
+        Starts a scan of one user's watchlist without waiting for it.
+
+        Returns:
+            str: The run id, or None if a scan for this user is already running.
+        """
+        with self._lock:
+            future = self._manual.get(user_id)
+            if future is not None and not future.done():
+                return None
+            run_id = f"manual:{user_id}:{datetime.now(timezone.utc).isoformat()}"
+            self._manual[user_id] = self._pool().submit(self._run_manual, run_id, user_id)
+            return run_id
+
+    def _run_manual(self, run_id, user_id):
+        try:
+            return self.run(run_id, user_id)
+        except Exception as e:
+            print(f"AutoTrade scan {run_id} failed: {e}")
+
+    def _claim(self, run_id):
+        """True for the one worker (across all processes) that gets to run this slot."""
+        try:
+            self.db.autotrade_runs.insert_one({'_id': run_id, 'started_at': datetime.now(timezone.utc),
+                                               'pid': os.getpid()})
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def _ensure_running(self):
+        # Threads do not survive a fork, so each worker starts its own; _claim keeps runs single.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._loop, name='autotrade-scheduler', daemon=True).start()
+
+    def _loop(self):
+        scan_times = parse_scan_times(self._settings['AUTOTRADE_SCAN_TIMES'])
+        if not scan_times:
+            return
+        while True:
+            slot = next_scan(datetime.now(timezone.utc), scan_times)
+            time.sleep(max((slot - datetime.now(timezone.utc)).total_seconds(), 0))
+            if datetime.now(timezone.utc) < slot:
+                continue
+            run_id = slot.strftime('%Y-%m-%dT%H:%M')
+            try:
+                if self._claim(run_id):
+                    summary = self.run(run_id)
+                    print(f"AutoTrade scan {run_id}: {summary}")
+            except Exception as e:
+                print(f"AutoTrade scan {run_id} failed: {e}")
+
+
+def _object_id(user_id):
+    try:
+        return ObjectId(user_id)
+    except (InvalidId, TypeError):
+        return user_id
+
+
+autotrade_scanner = AutotradeScanner()
+autotrade_cli = AppGroup('autotrade', help='Run AutoTrade scans outside the web workers.')
+
+
+@autotrade_cli.command('scan')
+@click.option('--user', 'user_id', default=None, help='Only scan this user id\'s watchlist.')
+def scan(user_id):
+    """Analyzes every saved watchlist now and stores the proposals."""
+    run_id = f"cli:{datetime.now(timezone.utc).isoformat()}"
+    summary = autotrade_scanner.run(run_id, user_id)
+    click.echo(f"Scanned {summary['symbols']} symbols in {summary['elapsed_ms']} ms: "
+               f"{summary['proposals']} proposals, {summary['errors']} errors")
+
+
+@autotrade_cli.command('backtest')
+@click.argument('symbols', nargs=-1, required=True)
+@click.option('--start', default=None, help='First entry date (YYYY-MM-DD).')
+@click.option('--end', default=None, help='Last entry date (YYYY-MM-DD).')
+@click.option('--every', default=5, show_default=True, help='Bars between entries.')
+@click.option('--workers', default=1, type=int, help='Processes to split the symbols across (default: run in this process).')
+@click.option('--output', default=None, type=click.Path(), help='Write every trade and summary as JSON.')
+def backtest(symbols, start, end, every, workers, output):
+    """Replays the strategy over the daily bars stored for SYMBOLS (see `flask history backfill`)."""
+    import json
+    from .backtest import run_backtest
+
+    series = {}
+    for symbol in dict.fromkeys(s.upper() for s in symbols):
+        bars, _ = history_store.load(symbol)
+        if len(bars):
+            series[symbol] = (np.array(bars['date']), np.array(bars['close']))
+        else:
+            click.echo(f"{symbol}: no stored bars, skipped")
+    result = run_backtest(series, {'start': start, 'end': end, 'every': every}, workers)
+    for item in result['symbols'] + [{'symbol': 'ALL', 'summary': result['summary']}]:
+        s = item['summary']
+        click.echo(f"{item['symbol']:>6}: {s['trades']} trades, win rate {s['win_rate']}, "
+                   f"P&L ${s['total_pnl']:.2f}, max drawdown ${s['max_drawdown']:.2f}")
+    if output:
+        with open(output, 'w') as f:
+            json.dump(result, f, indent=2)
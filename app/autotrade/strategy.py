@@ -0,0 +1,86 @@
+"""
+Strike and expiration rules for the support/resistance credit-spread strategy.
+
+Kept free of Flask so the same rules drive the AutoTrade page, scheduled
+scans and offline backtests.
+"""
+
+
+def round_to_nearest_five(price):
+    """Rounds a given price to the nearest number ending in 0 or 5."""
+    return round(price / 5) * 5
+
+
+def spread_width(current_price):
+    """$1 wide spreads up to $101, $5 wide above."""
+    return 1 if current_price <= 101 else 5
+
+
+def pick_expiration(expirations):
+    """The fourth listed expiration, or the furthest one when fewer are listed."""
+    if not expirations:
+        return None
+    expirations = expirations if isinstance(expirations, list) else [expirations]
+    return expirations[3] if len(expirations) > 3 else expirations[-1]
+
+
+def _clean(strike):
+    strike = float(strike)
+    return int(strike) if strike.is_integer() else strike
+
+
+def _put_strikes(target, width, chain):
+    if chain is None:
+        return target, target - width
+    sell = chain.nearest_strike(target, 'put')
+    if sell is None:
+        # No puts listed: there is nothing to sell on this side.
+        return None, None
+    buy = chain.nearest_strike(sell - width, 'put')
+    if buy is None or buy >= sell:
+        buy = chain.strike_below(sell, 'put')
+    return sell, buy
+
+
+def _call_strikes(target, width, chain):
+    if chain is None:
+        return target, target + width
+    sell = chain.nearest_strike(target, 'call')
+    if sell is None:
+        # No calls listed: there is nothing to sell on this side.
+        return None, None
+    buy = chain.nearest_strike(sell + width, 'call')
+    if buy is None or buy <= sell:
+        buy = chain.strike_above(sell, 'call')
+    return sell, buy
+
+
+def propose_spreads(current_price, support, resistance, chain=None):
+    """
+    Proposes a put credit spread below the nearest support and a call credit
+    spread above the nearest resistance.
+
+    Short strikes are the level rounded to the nearest 5; long strikes sit one
+    spread width further out. With an OptionChain, both legs are snapped to
+    listed strikes so the proposal can actually be traded.
+
+    Returns:
+        dict: Optional 'put_spread' and 'call_spread', each with
+              'sell_strike' and 'buy_strike'.
+    """
+    proposal = {}
+    width = spread_width(current_price)
+
+    valid_supports = [s for s in reversed(support) if s < current_price]
+    if valid_supports:
+        sell, buy = _put_strikes(round_to_nearest_five(valid_supports[0]), width, chain)
+        if sell is not None and buy is not None:
+            proposal['put_spread'] = {'sell_strike': _clean(sell), 'buy_strike': _clean(buy)}
+
+    valid_resistances = [r for r in resistance if r > current_price]
+    if valid_resistances:
+        sell, buy = _call_strikes(round_to_nearest_five(valid_resistances[0]), width, chain)
+        if sell is not None and buy is not None:
+            proposal['call_spread'] = {'sell_strike': _clean(sell), 'buy_strike': _clean(buy)}
+
+    return proposal
@@ -0,0 +1,176 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from flask import current_app
+
+from app.services.accounts import account_aggregator
+from app.services.metrics import traced
+from app.services.tradier_api import TradierAPI
+
+# Shared by every request in the worker; threads are only started on first submit,
+# so a preloading gunicorn master never forks with live fetch threads.
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='dashboard-fetch')
+
+DEFAULT_CALL_TIMEOUT = 4.0
+TIMED_OUT = object()
+
+
+def extract_positions(positions_data):
+    """Normalizes Tradier's positions payload (null, single dict or list) to a list."""
+    if not positions_data or not positions_data.get('positions') or positions_data['positions'] == 'null':
+        return []
+    pos_list = positions_data['positions']['position']
+    return pos_list if isinstance(pos_list, list) else [pos_list]
+
+
+def extract_quotes_map(quotes_data):
+    """Maps symbol -> last price from a /markets/quotes payload."""
+    if not quotes_data or not quotes_data.get('quotes'):
+        return {}
+    quotes_list = quotes_data['quotes'].get('quote')
+    if not quotes_list:
+        return {}
+    quotes_list = quotes_list if isinstance(quotes_list, list) else [quotes_list]
+    return {q['symbol']: q['last'] for q in quotes_list}
+
+
+def _positions_then_quotes(api, quotes_future):
+    """Fetches positions and immediately starts the quote lookup for their symbols."""
+    positions = extract_positions(api.get_positions())
+    if quotes_future.set_running_or_notify_cancel():
+        try:
+            symbols = [p['symbol'] for p in positions]
+            quotes_future.set_result(api.get_quotes(symbols) if symbols else None)
+        except Exception as e:
+            quotes_future.set_exception(e)
+    return positions
+
+
+def _result(future, deadline):
+    """Waits for a future until an absolute deadline; failures degrade to None."""
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FutureTimeout:
+        return TIMED_OUT
+    except Exception as e:
+        current_app.logger.warning("Dashboard fetch failed: %s", e)
+        return None
+
+
+def fetch_dashboard_data(api, call_timeout=DEFAULT_CALL_TIMEOUT):
+    """
+    Fetches balances, positions and quotes for the dashboard concurrently.
+
+    Balances and positions run in parallel and the quote lookup is chained onto
+    the positions call, so it starts the moment positions arrive. Each call has
+    its own deadline: a slow endpoint leaves its panel empty instead of holding
+    up the whole page.
+
+    Args:
+        api (TradierAPI): The client for the current user.
+        call_timeout (float): Seconds each call may take before it is given up on.
+
+    Returns:
+        dict: 'balances' (raw payload), 'positions' (list), 'quotes' (symbol -> last)
+              and 'timed_out' (names of the calls that missed their deadline).
+    """
+    started = time.monotonic()
+    quotes_future = Future()
+    balances_future = _executor.submit(traced(api.get_account_balances))
+    positions_future = _executor.submit(traced(_positions_then_quotes), api, quotes_future)
+
+    data = {'balances': None, 'positions': [], 'quotes': {}, 'timed_out': []}
+
+    balances = _result(balances_future, started + call_timeout)
+    if balances is TIMED_OUT:
+        data['timed_out'].append('balances')
+    else:
+        data['balances'] = balances
+
+    positions = _result(positions_future, started + call_timeout)
+    if positions is TIMED_OUT:
+        data['timed_out'].append('positions')
+        quotes_future.cancel()
+        return data
+    data['positions'] = positions or []
+
+    if data['positions']:
+        quotes = _result(quotes_future, time.monotonic() + call_timeout)
+        if quotes is TIMED_OUT:
+            data['timed_out'].append('quotes')
+        else:
+            data['quotes'] = extract_quotes_map(quotes)
+    return data
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def aggregate_positions(snapshots):
+    """
+    Merges every account's positions into one row per symbol. Quantities and
+    cost bases are summed; 'accounts' lists the nicknames holding the symbol.
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for pos in extract_positions(snapshot['positions']):
+            row = merged.setdefault(pos['symbol'], {'symbol': pos['symbol'], 'quantity': 0.0,
+                                                    'cost_basis': 0.0, 'accounts': []})
+            row['quantity'] += _float(pos['quantity'])
+            row['cost_basis'] += _float(pos['cost_basis'])
+            row['accounts'].append(snapshot['nickname'])
+    return [row for row in merged.values() if row['quantity']]
+
+
+def aggregate_kpis(snapshots):
+    """Sums the dashboard KPIs over the accounts whose balances are known."""
+    kpis = {'total_equity': 0.0, 'total_cash': 0.0, 'unrealized_pl': 0.0, 'day_pl': 0.0}
+    for snapshot in snapshots:
+        b = (snapshot['balances'] or {}).get('balances')
+        if not b:
+            continue
+        for field in ('total_equity', 'total_cash', 'unrealized_pl'):
+            kpis[field] += _float(b.get(field))
+        kpis['day_pl'] += _float((b.get('pnl') or {}).get('todays_pnl'))
+    return kpis
+
+
+def fetch_consolidated_data(accounts, call_timeout=DEFAULT_CALL_TIMEOUT):
+    """
+    Fetches and merges balances and positions for several accounts.
+
+    Accounts are fetched through the shared account aggregator (bounded pool,
+    per-account rate limits and snapshots), then one quote lookup covers the
+    union of their symbols.
+
+    Args:
+        accounts (list): Dicts with 'account_number', 'api_key' and 'nickname'.
+        call_timeout (float): Seconds to wait for accounts, then again for quotes.
+
+    Returns:
+        dict: 'accounts' (per-account snapshots and status), 'kpis' (summed),
+              'positions' (one merged row per symbol), 'quotes' (symbol -> last)
+              and 'timed_out' (nicknames of accounts shown from stale or no data).
+    """
+    snapshots = account_aggregator.snapshots(accounts, call_timeout)
+    data = {
+        'accounts': snapshots,
+        'kpis': aggregate_kpis(snapshots),
+        'positions': aggregate_positions(snapshots),
+        'quotes': {},
+        'timed_out': [s['nickname'] for s in snapshots if s['status'] in ('stale', 'unavailable')]
+    }
+    if data['positions']:
+        # Quotes are market data: any of the user's keys will do, and the market cache is shared.
+        api = TradierAPI(accounts[0]['api_key'], accounts[0]['account_number'])
+        quotes_future = _executor.submit(traced(api.get_quotes), [p['symbol'] for p in data['positions']])
+        quotes = _result(quotes_future, time.monotonic() + call_timeout)
+        if quotes is TIMED_OUT:
+            data['timed_out'].append('quotes')
+        else:
+            data['quotes'] = extract_quotes_map(quotes)
+    return data
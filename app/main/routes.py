@@ -1,9 +1,19 @@
-from flask import render_template, redirect, url_for, flash, Blueprint, request
+import json
+import time
+from flask import render_template, redirect, url_for, flash, Blueprint, request, current_app, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
 from bson.objectid import ObjectId
 from app import mongo
-from app.auth.forms import UpdateAccountForm
+from app.auth.forms import UpdateAccountForm, LinkAccountForm, UnlinkAccountForm
 from app.services.tradier_api import get_api_for_current_user
+from app.services.user_cache import user_cache
+from app.services.quote_stream import quote_hub, MAX_STREAM_SYMBOLS
+from app.services.portfolio import Portfolio
+from app.services.order_history import order_history
+from .dashboard_data import (
+    fetch_dashboard_data, fetch_consolidated_data,
+    extract_positions, extract_quotes_map, DEFAULT_CALL_TIMEOUT
+)
 
 main = Blueprint('main', __name__)
 
@@ -17,15 +27,24 @@ def index():
 @login_required
 def dashboard():
     api = get_api_for_current_user()
-    if not api:
+    accounts = getattr(current_user, 'accounts', [])
+    if not api and not accounts:
         flash('Please provide your Tradier API key and account number on your profile page to view the dashboard.', 'warning')
         return redirect(url_for('main.profile'))
 
-    balances_data = api.get_account_balances()
-    positions_data = api.get_positions()
+    call_timeout = current_app.config.get('DASHBOARD_CALL_TIMEOUT', DEFAULT_CALL_TIMEOUT)
+    # Linked accounts carry their own keys, so they can be shown without a primary one.
+    if len(accounts) > 1 or not api:
+        return _consolidated_dashboard(accounts, call_timeout)
+
+    data = fetch_dashboard_data(api, call_timeout)
+    if data['timed_out']:
+        flash(f"Tradier is slow to respond; some panels may be incomplete ({', '.join(data['timed_out'])}).", 'warning')
+
+    balances_data = data['balances']
+    quotes_map = data['quotes']
     
     kpis = {}
-    positions = []
     
     if balances_data and balances_data.get('balances'):
         b = balances_data['balances']
@@ -39,37 +58,111 @@ def dashboard():
             'day_pl': todays_pnl
         }
     
-    if positions_data and positions_data.get('positions') and positions_data['positions'] != 'null':
-        pos_list = positions_data['positions']['position']
-        raw_positions = pos_list if isinstance(pos_list, list) else [pos_list]
-        
-        symbols = [p['symbol'] for p in raw_positions]
-        quotes_data = api.get_quotes(symbols)
-        
-        quotes_map = {}
-        if quotes_data and quotes_data.get('quotes'):
-            quotes_list = quotes_data['quotes']['quote']
-            quotes_list = quotes_list if isinstance(quotes_list, list) else [quotes_list]
-            quotes_map = {q['symbol']: q['last'] for q in quotes_list}
-            
-        for pos in raw_positions:
-            quantity = float(pos['quantity'])
-            cost_basis = float(pos['cost_basis'])
-            last_price = quotes_map.get(pos['symbol'], 0)
-            
-            pos['market_value'] = quantity * float(last_price)
-            pos['unrealized_pl'] = pos['market_value'] - cost_basis
-            
-            # --- ADDED CALCULATION ---
-            if quantity > 0:
-                pos['unit_cost'] = cost_basis / quantity
-            else:
-                pos['unit_cost'] = 0
-            # --- END ADDED CALCULATION ---
-            
-            positions.append(pos)
-
-    return render_template('dashboard.html', title='Dashboard', kpis=kpis, positions=positions)
+    # Option quantities are contracts: each one is valued at 100x the quoted premium.
+    portfolio = Portfolio(data['positions']).apply_quotes(quotes_map)
+    positions = portfolio.rows()
+
+    return render_template('dashboard.html', title='Dashboard', kpis=kpis, positions=positions,
+                           live_quotes=quote_hub.enabled)
+
+
+def _consolidated_dashboard(accounts, call_timeout):
+    """The dashboard for users with linked accounts: summed KPIs and one merged row per symbol."""
+    data = fetch_consolidated_data(accounts, call_timeout)
+    if data['timed_out']:
+        flash(f"Some accounts are slow to respond and show their last known data ({', '.join(data['timed_out'])}).", 'warning')
+    positions = Portfolio(data['positions']).apply_quotes(data['quotes']).rows()
+    return render_template('dashboard.html', title='Dashboard', kpis=data['kpis'], positions=positions,
+                           accounts=data['accounts'], live_quotes=quote_hub.enabled)
+
+
+@main.route('/quotes/stream')
+@login_required
+def quote_stream():
+    """
+    Server-sent events with live quotes for ?symbols=A,B,C. Each message is a
+    {symbol: tick} map of the symbols that changed since the last one.
+    """
+    if not quote_hub.enabled:
+        return jsonify({'error': 'Live quotes are not configured.'}), 503
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    if not symbols:
+        return jsonify({'error': 'Provide one or more symbols.'}), 400
+    return _tick_stream(symbols, lambda ticks: ticks)
+
+
+@main.route('/dashboard/stream')
+@login_required
+def dashboard_stream():
+    """
+    Server-sent events that keep the dashboard current. The user's positions
+    are valued once, then each batch of quote ticks re-values only the rows
+    whose symbols changed. A message carries those rows and the portfolio
+    totals, with 'change' being the market value gained since the stream opened.
+    """
+    if not quote_hub.enabled:
+        return jsonify({'error': 'Live quotes are not configured.'}), 503
+    portfolio = _live_portfolio(current_app.config.get('DASHBOARD_CALL_TIMEOUT', DEFAULT_CALL_TIMEOUT))
+    if portfolio is None or not len(portfolio):
+        return jsonify({'error': 'No positions to stream.'}), 404
+    opening_value = portfolio.total_value
+
+    def render(ticks):
+        changed = portfolio.update_prices({symbol: tick.get('last') for symbol, tick in ticks.items()})
+        if not changed:
+            return None
+        return {
+            'rows': [{'row': row, 'symbol': portfolio.symbols[row], 'last': float(portfolio.last[row]),
+                      'market_value': float(portfolio.market_value[row]),
+                      'unrealized_pl': float(portfolio.unrealized_pl[row])} for row in changed],
+            'kpis': dict(portfolio.kpis(), change=portfolio.total_value - opening_value)
+        }
+
+    return _tick_stream(list(dict.fromkeys(portfolio.symbols)), render)
+
+
+def _live_portfolio(call_timeout):
+    """The current user's positions valued at the latest quotes, as on the dashboard."""
+    api = get_api_for_current_user()
+    accounts = getattr(current_user, 'accounts', [])
+    if len(accounts) > 1 or not api:
+        if not accounts:
+            return None
+        data = fetch_consolidated_data(accounts, call_timeout)
+        return Portfolio(data['positions']).apply_quotes(data['quotes'])
+    positions = extract_positions(api.get_positions())
+    quotes = api.get_quotes([p['symbol'] for p in positions]) if positions else None
+    return Portfolio(positions).apply_quotes(extract_quotes_map(quotes))
+
+
+def _tick_stream(symbols, render):
+    """
+    Subscribes to the worker's quote hub for symbols and streams render(ticks)
+    for each batch of ticks; batches that render to nothing are skipped.
+    """
+    symbols = symbols[:MAX_STREAM_SYMBOLS]
+    settings = quote_hub.settings
+
+    subscription = quote_hub.subscribe(symbols)
+    if subscription is None:
+        # Every stream slot in this worker is taken; the page tries again later.
+        return Response("retry: 30000\n\n", status=503, mimetype='text/event-stream',
+                        headers={'Retry-After': '30', 'Cache-Control': 'no-cache'})
+
+    def generate():
+        yield "retry: 3000\n\n"
+        deadline = time.monotonic() + settings['QUOTE_STREAM_MAX_SECONDS']
+        while time.monotonic() < deadline:
+            ticks = subscription.next_batch(settings['QUOTE_STREAM_HEARTBEAT'])
+            payload = render(ticks) if ticks else None
+            # Comment lines keep proxies from closing an idle stream.
+            yield f"data: {json.dumps(payload)}\n\n" if payload else ": keep-alive\n\n"
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Frees the slot when the server closes the response, even if the stream never started.
+    response.call_on_close(lambda: quote_hub.unsubscribe(subscription))
+    return response
 
 
 @main.route('/profile', methods=['GET', 'POST'])
@@ -81,22 +174,72 @@ def profile():
             {'_id': ObjectId(current_user.id)},
             {'$set': { 'tradier_api_key': form.tradier_api_key.data, 'tradier_account_number': form.tradier_account_number.data }}
         )
+        user_cache.invalidate(current_user.id)
         flash('Your account details have been updated!', 'success')
         return redirect(url_for('main.profile'))
     elif request.method == 'GET':
         form.tradier_api_key.data = current_user.tradier_api_key
         form.tradier_account_number.data = current_user.tradier_account_number
         
-    return render_template('profile.html', title='Profile', form=form)
+    return render_template('profile.html', title='Profile', form=form, link_form=LinkAccountForm(),
+                           unlink_form=UnlinkAccountForm(prefix='unlink'))
+
+
+@main.route('/profile/accounts', methods=['POST'])
+@login_required
+def link_account():
+    form = LinkAccountForm()
+    if form.validate_on_submit():
+        account_number = form.account_number.data.strip()
+        if any(a['account_number'] == account_number for a in current_user.accounts):
+            flash(f'Account {account_number} is already linked.', 'warning')
+            return redirect(url_for('main.profile'))
+        mongo.db.users.update_one(
+            {'_id': ObjectId(current_user.id)},
+            {'$push': {'linked_accounts': {'account_number': account_number, 'api_key': form.api_key.data.strip(),
+                                           'nickname': form.nickname.data.strip() or account_number}}}
+        )
+        user_cache.invalidate(current_user.id)
+        flash(f'Account {account_number} linked. It now appears on your consolidated dashboard.', 'success')
+    else:
+        for errors in form.errors.values():
+            for error in errors:
+                flash(error, 'danger')
+    return redirect(url_for('main.profile'))
+
+
+@main.route('/profile/accounts/<account_number>/unlink', methods=['POST'])
+@login_required
+def unlink_account(account_number):
+    if not UnlinkAccountForm(prefix='unlink').validate_on_submit():
+        flash('The unlink request expired. Please try again.', 'danger')
+        return redirect(url_for('main.profile'))
+    mongo.db.users.update_one(
+        {'_id': ObjectId(current_user.id)},
+        {'$pull': {'linked_accounts': {'account_number': account_number}}}
+    )
+    user_cache.invalidate(current_user.id)
+    flash(f'Account {account_number} unlinked.', 'info')
+    return redirect(url_for('main.profile'))
 
 @main.route('/history')
 @login_required
 def history_page():
-    # This is a placeholder. In a real application, you would fetch
-    # the order history from the Tradier API.
-    mock_history = [
-        {'date': '2023-10-26', 'symbol': 'AAPL', 'type': 'Stock', 'side': 'Buy', 'quantity': 10, 'price': 170.50, 'status': 'Filled'},
-        {'date': '2023-10-25', 'symbol': 'GOOG', 'type': 'Stock', 'side': 'Sell', 'quantity': 5, 'price': 130.20, 'status': 'Filled'},
-        {'date': '2023-10-24', 'symbol': 'TSLA', 'type': 'Option', 'side': 'Buy to Open', 'quantity': 1, 'price': 5.50, 'status': 'Filled'},
-    ]
-    return render_template('history.html', title='History', history=mock_history)
\ No newline at end of file
+    """
+    Order and fill history from the local mirror, newest first. Opening the
+    first page starts a background sync of anything new from Tradier; ?cursor=
+    pages back in time and ?symbol= narrows to one symbol.
+    """
+    cursor = request.args.get('cursor')
+    symbol = request.args.get('symbol', '').strip().upper() or None
+    syncing = False
+    if not cursor:
+        api = get_api_for_current_user()
+        if api:
+            syncing = order_history.sync_in_background(api, current_user.id, current_user.tradier_account_number)
+        else:
+            flash('Add your Tradier API key and account number on your profile page to sync your order history.', 'warning')
+
+    history, next_cursor = order_history.page(current_user.id, cursor=cursor, symbol=symbol)
+    return render_template('history.html', title='History', history=history, next_cursor=next_cursor,
+                           cursor=cursor, symbol=symbol, syncing=syncing)
@@ -15,12 +15,30 @@ class User(UserMixin):
         self.email = user_data.get('email')
         self.tradier_api_key = user_data.get('tradier_api_key') # Optional
         self.tradier_account_number = user_data.get('tradier_account_number') # Optional
+        self.linked_accounts = user_data.get('linked_accounts') or [] # Extra accounts for the consolidated dashboard
         self.password_hash = user_data.get('password')
         
         # Flask-Login requires the user's ID to be stored in self.id
         # The ID from MongoDB (_id) must be converted to a string.
         self.id = str(user_data.get('_id'))
 
+    @property
+    def accounts(self):
+        """
+        Every Tradier account the user can see: the profile account first, then
+        the linked ones, each as {'account_number', 'api_key', 'nickname'}.
+        """
+        accounts = []
+        if self.tradier_api_key and self.tradier_account_number:
+            accounts.append({'account_number': self.tradier_account_number,
+                             'api_key': self.tradier_api_key, 'nickname': 'Primary'})
+        seen = {a['account_number'] for a in accounts}
+        for linked in self.linked_accounts:
+            if linked.get('account_number') not in seen:
+                seen.add(linked['account_number'])
+                accounts.append(linked)
+        return accounts
+
     def check_password(self, password):
         """
         Checks if a given plaintext password matches the stored hash.
@@ -0,0 +1,133 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from app.services.history_store import history_store
+from .levels import find_support_resistance, round_levels
+
+MAX_SCAN_SYMBOLS = 500
+
+_process_pool = None
+_process_pool_pid = None
+_process_pool_lock = threading.Lock()
+
+
+class _Closes:
+    """The minimal frame find_support_resistance needs, cheap to pickle into workers."""
+    def __init__(self, closes):
+        self._closes = np.asarray(closes, dtype=float)
+        self.empty = self._closes.size == 0
+
+    def __getitem__(self, column):
+        return self._closes
+
+
+def analyze_closes(symbol, closes):
+    """
+    Computes rounded support/resistance levels for one symbol's closes.
+    Runs inside the scan process pool, so it only takes and returns plain data.
+    """
+    support, resistance = find_support_resistance(_Closes(closes))
+    return {
+        'symbol': symbol,
+        'status': 'ok',
+        'bars': len(closes),
+        'last_close': float(closes[-1]) if len(closes) else None,
+        'support': round_levels(support),
+        'resistance': round_levels(resistance)
+    }
+
+
+def get_process_pool(workers):
+    """
+    Returns the per-worker process pool used for level analysis.
+
+    Workers are spawned rather than forked so the pool is safe to start from a
+    threaded gunicorn worker.
+    """
+    global _process_pool, _process_pool_pid
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_pid != os.getpid():
+            _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _process_pool_pid = os.getpid()
+        return _process_pool
+
+
+def parse_symbols(raw):
+    """Normalizes a list or comma/whitespace separated string of tickers, keeping order."""
+    if isinstance(raw, str):
+        raw = raw.replace(',', ' ').split()
+    symbols = [str(s).strip().upper() for s in (raw or []) if str(s).strip()]
+    return list(dict.fromkeys(symbols))[:MAX_SCAN_SYMBOLS]
+
+
+def scan_symbols(api, symbols, period_days=185, fetch_concurrency=8, process_workers=0):
+    """
+    Scans many symbols, yielding one NDJSON line per symbol as soon as it finishes.
+
+    Histories are loaded through the local history store on a bounded thread
+    pool (only missing bars hit Tradier) and analyzed the moment it arrives,
+    so a slow symbol never holds back the others. A final summary line closes
+    the stream. The analysis takes microseconds per symbol, far less than a
+    spawned process needs to start, so by default it runs in the streaming
+    thread; SCAN_PROCESS_WORKERS > 0 moves it to a fixed process pool.
+
+    Args:
+        api (TradierAPI): The client for the current user.
+        symbols (list): Tickers to scan.
+        period_days (int): History length per symbol.
+        fetch_concurrency (int): Maximum concurrent Tradier history requests.
+        process_workers (int): Analysis processes; 0 (the default) analyzes in this process.
+
+    Yields:
+        str: JSON documents terminated by a newline.
+    """
+    started = time.monotonic()
+    errors = 0
+    fetcher = ThreadPoolExecutor(max_workers=max(fetch_concurrency, 1), thread_name_prefix='scan-fetch')
+    analyzer = get_process_pool(process_workers) if process_workers else None
+    pending = {}
+    try:
+        for symbol in symbols:
+            pending[fetcher.submit(history_store.get_bars, api, symbol, period_days)] = ('fetch', symbol)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, symbol = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors += 1
+                    yield json.dumps({'symbol': symbol, 'status': 'error', 'error': str(e)}) + '\n'
+                    continue
+
+                if stage == 'analyze':
+                    yield json.dumps(result) + '\n'
+                    continue
+
+                closes = np.asarray(result['close'])
+                if not len(closes):
+                    errors += 1
+                    yield json.dumps({'symbol': symbol, 'status': 'error', 'error': 'No historical data found.'}) + '\n'
+                elif analyzer is None:
+                    yield json.dumps(analyze_closes(symbol, closes)) + '\n'
+                else:
+                    pending[analyzer.submit(analyze_closes, symbol, closes)] = ('analyze', symbol)
+
+        yield json.dumps({
+            'status': 'done',
+            'symbols': len(symbols),
+            'errors': errors,
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        }) + '\n'
+    finally:
+        # Also runs when the client disconnects mid-stream.
+        for future in pending:
+            future.cancel()
+        fetcher.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+
+from app.services.market_cache import MemoryBackend
+
+# Rendered research charts, keyed by (symbol, period, as-of date).
+chart_cache = MemoryBackend(256)
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the point
+    kept from the previous bucket and the average of the next one. Peaks and
+    troughs survive, which matters when support/resistance is drawn on top.
+
+    Args:
+        x (np.ndarray): Increasing x values (numeric).
+        y (np.ndarray): y values, same length as x.
+        threshold (int): Number of points wanted.
+
+    Returns:
+        np.ndarray: Sorted indices of the points to keep.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    every = (n - 2) / (threshold - 2)
+    bounds = np.floor(np.arange(threshold - 1) * every).astype(int) + 1
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        next_start, next_end = (bounds[i + 1], bounds[i + 2]) if i + 2 < len(bounds) else (n - 1, n)
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _level_line(level, x0, x1, color):
+    return {'type': 'line', 'xref': 'x', 'yref': 'y', 'x0': x0, 'x1': x1, 'y0': level, 'y1': level,
+            'line': {'color': color, 'width': 2, 'dash': 'dash'}}
+
+
+def level_chart(symbol, period, dates, close, support, resistance, max_points=500):
+    """
+    Builds the Plotly figure spec for the research page straight from arrays.
+
+    Args:
+        symbol (str): The ticker, for the title and trace name.
+        period (int): The analysis period in days, for the title.
+        dates (np.ndarray): datetime64[D] bar dates.
+        close (np.ndarray): Closing prices.
+        support (list): Support levels to draw.
+        resistance (list): Resistance levels to draw.
+        max_points (int): Longer series are downsampled with LTTB to this many points.
+
+    Returns:
+        dict: {'data': [...], 'layout': {...}} ready for Plotly.newPlot.
+    """
+    keep = lttb(dates.astype('int64'), close, max_points)
+    x = np.datetime_as_string(dates[keep], unit='D').tolist()
+    y = np.round(np.asarray(close, dtype=float)[keep], 4).tolist()
+    x0, x1 = x[0], x[-1]
+
+    grid = {'gridcolor': '#EBF0F8', 'zerolinecolor': '#EBF0F8', 'linecolor': '#EBF0F8'}
+    return {
+        'data': [{
+            'type': 'scatter', 'mode': 'lines', 'name': f'{symbol} Close Price',
+            'x': x, 'y': y, 'line': {'color': 'blue'}
+        }],
+        'layout': {
+            'title': {'text': f'{symbol} Support & Resistance Levels (Last {period} Days)'},
+            'xaxis': dict(grid, title={'text': 'Date'}, type='date'),
+            'yaxis': dict(grid, title={'text': 'Price (USD)'}),
+            'height': 800,
+            'paper_bgcolor': 'white',
+            'plot_bgcolor': 'white',
+            'legend': {'orientation': 'h', 'yanchor': 'bottom', 'y': 1.02, 'xanchor': 'right', 'x': 1},
+            'shapes': [_level_line(s, x0, x1, 'green') for s in support] +
+                      [_level_line(r, x0, x1, 'red') for r in resistance]
+        }
+    }
+
+
+def chart_json(spec):
+    """Serializes a figure spec for embedding in a <script> block."""
+    return json.dumps(spec, separators=(',', ':')).replace('<', '\\u003c')
@@ -1,6 +1,9 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, SubmitField, SelectField
-from wtforms.validators import DataRequired
+from wtforms.validators import DataRequired, NumberRange
+
+# Longest lookback a research request may ask for; bounds history fetches and cache keys.
+MAX_PERIOD_DAYS = 366
 
 class ResearchForm(FlaskForm):
     """Form for submitting a stock symbol for research."""
@@ -15,6 +18,6 @@ class ResearchForm(FlaskForm):
         ],
         default=185,
         coerce=int,
-        validators=[DataRequired()]
+        validators=[DataRequired(), NumberRange(min=1, max=MAX_PERIOD_DAYS)]
     )
     submit = SubmitField('Get Analysis')
\ No newline at end of file
@@ -0,0 +1,233 @@
+import os
+import threading
+from bisect import bisect_left
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.history_store import history_store
+from .batch_scan import _Closes
+from .levels import _dedupe_levels, find_support_resistance
+
+
+def _is_close(a, b):
+    # np.isclose's default tolerances, as used by find_support_resistance.
+    return abs(a - b) <= 1e-8 + 1e-5 * abs(b)
+
+
+class LevelTracker:
+    """
+    Support/resistance levels for one symbol, updated one daily bar at a time.
+
+    Whether a close is a level depends only on the 2*window+1 bars centred on
+    it, so each new bar settles exactly one earlier bar (the one `window` bars
+    back) in O(window). Only the lookback's bars and the closes already
+    flagged as levels are kept; levels() dedupes the flagged closes still in
+    the lookback and returns what find_support_resistance would return for
+    the same history, without rescanning it.
+    """
+    def __init__(self, window=10, lookback_days=185):
+        self.window = window
+        self.lookback_days = lookback_days
+        self.days, self.closes = [], []
+        self.supports, self.resistances = [], []
+
+    @property
+    def last_date(self):
+        return date.fromordinal(self.days[-1]) if self.days else None
+
+    def _flags(self, i, days, closes):
+        """(is_support, is_resistance) for bar i, whose whole window must be present."""
+        close = closes[i]
+        window = [c for c in closes[i - self.window:i + self.window + 1] if c == c]
+        if close != close or not window:
+            return False, False
+        return _is_close(close, min(window)), _is_close(close, max(window))
+
+    def update(self, day, close):
+        """
+        Adds the next settled daily bar. Bars not newer than the last one are ignored.
+
+        Args:
+            day (date): The bar's date.
+            close (float): Its close (NaN for a missing close).
+        """
+        day = day.toordinal()
+        if self.days and day <= self.days[-1]:
+            return False
+        self.days.append(day)
+        self.closes.append(float(close))
+        i = len(self.days) - 1 - self.window
+        if i >= self.window:
+            is_support, is_resistance = self._flags(i, self.days, self.closes)
+            if is_support:
+                self.supports.append((self.days[i], self.closes[i]))
+            if is_resistance:
+                self.resistances.append((self.days[i], self.closes[i]))
+        self._trim(day - self.lookback_days)
+        return True
+
+    def _trim(self, cutoff):
+        # Keep the whole lookback, and always enough bars to settle the pending ones.
+        drop = min(bisect_left(self.days, cutoff), max(len(self.days) - (2 * self.window + 1), 0))
+        if drop:
+            del self.days[:drop], self.closes[:drop]
+        for flagged in (self.supports, self.resistances):
+            keep = bisect_left(flagged, (cutoff,))
+            if keep:
+                del flagged[:keep]
+
+    def levels(self, as_of=None, provisional=None):
+        """
+        Support and resistance for the lookback ending at as_of.
+
+        Args:
+            as_of (date): Last day of the lookback; defaults to the last bar's date.
+            provisional (tuple): Optional (date, close) of today's still-forming
+                bar, included like find_support_resistance would but not stored.
+
+        Returns:
+            tuple: (support levels, resistance levels), each sorted ascending.
+        """
+        days, closes = self.days, self.closes
+        if provisional is not None and (not days or provisional[0].toordinal() > days[-1]):
+            days, closes = days + [provisional[0].toordinal()], closes + [float(provisional[1])]
+        if not days:
+            return [], []
+        as_of = as_of.toordinal() if as_of else days[-1]
+        start = bisect_left(days, as_of - self.lookback_days)
+        if len(days) - start <= 2 * self.window:
+            return [], []
+
+        # Only closes whose whole window lies inside the lookback count.
+        first = (days[start + self.window],)
+        supports = [close for _, close in self.supports[bisect_left(self.supports, first):]]
+        resistances = [close for _, close in self.resistances[bisect_left(self.resistances, first):]]
+        if days is not self.days:
+            i = len(days) - 1 - self.window
+            if i >= start + self.window:
+                is_support, is_resistance = self._flags(i, days, closes)
+                supports += [closes[i]] if is_support else []
+                resistances += [closes[i]] if is_resistance else []
+        return _dedupe_levels(np.array(supports)), _dedupe_levels(np.array(resistances))
+
+    def to_state(self):
+        return {'window': self.window, 'lookback_days': self.lookback_days, 'days': self.days,
+                'closes': self.closes, 'supports': self.supports, 'resistances': self.resistances}
+
+    @classmethod
+    def from_state(cls, state):
+        tracker = cls(state['window'], state['lookback_days'])
+        tracker.days, tracker.closes = list(state['days']), list(state['closes'])
+        tracker.supports = [tuple(level) for level in state['supports']]
+        tracker.resistances = [tuple(level) for level in state['resistances']]
+        return tracker
+
+
+class LevelStore:
+    """
+    Keeps a LevelTracker per (symbol, window, lookback) in memory and in the
+    'level_trackers' collection, so levels survive restarts and are shared by
+    every worker, the scheduled AutoTrade scanner and the research page.
+
+    Each request applies only the bars that settled since the tracker's last
+    update (usually none or one); today's forming bar is used provisionally
+    and never stored.
+    """
+    DEFAULTS = {
+        'LEVEL_TRACKER_ENABLED': True,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._trackers = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._collection = None
+        self._stats = {'requests': 0, 'loaded': 0, 'bootstrapped': 0, 'bars_applied': 0}
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            value = os.environ.get(key, default)
+            if isinstance(default, bool) and isinstance(value, str):
+                value = value.lower() in ('1', 'true', 'yes')
+            app.config.setdefault(key, value)
+            self._settings[key] = app.config[key]
+        self._trackers = {}
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            from app import mongo
+            self._collection = mongo.db.level_trackers
+        return self._collection
+
+    def _lock_for(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _count(self, **amounts):
+        with self._stats_lock:
+            for key, amount in amounts.items():
+                self._stats[key] += amount
+
+    def levels(self, api, symbol, period_days=185, window=10, bars=None):
+        """
+        Support and resistance levels for the last period_days, as
+        find_support_resistance would compute them from history_store bars.
+
+        Args:
+            api (TradierAPI): Client used to fetch bars the tracker has not seen.
+            symbol (str): The ticker.
+            period_days (int): Lookback in calendar days.
+            window (int): Bars on each side of a candidate close.
+            bars (np.ndarray): The caller's history_store bars for this window,
+                if it already has them; saves the fetch.
+
+        Returns:
+            tuple: (support levels, resistance levels), each sorted ascending.
+        """
+        symbol = symbol.upper()
+        today = date.today()
+        if not self._settings['LEVEL_TRACKER_ENABLED']:
+            bars = history_store.get_bars(api, symbol, period_days) if bars is None else bars
+            return find_support_resistance(_Closes(bars['close']))
+
+        self._count(requests=1)
+        key = f"{symbol}:{window}:{period_days}"
+        with self._lock_for(key):
+            tracker = self._trackers.get(key)
+            settled = today - timedelta(days=1)
+            if tracker is None or tracker.last_date is None or tracker.last_date < settled:
+                doc = self.collection.find_one({'_id': key})
+                if doc and (tracker is None or (tracker.last_date or date.min).toordinal() < doc['days'][-1]):
+                    tracker = LevelTracker.from_state(doc)
+                    self._count(loaded=1)
+            if tracker is None or not tracker.days:
+                tracker = LevelTracker(window, period_days)
+                self._count(bootstrapped=1)
+            self._trackers[key] = tracker
+
+            if bars is None:
+                since = tracker.last_date or today - timedelta(days=period_days)
+                bars = history_store.get_bars(api, symbol, period_days=max((today - since).days, 1))
+            applied, provisional = 0, None
+            for day, close in zip(bars['date'].astype('datetime64[D]').tolist(), bars['close'].tolist()):
+                if day >= today:
+                    provisional = (day, close)
+                elif tracker.update(day, close):
+                    applied += 1
+            if applied:
+                self._count(bars_applied=applied)
+                self.collection.replace_one({'_id': key}, dict(tracker.to_state(), symbol=symbol), upsert=True)
+            return tracker.levels(as_of=today, provisional=provisional)
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats, trackers=len(self._trackers))
+
+
+level_store = LevelStore()
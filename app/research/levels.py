@@ -0,0 +1,113 @@
+import warnings
+import numpy as np
+
+
+def custom_round(price):
+    # ... (This function is unchanged) ...
+    if price < 100: return round(price)
+    else: return round(price / 5) * 5
+
+def extrema_flags(close, window=10):
+    """
+    Flags the closes that equal the min (support) and max (resistance) of the
+    centred window of 2*window+1 bars around them.
+
+    A bar's flag depends only on its own window, so it is final once `window`
+    later bars exist; find_support_resistance over any slice of the series
+    sees exactly the flagged bars whose whole window lies inside the slice.
+
+    Returns:
+        tuple: (is_support, is_resistance) boolean arrays aligned with close;
+               the first and last `window` bars are never flagged.
+    """
+    close = np.asarray(close, dtype=float).ravel()
+    is_support, is_resistance = np.zeros(len(close), dtype=bool), np.zeros(len(close), dtype=bool)
+    if len(close) <= 2 * window:
+        return is_support, is_resistance
+    centre = close[window:len(close) - window]
+    windows = np.lib.stride_tricks.sliding_window_view(close, 2 * window + 1)
+    if np.isnan(close).any():
+        # Match pandas' Series.min/max, which skip NaN within each window.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            lows, highs = np.nanmin(windows, axis=1), np.nanmax(windows, axis=1)
+    else:
+        lows, highs = windows.min(axis=1), windows.max(axis=1)
+    is_support[window:len(close) - window] = np.isclose(centre, lows)
+    is_resistance[window:len(close) - window] = np.isclose(centre, highs)
+    return is_support, is_resistance
+
+def _local_extrema(close, window):
+    """
+    Returns the closes that equal the min (support) and max (resistance) of the
+    centred window of 2*window+1 bars around them, in bar order.
+    """
+    is_support, is_resistance = extrema_flags(close, window)
+    return close[is_support], close[is_resistance]
+
+def _dedupe_levels(levels):
+    """
+    Keeps the lowest level, then each next level at least $1 (below $100) or
+    $2 above the last kept one. Candidate successors are found for every level
+    at once with searchsorted; only the kept levels are walked in Python.
+    """
+    unique = np.unique(levels)
+    if unique.size == 0:
+        return []
+    required = np.where(unique < 100, 1, 2)
+    nxt = np.searchsorted(unique, unique + required, side='left')
+    # Snap to the exact `level - last >= required` test used for rounding parity.
+    idx = np.arange(unique.size)
+    while True:
+        prev = nxt - 1
+        back = (prev > idx) & (unique[np.maximum(prev, 0)] - unique >= required)
+        fwd = (nxt < unique.size) & ~(unique[np.minimum(nxt, unique.size - 1)] - unique >= required)
+        if not back.any() and not fwd.any():
+            break
+        nxt = np.where(back, prev, np.where(fwd, nxt + 1, nxt))
+    plotted, j = [], 0
+    while j < unique.size:
+        plotted.append(unique[j])
+        j = nxt[j]
+    return plotted
+
+def find_support_resistance(data, window=10):
+    """
+    Finds support and resistance levels as closes that are the lowest/highest
+    within +/- `window` bars, then thins out levels that sit too close together.
+
+    Args:
+        data (pd.DataFrame): Daily bars with a 'Close' column.
+        window (int): Bars on each side of a candidate close.
+
+    Returns:
+        tuple: (support levels, resistance levels), each sorted ascending.
+    """
+    if data.empty: return [], []
+    close = np.asarray(data['Close'], dtype=float).ravel()
+    if len(close) <= 2 * window:
+        return [], []
+    supports, resistances = _local_extrema(close, window)
+    return _dedupe_levels(supports), _dedupe_levels(resistances)
+
+
+def levels_between(close, is_support, is_resistance, start, stop, window=10):
+    """
+    find_support_resistance for close[start:stop], from flags precomputed over
+    the whole series with extrema_flags(), so sliding the slice forward costs
+    only the dedupe of its levels rather than a rescan of every bar.
+    """
+    if stop - start <= 2 * window:
+        return [], []
+    inner = slice(start + window, stop - window)
+    centre = close[inner]
+    return _dedupe_levels(centre[is_support[inner]]), _dedupe_levels(centre[is_resistance[inner]])
+
+
+def round_levels(levels):
+    """
+    Rounds levels with custom_round, dropping duplicates but keeping order.
+    Levels come back as plain ints (round() of a NumPy float is not one on older NumPy).
+    """
+    return list(dict.fromkeys(custom_round(float(level)) for level in levels))
+
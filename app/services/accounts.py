@@ -0,0 +1,143 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .market_cache import MemoryBackend
+from .rate_limit import TokenBucket
+from .tradier_api import TradierAPI
+
+
+class AccountAggregator:
+    """
+    Consolidated balances and positions across many Tradier accounts.
+
+    Each account's balances and positions are fetched on a bounded pool, with
+    its own token bucket so a desk of dozens of accounts does not burst past
+    Tradier's per-token limits. Results are kept per account: a fresh snapshot
+    (younger than ACCOUNT_CACHE_TTL) is used without a call, and an account
+    that misses the page deadline falls back to its last snapshot (kept for
+    ACCOUNT_STALE_TTL), marked stale, while its fetch finishes in the
+    background for the next request.
+    Only one fetch per account is in flight at a time.
+    """
+    DEFAULTS = {
+        'ACCOUNT_FETCH_WORKERS': 8,
+        'ACCOUNT_RATE_LIMIT': 2.0,
+        'ACCOUNT_RATE_BURST': 4,
+        'ACCOUNT_CACHE_TTL': 30,
+        'ACCOUNT_STALE_TTL': 900,
+        'ACCOUNT_CACHE_MAX_ENTRIES': 1024,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._snapshots = MemoryBackend(self._settings['ACCOUNT_CACHE_MAX_ENTRIES'])
+        self._inflight = {}
+        self._buckets = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            app.config.setdefault(key, type(default)(os.environ.get(key, default)))
+            self._settings[key] = app.config[key]
+        self._snapshots = MemoryBackend(self._settings['ACCOUNT_CACHE_MAX_ENTRIES'])
+        self._executor = None
+
+    def _pool(self):
+        # Created on first use so a preloading master never forks with live workers.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._settings['ACCOUNT_FETCH_WORKERS'],
+                                                thread_name_prefix='account-fetch')
+        return self._executor
+
+    @staticmethod
+    def _key(account):
+        # The API key is part of the cache key, so a user can only ever see snapshots their own key fetched.
+        digest = hashlib.sha256(account['api_key'].encode()).hexdigest()[:16]
+        return f"{digest}:{account['account_number']}"
+
+    def _bucket(self, key):
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self._settings['ACCOUNT_RATE_LIMIT'],
+                                                 self._settings['ACCOUNT_RATE_BURST'])
+            return self._buckets[key]
+
+    def _fetch(self, key, account):
+        bucket = self._bucket(key)
+        api = TradierAPI(account['api_key'], account['account_number'])
+        try:
+            bucket.acquire()
+            balances = api.get_account_balances()
+            bucket.acquire()
+            positions = api.get_positions()
+            # A half-read account would pair fresh balances with old or missing
+            # positions; keep the last full snapshot, which is then shown stale.
+            if balances is None or positions is None:
+                return None
+            snapshot = {'balances': balances, 'positions': positions, 'fetched_at': time.time()}
+            self._snapshots.set(key, snapshot, self._settings['ACCOUNT_STALE_TTL'])
+            return snapshot
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _submit(self, key, account):
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None or future.done():
+                future = self._inflight[key] = self._pool().submit(self._fetch, key, account)
+            return future
+
+    def snapshots(self, accounts, call_timeout):
+        """
+        Latest balances and positions payloads for each account.
+
+        Args:
+            accounts (list): Dicts with 'account_number', 'api_key' and 'nickname'.
+            call_timeout (float): Seconds to wait for accounts that need a fetch.
+
+        Returns:
+            list: One dict per account with 'account_number', 'nickname', 'balances',
+                  'positions' (raw payloads), 'status' ('live', 'cached', 'stale' or
+                  'unavailable') and 'age' in seconds.
+        """
+        now = time.time()
+        results, pending = [], {}
+        for index, account in enumerate(accounts):
+            key = self._key(account)
+            snapshot, _ = self._snapshots.get(key)
+            if snapshot and now - snapshot['fetched_at'] < self._settings['ACCOUNT_CACHE_TTL']:
+                results.append((account, snapshot, 'cached'))
+            else:
+                pending[index] = (self._submit(key, account), snapshot)
+                results.append((account, None, None))
+
+        wait([future for future, _ in pending.values()], timeout=call_timeout)
+        for index, (future, previous) in pending.items():
+            snapshot = None
+            if future.done() and not future.exception():
+                snapshot = future.result()
+            if snapshot is not None:
+                results[index] = (accounts[index], snapshot, 'live')
+            elif previous is not None:
+                results[index] = (accounts[index], previous, 'stale')
+            else:
+                results[index] = (accounts[index], None, 'unavailable')
+
+        return [{
+            'account_number': account['account_number'],
+            'nickname': account.get('nickname') or account['account_number'],
+            'balances': snapshot['balances'] if snapshot else None,
+            'positions': snapshot['positions'] if snapshot else None,
+            'status': status,
+            'age': round(now - snapshot['fetched_at']) if snapshot else None
+        } for account, snapshot, status in results]
+
+
+account_aggregator = AccountAggregator()
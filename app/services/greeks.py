@@ -0,0 +1,236 @@
+import hashlib
+import os
+import threading
+from datetime import datetime, time as time_of_day, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from .market_cache import MemoryBackend
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_CLOSE = time_of_day(16, 0)
+SECONDS_PER_YEAR = 365 * 24 * 3600
+# Floor on time to expiry (one hour), so contracts expiring today still get finite greeks.
+MIN_YEARS = 3600 / SECONDS_PER_YEAR
+IV_BOUNDS = (1e-4, 5.0)
+
+
+# --- Normal distribution ---
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+
+def norm_cdf(x):
+    """
+    Standard normal CDF for arrays, from the Chebyshev erfc fit in Numerical
+    Recipes (relative error below 1.2e-7 everywhere, including the tails).
+    """
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.5 * z)
+    erfc = t * np.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277)))))))))
+    return np.where(x >= 0, 1 - 0.5 * erfc, 0.5 * erfc)
+
+
+# --- Black-Scholes ---
+
+def _d1_d2(spot, strike, years, rate, dividend, vol):
+    root_t = np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate - dividend + 0.5 * vol * vol) * years) / (vol * root_t)
+    return d1, d1 - vol * root_t
+
+
+def bs_price(is_call, spot, strike, years, rate, dividend, vol):
+    """Black-Scholes-Merton prices; every argument may be an array (they broadcast)."""
+    d1, d2 = _d1_d2(spot, strike, years, rate, dividend, vol)
+    spot_pv, strike_pv = spot * np.exp(-dividend * years), strike * np.exp(-rate * years)
+    call = spot_pv * norm_cdf(d1) - strike_pv * norm_cdf(d2)
+    return np.where(is_call, call, call - spot_pv + strike_pv)
+
+
+def bs_greeks(is_call, spot, strike, years, rate, dividend, vol):
+    """
+    Price and greeks in one pass.
+
+    Returns:
+        dict: Arrays 'price', 'delta', 'gamma', 'theta' (per calendar day),
+              'vega' (per vol point) and 'prob_otm' (risk-neutral chance the
+              option expires out of the money), in Tradier's conventions.
+    """
+    d1, d2 = _d1_d2(spot, strike, years, rate, dividend, vol)
+    root_t = np.sqrt(years)
+    carry, discount = np.exp(-dividend * years), np.exp(-rate * years)
+    n_d1, n_d2, pdf_d1 = norm_cdf(d1), norm_cdf(d2), norm_pdf(d1)
+
+    call_price = spot * carry * n_d1 - strike * discount * n_d2
+    decay = -spot * carry * pdf_d1 * vol / (2 * root_t)
+    call_theta = decay - rate * strike * discount * n_d2 + dividend * spot * carry * n_d1
+    put_theta = decay + rate * strike * discount * (1 - n_d2) - dividend * spot * carry * (1 - n_d1)
+    return {
+        'price': np.where(is_call, call_price, call_price - spot * carry + strike * discount),
+        'delta': np.where(is_call, carry * n_d1, carry * (n_d1 - 1)),
+        'gamma': carry * pdf_d1 / (spot * vol * root_t),
+        'theta': np.where(is_call, call_theta, put_theta) / 365,
+        'vega': spot * carry * pdf_d1 * root_t / 100,
+        'prob_otm': np.where(is_call, 1 - n_d2, n_d2)
+    }
+
+
+def implied_volatility(price, is_call, spot, strike, years, rate=0.0, dividend=0.0, tol=1e-6, max_iter=50):
+    """
+    Implied volatility for a batch of options.
+
+    Newton steps on vega inside a bisection bracket: each contract keeps the
+    bounds its price errors have established, and any step that leaves them
+    (or a vanishing vega far from the money) falls back to the midpoint, so
+    every contract converges. Only unconverged rows are repriced each round.
+
+    Returns:
+        np.ndarray: Annualized volatility per contract; NaN where the price is
+                    missing or outside the no-arbitrage bounds.
+    """
+    price, spot, strike, years = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (price, spot, strike, years)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    spot_pv, strike_pv = spot * np.exp(-dividend * years), strike * np.exp(-rate * years)
+    lower = np.maximum(np.where(is_call, spot_pv - strike_pv, strike_pv - spot_pv), 0)
+    upper = np.where(is_call, spot_pv, strike_pv)
+
+    vol = np.full(price.shape, np.nan)
+    active = np.flatnonzero((price > lower) & (price < upper) & (years > 0) & (strike > 0) & (spot > 0))
+    if not len(active):
+        return vol
+    lo, hi = np.full(len(active), IV_BOUNDS[0]), np.full(len(active), IV_BOUNDS[1])
+    # Brenner-Subrahmanyam starting point, good near the money.
+    guess = np.sqrt(2 * np.pi / years[active]) * price[active] / spot[active]
+    sigma = np.clip(np.nan_to_num(guess, nan=0.3), 0.05, 3.0)
+
+    for _ in range(max_iter):
+        call, s_pv, k_pv, t = is_call[active], spot_pv[active], strike_pv[active], years[active]
+        root_t = np.sqrt(t)
+        d1 = np.log(s_pv / k_pv) / (sigma * root_t) + 0.5 * sigma * root_t
+        call_price = s_pv * norm_cdf(d1) - k_pv * norm_cdf(d1 - sigma * root_t)
+        diff = np.where(call, call_price, call_price - s_pv + k_pv) - price[active]
+        vega = s_pv * norm_pdf(d1) * root_t
+        done = (np.abs(diff) < tol) | (hi - lo < tol * 1e-2)
+        vol[active[done]] = sigma[done]
+        keep = ~done
+        if not keep.any():
+            break
+        active, sigma, diff, vega, lo, hi = active[keep], sigma[keep], diff[keep], vega[keep], lo[keep], hi[keep]
+        hi = np.where(diff > 0, sigma, hi)
+        lo = np.where(diff < 0, sigma, lo)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            step = sigma - diff / vega
+        sigma = np.where(np.isfinite(step) & (step > lo) & (step < hi), step, (lo + hi) / 2)
+    else:
+        vol[active] = sigma
+    return vol
+
+
+def years_to_expiry(expiration, now=None):
+    """Years from now until 16:00 New York time on the expiration date (YYYY-MM-DD), at least one hour."""
+    close = datetime.combine(datetime.strptime(expiration, '%Y-%m-%d').date(), MARKET_CLOSE, tzinfo=MARKET_TZ)
+    now = now or datetime.now(timezone.utc)
+    return max((close - now).total_seconds() / SECONDS_PER_YEAR, MIN_YEARS)
+
+
+class ChainAnalytics:
+    """
+    Implied volatility and greeks for whole option chains, computed with our
+    own Black-Scholes-Merton pass instead of contract by contract.
+
+    Each contract is priced off its mid (its last trade when there is no
+    two-sided market). Results are cached per chain snapshot: the key is a
+    digest of the chain's strikes and prices plus the spot and the minute
+    to expiry, so repeated requests against the same market-cached chain
+    reuse one computation, and any change in quotes gets a fresh one.
+    """
+    DEFAULTS = {
+        'GREEKS_RISK_FREE_RATE': 0.045,
+        'GREEKS_DIVIDEND_YIELD': 0.0,
+        'GREEKS_CACHE_TTL': 300,
+        'GREEKS_CACHE_MAX_ENTRIES': 256,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._cache = MemoryBackend(self._settings['GREEKS_CACHE_MAX_ENTRIES'])
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'contracts_priced': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            app.config.setdefault(key, type(default)(os.environ.get(key, default)))
+            self._settings[key] = app.config[key]
+        self._cache = MemoryBackend(self._settings['GREEKS_CACHE_MAX_ENTRIES'])
+
+    def _snapshot_key(self, chain, spot, years):
+        digest = hashlib.blake2b(digest_size=16)
+        for name in ('strike', 'bid', 'ask', 'last'):
+            digest.update(np.ascontiguousarray(chain.columns[name]).tobytes())
+        digest.update((chain.option_types == 'call').tobytes())
+        return f"{digest.hexdigest()}:{spot:.4f}:{round(years * SECONDS_PER_YEAR / 60)}"
+
+    def compute(self, chain, spot, expiration, now=None):
+        """
+        IV and greeks for every row of an OptionChain.
+
+        Args:
+            chain (OptionChain): The chain for one expiration.
+            spot (float): Current underlying price.
+            expiration (str): The chain's expiration date, YYYY-MM-DD.
+            now (datetime, optional): Valuation time (aware); defaults to now.
+
+        Returns:
+            dict: Arrays aligned with the chain's rows: 'iv', 'price', 'delta',
+                  'gamma', 'theta', 'vega' and 'prob_otm'. Rows whose price
+                  gives no implied volatility are NaN. Treat as read-only.
+        """
+        years = years_to_expiry(expiration, now)
+        key = self._snapshot_key(chain, spot, years)
+        cached, _ = self._cache.get(key)
+        if cached is not None:
+            with self._lock:
+                self._stats['hits'] += 1
+            return cached
+
+        rate, dividend = self._settings['GREEKS_RISK_FREE_RATE'], self._settings['GREEKS_DIVIDEND_YIELD']
+        bid, ask, last = chain.columns['bid'], chain.columns['ask'], chain.columns['last']
+        price = np.where((ask > 0) & (ask >= bid), chain.mid, last)
+        is_call = chain.option_types == 'call'
+        strike = chain.columns['strike']
+
+        iv = implied_volatility(price, is_call, spot, strike, years, rate, dividend)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = bs_greeks(is_call, spot, strike, years, rate, dividend, iv)
+        result['iv'] = iv
+        self._cache.set(key, result, self._settings['GREEKS_CACHE_TTL'])
+        with self._lock:
+            self._stats['misses'] += 1
+            self._stats['contracts_priced'] += len(chain)
+        return result
+
+    def apply(self, chain, spot, expiration, now=None):
+        """
+        Writes computed greeks into the chain's columns (keeping Tradier's
+        where ours are NaN) and adds 'prob_otm', so chain lookups such as
+        nearest_delta() and find() use them. Returns the chain.
+        """
+        result = self.compute(chain, spot, expiration, now)
+        columns = {'mid_iv': result['iv'], 'prob_otm': result['prob_otm']}
+        for name in ('delta', 'gamma', 'theta', 'vega'):
+            columns[name] = result[name]
+        chain.update_columns({name: np.where(np.isnan(values), chain.columns.get(name, np.nan), values)
+                              for name, values in columns.items()})
+        return chain
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._cache))
+
+
+chain_analytics = ChainAnalytics()
@@ -0,0 +1,224 @@
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import click
+import numpy as np
+from flask.cli import AppGroup
+
+BAR_DTYPE = np.dtype([
+    ('date', 'M8[D]'), ('open', 'f8'), ('high', 'f8'),
+    ('low', 'f8'), ('close', 'f8'), ('volume', 'f8')
+])
+FRAME_COLUMNS = {'date': 'Date', 'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def bars_from_history(history_data):
+    """Converts a /markets/history payload into a BAR_DTYPE array sorted by date."""
+    if not history_data or not history_data.get('history') or history_data['history'] == 'null':
+        return np.empty(0, dtype=BAR_DTYPE)
+    days = history_data['history']['day']
+    days = days if isinstance(days, list) else [days]
+    bars = np.array([
+        (d['date'], _to_float(d.get('open')), _to_float(d.get('high')), _to_float(d.get('low')),
+         _to_float(d.get('close')), _to_float(d.get('volume')))
+        for d in days
+    ], dtype=BAR_DTYPE)
+    return np.sort(bars, order='date')
+
+
+def merge_bars(existing, new):
+    """Merges two bar arrays by date; rows in `new` replace rows with the same date."""
+    combined = np.concatenate([existing, new])
+    combined = combined[np.argsort(combined['date'], kind='stable')]
+    keep = np.ones(len(combined), dtype=bool)
+    keep[:-1] = combined['date'][:-1] != combined['date'][1:]
+    return combined[keep]
+
+
+def bars_to_frame(bars):
+    """Builds the DataFrame research/autotrade expect ('Date', 'Close', ...) from a bar array."""
+    import pandas as pd
+    frame = pd.DataFrame({name: np.asarray(bars[field]) for field, name in FRAME_COLUMNS.items()})
+    frame['Date'] = frame['Date'].astype('datetime64[ns]')
+    return frame
+
+
+class HistoryStore:
+    """
+    Keeps daily bars on local disk, one .npz file per symbol holding the bars
+    and the date range they cover.
+
+    Only the date range not yet on disk is requested from Tradier. Bars dated
+    today are still forming, so they are returned to the caller but never
+    persisted; the next call refreshes them.
+    """
+    DEFAULTS = {
+        'HISTORY_STORE_ENABLED': True,
+        'HISTORY_STORE_DIR': '',
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._directory = None
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._stats = {'requests': 0, 'upstream_calls': 0, 'bars_downloaded': 0,
+                       'bytes_downloaded': 0, 'bars_from_disk': 0}
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Reads the store directory (default: <instance>/history) and registers the CLI."""
+        for key, default in self.DEFAULTS.items():
+            value = os.environ.get(key, default)
+            if isinstance(default, bool) and isinstance(value, str):
+                value = value.lower() in ('1', 'true', 'yes')
+            app.config.setdefault(key, value)
+            self._settings[key] = app.config[key]
+        self._directory = self._settings['HISTORY_STORE_DIR'] or os.path.join(app.instance_path, 'history')
+        app.cli.add_command(history_cli)
+
+    @property
+    def enabled(self):
+        return self._settings['HISTORY_STORE_ENABLED'] and self._directory is not None
+
+    def _lock_for(self, symbol):
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _path(self, symbol):
+        safe = re.sub(r'[^A-Z0-9._-]', '_', symbol.upper())
+        return os.path.join(self._directory, safe + '.npz')
+
+    def _count(self, **amounts):
+        with self._stats_lock:
+            for key, amount in amounts.items():
+                self._stats[key] += amount
+
+    def load(self, symbol):
+        """Returns (bars, meta) from disk, or an empty array and None if the symbol is not stored."""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=BAR_DTYPE), None
+        with np.load(path) as stored:
+            return stored['bars'], json.loads(stored['meta'].item())
+
+    def _save(self, symbol, bars, meta):
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(symbol)
+        # Bars and meta share one file, so a single rename commits both: readers in
+        # other gunicorn workers, or a crash mid-save, never pair new bars with old meta.
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, bars=np.ascontiguousarray(bars), meta=np.array(json.dumps(meta)))
+        os.replace(tmp, path)
+
+    def _fetch(self, api, symbol, start, end):
+        history_data = api.get_historical_prices(symbol, start_date=start, end_date=end)
+        bars = bars_from_history(history_data)
+        self._count(upstream_calls=1, bars_downloaded=len(bars),
+                    bytes_downloaded=len(json.dumps(history_data)) if history_data else 0)
+        return history_data is not None, bars
+
+    def get_bars(self, api, symbol, period_days=185, end_date=None):
+        """
+        Returns the bars for the last period_days, fetching only what is missing on disk.
+
+        Args:
+            api (TradierAPI): Client used for the missing range.
+            symbol (str): The ticker.
+            period_days (int): Calendar days of history wanted.
+            end_date (date): Last day wanted, defaults to today.
+
+        Returns:
+            np.ndarray: BAR_DTYPE rows between start and end, sorted by date.
+        """
+        symbol = symbol.upper()
+        end = end_date or date.today()
+        start = end - timedelta(days=period_days)
+        if not self.enabled:
+            return self._fetch(api, symbol, start, end)[1]
+
+        self._count(requests=1)
+        with self._lock_for(symbol):
+            bars, meta = self.load(symbol)
+            changed = False
+            if meta is None:
+                meta = {'from': start.isoformat(), 'through': (start - timedelta(days=1)).isoformat()}
+            settled = date.today() - timedelta(days=1)
+
+            stored_from = date.fromisoformat(meta['from'])
+            if start < stored_from:
+                ok, older = self._fetch(api, symbol, start, stored_from - timedelta(days=1))
+                if ok:
+                    bars, meta['from'], changed = merge_bars(bars, older), start.isoformat(), True
+
+            fresh = np.empty(0, dtype=BAR_DTYPE)
+            through = date.fromisoformat(meta['through'])
+            missing_from = through + timedelta(days=1)
+            if missing_from <= end and np.busday_count(missing_from, end + timedelta(days=1)) > 0:
+                ok, fetched = self._fetch(api, symbol, missing_from, end)
+                if ok:
+                    done = fetched['date'] <= np.datetime64(settled)
+                    bars, fresh = merge_bars(bars, fetched[done]), fetched[~done]
+                    meta['through'] = max(through, min(end, settled)).isoformat()
+                    changed = True
+            if changed:
+                self._save(symbol, bars, meta)
+
+        if len(fresh):
+            bars = merge_bars(bars, fresh)
+        window = bars[(bars['date'] >= np.datetime64(start)) & (bars['date'] <= np.datetime64(end))]
+        self._count(bars_from_disk=max(len(window) - len(fresh), 0))
+        return window
+
+    def get_frame(self, api, symbol, period_days=185, end_date=None):
+        """Same as get_bars, as a DataFrame with 'Date', 'Open', 'High', 'Low', 'Close', 'Volume'."""
+        return bars_to_frame(self.get_bars(api, symbol, period_days, end_date))
+
+    def stats(self):
+        """
+        Returns usage counters, including the calls and bytes the store saved
+        compared with re-downloading every requested window.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        bytes_per_bar = stats['bytes_downloaded'] / stats['bars_downloaded'] if stats['bars_downloaded'] else 0
+        stats['calls_saved'] = max(stats['requests'] - stats['upstream_calls'], 0)
+        stats['bytes_saved'] = int(stats['bars_from_disk'] * bytes_per_bar)
+        return stats
+
+
+history_store = HistoryStore()
+history_cli = AppGroup('history', help='Manage the local price-history store.')
+
+
+@history_cli.command('backfill')
+@click.argument('symbols', nargs=-1, required=True)
+@click.option('--days', default=366, show_default=True, help='Calendar days of history to keep.')
+@click.option('--api-key', envvar='TRADIER_API_KEY', required=True, help='Tradier API key (or TRADIER_API_KEY).')
+@click.option('--workers', default=8, show_default=True, help='Concurrent downloads.')
+def backfill(symbols, days, api_key, workers):
+    """Downloads missing daily bars for SYMBOLS into the local store."""
+    from .tradier_api import TradierAPI
+    api = TradierAPI(api_key=api_key, account_number=None, use_cache=False)
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        counts = pool.map(lambda s: (s, len(history_store.get_bars(api, s, period_days=days))), symbols)
+        for symbol, count in counts:
+            click.echo(f"{symbol}: {count} bars")
+    stats = history_store.stats()
+    click.echo(f"Upstream calls: {stats['upstream_calls']}, calls saved: {stats['calls_saved']}, "
+               f"downloaded: {stats['bytes_downloaded']} bytes, served from disk: {stats['bytes_saved']} bytes")
@@ -0,0 +1,121 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class TradierTransport:
+    """
+    Process-wide HTTP transport shared by every TradierAPI client.
+
+    One pooled, keep-alive requests.Session is kept per worker process and is
+    shared across users; the only per-user state is the Authorization header,
+    which is sent with each request rather than baked into the session.
+    """
+    DEFAULTS = {
+        'TRADIER_BASE_URL': 'https://sandbox.tradier.com/v1',
+        'TRADIER_POOL_CONNECTIONS': 4,
+        'TRADIER_POOL_MAXSIZE': 16,
+        'TRADIER_CONNECT_TIMEOUT': 3.05,
+        'TRADIER_READ_TIMEOUT': 10.0,
+        'TRADIER_MAX_RETRIES': 3,
+        'TRADIER_BACKOFF_FACTOR': 0.3,
+    }
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._lock = threading.Lock()
+        self._session = None
+        self._adapter = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Reads pool, timeout and retry settings from the app config (or the environment)."""
+        for key, default in self.DEFAULTS.items():
+            app.config.setdefault(key, type(default)(os.environ.get(key, default)))
+            self._settings[key] = app.config[key]
+        self.reset()
+
+    @property
+    def base_url(self):
+        return self._settings['TRADIER_BASE_URL']
+
+    @property
+    def timeout(self):
+        return (self._settings['TRADIER_CONNECT_TIMEOUT'], self._settings['TRADIER_READ_TIMEOUT'])
+
+    @property
+    def session(self):
+        """
+        Returns the session for the current process.
+
+        Sessions are rebuilt after a fork so gunicorn workers never share
+        sockets inherited from a preloading master.
+        """
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session, self._adapter = self._build_session()
+                    self._pid = os.getpid()
+        return self._session
+
+    def _build_session(self):
+        # Only idempotent reads are retried; order POSTs must never be replayed.
+        retry = Retry(
+            total=self._settings['TRADIER_MAX_RETRIES'],
+            backoff_factor=self._settings['TRADIER_BACKOFF_FACTOR'],
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self._settings['TRADIER_POOL_CONNECTIONS'],
+            pool_maxsize=self._settings['TRADIER_POOL_MAXSIZE'],
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session, adapter
+
+    def request(self, method, url, **kwargs):
+        """Sends a request through the pooled session, applying the default timeout."""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def stats(self):
+        """
+        Returns connection counters for the current process.
+
+        Returns:
+            dict: 'requests' sent, 'connections_opened' (new TCP/TLS handshakes)
+                  and 'connections_reused' (requests served on a kept-alive socket).
+        """
+        requests_sent, opened = 0, 0
+        if self._adapter is not None and self._pid == os.getpid():
+            pools = self._adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    requests_sent += pool.num_requests
+                    opened += pool.num_connections
+        return {
+            'requests': requests_sent,
+            'connections_opened': opened,
+            'connections_reused': max(requests_sent - opened, 0)
+        }
+
+    def reset(self):
+        """Closes the current session; the next request opens a fresh pool."""
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session, self._adapter, self._pid = None, None, None
+
+
+transport = TradierTransport()
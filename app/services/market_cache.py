@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+
+class MemoryBackend:
+    """A bounded, thread-safe LRU map whose entries carry their own expiry time."""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns (value, status) where status is 'hit', 'miss' or 'expired'."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, 'miss'
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None, 'expired'
+            self._entries.move_to_end(key)
+            return value, 'hit'
+
+    def set(self, key, value, ttl):
+        """Stores a value and returns how many entries were evicted to make room."""
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MongoBackend:
+    """
+    Shares cached payloads across gunicorn workers through a Mongo collection.
+
+    Entries are removed by a TTL index on 'expires_at'; reads also check the
+    expiry because Mongo's TTL monitor only runs about once a minute.
+    """
+    def __init__(self, collection):
+        self._collection = collection
+        self._collection.create_index('expires_at', expireAfterSeconds=0)
+
+    def get(self, key):
+        doc = self._collection.find_one({'_id': key})
+        if doc is None:
+            return None, 'miss'
+        if doc['expires_at'].replace(tzinfo=timezone.utc) <= datetime.now(timezone.utc):
+            return None, 'expired'
+        return doc['value'], 'hit'
+
+    def set(self, key, value, ttl):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        self._collection.replace_one({'_id': key}, {'_id': key, 'value': value, 'expires_at': expires_at}, upsert=True)
+        return 0
+
+    def clear(self):
+        self._collection.delete_many({})
+
+
+class MarketDataCache:
+    """
+    TTL + LRU cache for Tradier market-data responses.
+
+    Only user-independent market data goes through here (history, expirations,
+    chains, quotes), keyed by endpoint and parameters. Account and order
+    endpoints never touch the cache. Cached payloads are shared between
+    callers and must be treated as read-only.
+    """
+    DEFAULTS = {
+        'MARKET_CACHE_ENABLED': True,
+        'MARKET_CACHE_BACKEND': 'memory',
+        'MARKET_CACHE_MAX_ENTRIES': 2048,
+        'MARKET_CACHE_TTL_HISTORY': 3600,
+        'MARKET_CACHE_TTL_EXPIRATIONS': 21600,
+        'MARKET_CACHE_TTL_CHAINS': 15,
+        'MARKET_CACHE_TTL_QUOTES': 5,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._local = MemoryBackend(self._settings['MARKET_CACHE_MAX_ENTRIES'])
+        self._shared = None
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Reads TTLs, size and backend from the app config (or the environment)."""
+        for key, default in self.DEFAULTS.items():
+            value = os.environ.get(key, default)
+            if isinstance(default, bool) and isinstance(value, str):
+                value = value.lower() in ('1', 'true', 'yes')
+            app.config.setdefault(key, type(default)(value))
+            self._settings[key] = app.config[key]
+        self._local = MemoryBackend(self._settings['MARKET_CACHE_MAX_ENTRIES'])
+        self._shared = None
+        if self._settings['MARKET_CACHE_BACKEND'] == 'mongo':
+            from app import mongo
+            try:
+                self._shared = MongoBackend(mongo.db.market_cache)
+            except Exception as e:
+                print(f"Shared market cache unavailable, using per-worker memory only: {e}")
+
+    @property
+    def enabled(self):
+        return self._settings['MARKET_CACHE_ENABLED']
+
+    def ttl_for(self, endpoint_name):
+        return self._settings.get(f"MARKET_CACHE_TTL_{endpoint_name.upper()}", 0)
+
+    @staticmethod
+    def make_key(endpoint_name, params):
+        return endpoint_name + '?' + '&'.join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+
+    def _count(self, endpoint_name, event, amount=1):
+        with self._stats_lock:
+            counters = self._stats.setdefault(endpoint_name, {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0})
+            counters[event] += amount
+
+    def _lookup(self, key):
+        value, status = self._local.get(key)
+        if status == 'hit' or self._shared is None:
+            return value, status
+        try:
+            value, shared_status = self._shared.get(key)
+        except Exception as e:
+            print(f"Shared market cache read failed: {e}")
+            return None, status
+        if shared_status == 'hit':
+            # Promote into the local LRU for the remainder of a short window.
+            self._local.set(key, value, min(self.ttl_for(key.split('?', 1)[0]), 5))
+        return value, shared_status
+
+    def get_or_fetch(self, endpoint_name, params, fetch):
+        """
+        Returns the cached payload for an endpoint/params pair, calling fetch() on a miss.
+
+        Args:
+            endpoint_name (str): 'history', 'expirations', 'chains' or 'quotes'.
+            params (dict): The request parameters; part of the cache key.
+            fetch (callable): Performs the upstream request.
+
+        Returns:
+            The (possibly cached) response payload. Failed fetches (None) are not cached.
+        """
+        ttl = self.ttl_for(endpoint_name)
+        if not self.enabled or ttl <= 0:
+            return fetch()
+
+        key = self.make_key(endpoint_name, params)
+        value, status = self._lookup(key)
+        if status == 'hit':
+            self._count(endpoint_name, 'hits')
+            return value
+        self._count(endpoint_name, 'expired' if status == 'expired' else 'misses')
+
+        value = fetch()
+        if value is not None:
+            evicted = self._local.set(key, value, ttl)
+            if evicted:
+                self._count(endpoint_name, 'evictions', evicted)
+            if self._shared is not None:
+                try:
+                    self._shared.set(key, value, ttl)
+                except Exception as e:
+                    print(f"Shared market cache write failed: {e}")
+        return value
+
+    def stats(self):
+        """Returns hit/miss/expired/eviction counters per endpoint plus the local entry count."""
+        with self._stats_lock:
+            stats = {name: dict(counters) for name, counters in self._stats.items()}
+        stats['entries'] = len(self._local)
+        return stats
+
+    def clear(self):
+        self._local.clear()
+        if self._shared is not None:
+            self._shared.clear()
+
+
+market_cache = MarketDataCache()
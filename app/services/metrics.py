@@ -0,0 +1,410 @@
+import atexit
+import contextvars
+import functools
+import glob
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+from flask import Response, g, request
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Spans recorded while handling the current request: (kind, name, seconds).
+_spans = contextvars.ContextVar('request_spans', default=None)
+
+
+def traced(fn):
+    """
+    Wraps fn to run in a copy of the caller's context, so Tradier and Mongo
+    calls it makes on a pool thread still land in the caller's request spans.
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def record_span(kind, name, seconds):
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((kind, name, seconds))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Histogram:
+    """A labelled Prometheus histogram with fixed buckets."""
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name, self.help_text, self.label_names, self.buckets = name, help_text, label_names, buckets
+        self.reset()
+
+    def reset(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def snapshot(self):
+        """The series as JSON-ready [labels, [bucket counts, count, sum]] pairs."""
+        with self._lock:
+            return [[list(labels), [[*counts], count, total]] for labels, (counts, count, total) in self._series.items()]
+
+    def render(self, snapshots):
+        """Renders the sum of several snapshot() results, one per process."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        merged = {}
+        for series in snapshots:
+            for labels, (counts, count, total) in series:
+                into = merged.setdefault(tuple(labels), [[0] * len(self.buckets), 0, 0.0])
+                into[0] = [a + b for a, b in zip(into[0], counts)]
+                into[1] += count
+                into[2] += total
+        for labels, (counts, count, total) in sorted(merged.items()):
+            base = _labels(self.label_names, labels)
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{base}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {count}')
+        return lines
+
+
+class Counter:
+    """A labelled Prometheus counter."""
+    def __init__(self, name, help_text, label_names):
+        self.name, self.help_text, self.label_names = name, help_text, label_names
+        self.reset()
+
+    def reset(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self):
+        """The series as JSON-ready [labels, value] pairs."""
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def render(self, snapshots):
+        """Renders the sum of several snapshot() results, one per process."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        merged = {}
+        for series in snapshots:
+            for labels, value in series:
+                merged[tuple(labels)] = merged.get(tuple(labels), 0) + value
+        lines += [f'{self.name}{{{_labels(self.label_names, labels)}}} {value}' for labels, value in sorted(merged.items())]
+        return lines
+
+
+class _MongoListener(monitoring.CommandListener):
+    def __init__(self, metrics):
+        self._metrics = metrics
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else '')
+
+    def _finish(self, event, failed):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), '')
+        self._metrics.observe_mongo(event.command_name, collection, event.duration_micros / 1e6, failed)
+
+    def succeeded(self, event):
+        self._finish(event, False)
+
+    def failed(self, event):
+        self._finish(event, True)
+
+
+class Metrics:
+    """
+    Request tracing and a Prometheus /metrics endpoint.
+
+    Records per-route latency, every Tradier call (by endpoint, with its
+    status) and every Mongo command (by command and collection), and exports
+    the counters the caches, rate limiter and stores already keep, with hit
+    ratios. With METRICS_SPAN_LOG on, each request also logs its Tradier and
+    Mongo spans, slowest first, so the call that dominates a page is obvious.
+
+    Numbers are recorded per process. With METRICS_DIR set (gunicorn.conf.py
+    sets it), each process also writes them to its own JSON file there every
+    METRICS_FLUSH_INTERVAL seconds and at exit, and a scrape adds up every
+    file, so whichever worker answers reports the whole app. Request, Tradier
+    and Mongo series keep the files of exited workers, so they never go
+    backwards when a worker is recycled; component stats are summed over the
+    live workers only. Streamed responses (SSE, NDJSON) are timed when the
+    stream closes, not when the view returns. Set METRICS_TOKEN to require
+    `Authorization: Bearer <token>` on /metrics.
+    """
+    DEFAULTS = {
+        'METRICS_ENABLED': True,
+        'METRICS_SPAN_LOG': False,
+        'METRICS_SPAN_LOG_MIN_MS': 0.0,
+        'METRICS_TOKEN': '',
+        'METRICS_DIR': '',
+        'METRICS_FLUSH_INTERVAL': 5.0,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._collectors = {}
+        self._listener = None
+        self._path = None
+        self._flusher_pid = None
+        self._flusher_lock = threading.Lock()
+        self.http = Histogram('http_request_duration_seconds', 'Time spent handling requests, by route.',
+                              ('endpoint', 'method', 'status'))
+        self.tradier = Histogram('tradier_request_duration_seconds', 'Tradier API call latency, by endpoint.',
+                                 ('endpoint', 'method'))
+        self.tradier_calls = Counter('tradier_requests_total', 'Tradier API calls, by endpoint and HTTP status '
+                                     '("error" when no response arrived).', ('endpoint', 'method', 'status'))
+        self.mongo = Histogram('mongo_command_duration_seconds', 'MongoDB command latency.', ('command', 'collection'),
+                               buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+        self.mongo_failures = Counter('mongo_command_failures_total', 'Failed MongoDB commands.', ('command', 'collection'))
+        self._series = (self.http, self.tradier, self.tradier_calls, self.mongo, self.mongo_failures)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Must run before mongo.init_app so the command listener sees the client being created."""
+        for key, default in self.DEFAULTS.items():
+            value = os.environ.get(key, default)
+            if isinstance(default, bool) and isinstance(value, str):
+                value = value.lower() in ('1', 'true', 'yes')
+            app.config.setdefault(key, type(default)(value))
+            self._settings[key] = app.config[key]
+        if not self._settings['METRICS_ENABLED']:
+            return
+        if self._settings['METRICS_DIR']:
+            os.makedirs(self._settings['METRICS_DIR'], exist_ok=True)
+        if self._listener is None:
+            self._listener = _MongoListener(self)
+            monitoring.register(self._listener)
+            os.register_at_fork(after_in_child=self._after_fork)
+            atexit.register(self.flush)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.view)
+
+    @property
+    def enabled(self):
+        return self._settings['METRICS_ENABLED']
+
+    def register_stats(self, component, stats):
+        """Exports a component's stats() counters as gauges on every scrape."""
+        self._collectors[component] = stats
+
+    # --- Recording ---
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_spans = []
+        _spans.set(g.metrics_spans)
+
+    def _finish_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        spans = g.pop('metrics_spans', [])
+        _spans.set(None)
+        labels = (request.endpoint or 'unmatched', request.method, str(response.status_code))
+        line = f"{request.method} {request.path} {response.status_code}"
+        if response.is_streamed:
+            # The body is still to be generated; time the whole stream instead.
+            response.call_on_close(lambda: self._observe_request(labels, line, started, spans))
+        else:
+            self._observe_request(labels, line, started, spans)
+        return response
+
+    def _observe_request(self, labels, line, started, spans):
+        elapsed = time.perf_counter() - started
+        self.http.observe(labels, elapsed)
+        self._start_flusher()
+        if (self._settings['METRICS_SPAN_LOG'] and labels[0] != 'metrics'
+                and elapsed * 1000 >= self._settings['METRICS_SPAN_LOG_MIN_MS']):
+            detail = '; '.join(f"{kind} {name} {seconds * 1000:.1f} ms"
+                               for kind, name, seconds in sorted(spans, key=lambda s: -s[2]))
+            print(f"[span] {line} {elapsed * 1000:.1f} ms" + (f" | {detail}" if detail else ''))
+
+    def observe_tradier(self, method, endpoint, seconds, status):
+        """Records one Tradier call; endpoint is the path, account and order ids are folded out."""
+        endpoint = endpoint_label(endpoint)
+        self.tradier.observe((endpoint, method), seconds)
+        self.tradier_calls.inc((endpoint, method, str(status)))
+        self._start_flusher()
+        record_span('tradier', f"{method} {endpoint}", seconds)
+
+    def observe_mongo(self, command, collection, seconds, failed=False):
+        self.mongo.observe((command, collection), seconds)
+        if failed:
+            self.mongo_failures.inc((command, collection))
+        self._start_flusher()
+        record_span('mongo', f"{command} {collection}".strip(), seconds)
+
+    # --- Sharing across workers ---
+
+    def _after_fork(self):
+        # A preloaded master's numbers stay in its own file; children start from zero.
+        for metric in self._series:
+            metric.reset()
+        self._path = None
+        self._flusher_pid = None
+        self._flusher_lock = threading.Lock()
+
+    def _file(self):
+        if self._path is None:
+            # The random suffix keeps a reused pid from overwriting an exited worker's file.
+            self._path = os.path.join(self._settings['METRICS_DIR'], f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json")
+        return self._path
+
+    def _start_flusher(self):
+        if not self._settings['METRICS_DIR'] or self._flusher_pid == os.getpid():
+            return
+        with self._flusher_lock:
+            if self._flusher_pid != os.getpid():
+                self._flusher_pid = os.getpid()
+                threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self._settings['METRICS_FLUSH_INTERVAL'])
+            self.flush()
+
+    def flush(self):
+        """Writes this process's numbers to its file in METRICS_DIR (a no-op without one)."""
+        if not self._settings['METRICS_DIR']:
+            return
+        path = self._file()
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self._snapshot(), f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Could not write metrics to {path}: {e}")
+
+    def _snapshot(self):
+        return {'pid': os.getpid(),
+                'series': {metric.name: metric.snapshot() for metric in self._series},
+                'stats': self._collect_stats()}
+
+    def _snapshots(self):
+        """This process's live numbers plus the last file written by every other process."""
+        snapshots = [dict(self._snapshot(), live=True)]
+        if not self._settings['METRICS_DIR']:
+            return snapshots
+        own = self._file()
+        for path in glob.glob(os.path.join(self._settings['METRICS_DIR'], '*.json')):
+            if path == own:
+                continue
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshots.append(dict(snapshot, live=_pid_alive(snapshot['pid'])))
+        return snapshots
+
+    # --- Export ---
+
+    def _collect_stats(self):
+        """{component: {group: {stat: number}}} from every registered stats() callable."""
+        collected = {}
+        for component, stats in sorted(self._collectors.items()):
+            try:
+                stats = stats()
+            except Exception as e:
+                print(f"Could not collect {component} stats for /metrics: {e}")
+                continue
+            groups = [('', stats)] + [(name, value) for name, value in stats.items() if isinstance(value, dict)]
+            collected[component] = {
+                group: {k: v for k, v in counters.items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+                for group, counters in groups
+            }
+        return collected
+
+    def _stat_lines(self, snapshots):
+        merged = {}
+        for snapshot in snapshots:
+            if not snapshot['live']:
+                continue
+            for component, groups in snapshot['stats'].items():
+                for group, numbers in groups.items():
+                    into = merged.setdefault(component, {}).setdefault(group, {})
+                    for stat, value in numbers.items():
+                        into[stat] = into.get(stat, 0) + value
+        values, ratios = [], []
+        for component, groups in sorted(merged.items()):
+            for group, numbers in sorted(groups.items()):
+                for stat, value in sorted(numbers.items()):
+                    values.append(f'app_component_stat{{component="{component}",group="{_escape(group)}",'
+                                  f'stat="{stat}"}} {value}')
+                if 'hits' in numbers and 'misses' in numbers:
+                    lookups = numbers['hits'] + numbers['misses'] + numbers.get('expired', 0)
+                    if lookups:
+                        ratios.append(f'app_cache_hit_ratio{{component="{component}",group="{_escape(group)}"}} '
+                                      f'{numbers["hits"] / lookups:.4f}')
+        return (['# HELP app_component_stat Counters reported by caches, limiters and stores, summed over live workers.',
+                 '# TYPE app_component_stat gauge'] + values +
+                ['# HELP app_cache_hit_ratio Hits over lookups across the live workers.',
+                 '# TYPE app_cache_hit_ratio gauge'] + ratios)
+
+    def render(self):
+        snapshots = self._snapshots()
+        lines = []
+        for metric in self._series:
+            lines += metric.render([snapshot['series'].get(metric.name, []) for snapshot in snapshots])
+        lines += self._stat_lines(snapshots)
+        return '\n'.join(lines) + '\n'
+
+    def view(self):
+        token = self._settings['METRICS_TOKEN']
+        if token and request.headers.get('Authorization') != f"Bearer {token}":
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+_ACCOUNT = re.compile(r'/accounts/[^/]+')
+_ID = re.compile(r'/(orders|watchlists)/[^/]+')
+
+
+def endpoint_label(endpoint):
+    """'/accounts/VA123/orders/42' -> '/accounts/{account}/orders/{id}', keeping label cardinality fixed."""
+    return _ID.sub(r'/\1/{id}', _ACCOUNT.sub('/accounts/{account}', endpoint))
+
+
+metrics = Metrics()
@@ -0,0 +1,169 @@
+import numpy as np
+
+NUMERIC_FIELDS = ('strike', 'bid', 'ask', 'last', 'open_interest', 'volume')
+GREEK_FIELDS = ('delta', 'gamma', 'theta', 'vega', 'mid_iv')
+OPTION_TYPES = ('call', 'put')
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class OptionChain:
+    """
+    Column-oriented option chain with sorted indexes for fast lookups.
+
+    Every field is a NumPy array (strike, bid, ask, last, open_interest, volume
+    and the greeks when Tradier sent them). Each option type keeps its rows
+    sorted by strike and by delta, so "nearest strike", "the 0.20-delta put"
+    and "strikes between A and B" are binary searches instead of scans over
+    the list of option dicts.
+    """
+    def __init__(self, symbols, option_types, columns):
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.option_types = np.asarray(option_types, dtype=object)
+        self.columns = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        self.mid = (self.columns['bid'] + self.columns['ask']) / 2
+        self.all_strikes = np.unique(self.columns['strike'][~np.isnan(self.columns['strike'])])
+
+        self._by_strike = {}
+        strike = self.columns['strike']
+        for option_type in OPTION_TYPES:
+            rows = np.flatnonzero(self.option_types == option_type)
+            rows = rows[~np.isnan(strike[rows])]
+            ordered = rows[np.argsort(strike[rows], kind='stable')]
+            self._by_strike[option_type] = (strike[ordered], ordered)
+        self._index_deltas()
+
+    def _index_deltas(self):
+        self._by_delta = {}
+        delta = self.columns['delta']
+        for option_type in OPTION_TYPES:
+            rows = np.sort(self._by_strike[option_type][1])
+            rows = rows[~np.isnan(delta[rows])]
+            ordered = rows[np.argsort(delta[rows], kind='stable')]
+            self._by_delta[option_type] = (delta[ordered], ordered)
+
+    @classmethod
+    def from_response(cls, chain_data):
+        """
+        Builds a chain from a /markets/options/chains payload.
+
+        Returns:
+            OptionChain or None: None when the payload holds no options.
+        """
+        if not chain_data or not chain_data.get('options') or chain_data['options'] == 'null':
+            return None
+        options = chain_data['options'].get('option')
+        if not options:
+            return None
+        options = options if isinstance(options, list) else [options]
+
+        columns = {name: [] for name in NUMERIC_FIELDS + GREEK_FIELDS}
+        symbols, option_types = [], []
+        for opt in options:
+            symbols.append(opt.get('symbol'))
+            option_types.append(opt.get('option_type'))
+            for name in NUMERIC_FIELDS:
+                columns[name].append(_to_float(opt.get(name)))
+            greeks = opt.get('greeks') or {}
+            for name in GREEK_FIELDS:
+                columns[name].append(_to_float(greeks.get(name)))
+        return cls(symbols, option_types, columns)
+
+    def update_columns(self, columns):
+        """Replaces or adds per-row columns (e.g. computed greeks) and re-indexes deltas."""
+        for name, values in columns.items():
+            self.columns[name] = np.asarray(values, dtype=float)
+        if 'delta' in columns:
+            self._index_deltas()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def strikes(self, option_type=None):
+        """Sorted unique strikes, for one option type or the whole chain."""
+        if option_type is None:
+            return self.all_strikes
+        return np.unique(self._by_strike[option_type][0])
+
+    def contracts(self, rows):
+        """Returns the given rows as plain dicts, gathering each column once."""
+        rows = np.asarray(rows, dtype=int)
+        fields = dict(self.columns, mid=self.mid, symbol=self.symbols, option_type=self.option_types)
+        names = list(fields)
+        values = [fields[name][rows].tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def contract(self, row):
+        """Returns one row as a plain dict."""
+        return self.contracts([row])[0]
+
+    def _strike_array(self, option_type):
+        return self.all_strikes if option_type is None else self._by_strike[option_type][0]
+
+    def nearest_strike(self, price, option_type=None):
+        """Listed strike closest to price (the lower one on a tie), or None for an empty chain."""
+        strikes = self._strike_array(option_type)
+        if not len(strikes):
+            return None
+        i = np.searchsorted(strikes, price)
+        if i == 0:
+            return float(strikes[0])
+        if i == len(strikes):
+            return float(strikes[-1])
+        below, above = strikes[i - 1], strikes[i]
+        return float(below if price - below <= above - price else above)
+
+    def strike_below(self, price, option_type=None):
+        """Highest listed strike strictly below price."""
+        strikes = self._strike_array(option_type)
+        i = np.searchsorted(strikes, price, side='left')
+        return float(strikes[i - 1]) if i > 0 else None
+
+    def strike_above(self, price, option_type=None):
+        """Lowest listed strike strictly above price."""
+        strikes = self._strike_array(option_type)
+        i = np.searchsorted(strikes, price, side='right')
+        return float(strikes[i]) if i < len(strikes) else None
+
+    def find(self, option_type, strike):
+        """Returns the contract for an exact (type, strike), or None."""
+        strikes, rows = self._by_strike[option_type]
+        i = np.searchsorted(strikes, strike)
+        if i < len(strikes) and np.isclose(strikes[i], strike):
+            return self.contract(rows[i])
+        return None
+
+    def between(self, low, high, option_type=None):
+        """All contracts with low <= strike <= high, ordered by strike."""
+        types = OPTION_TYPES if option_type is None else (option_type,)
+        found = []
+        for t in types:
+            strikes, rows = self._by_strike[t]
+            found.append(rows[np.searchsorted(strikes, low, 'left'):np.searchsorted(strikes, high, 'right')])
+        found = np.concatenate(found)
+        found = found[np.argsort(self.columns['strike'][found], kind='stable')]
+        return self.contracts(found)
+
+    def nearest_delta(self, target, option_type):
+        """
+        Returns the contract whose delta is closest to target. Puts are matched on
+        the absolute delta, so nearest_delta(0.20, 'put') finds the -0.20 put.
+        """
+        deltas, rows = self._by_delta[option_type]
+        if not len(deltas):
+            return None
+        target = -abs(target) if option_type == 'put' else abs(target)
+        i = np.searchsorted(deltas, target)
+        candidates = [j for j in (i - 1, i) if 0 <= j < len(deltas)]
+        best = min(candidates, key=lambda j: abs(deltas[j] - target))
+        return self.contract(rows[best])
+
+
+def load_option_chain(api, symbol, expiration, greeks=True):
+    """Fetches a chain through the (market-cached) API and indexes it."""
+    return OptionChain.from_response(api.get_option_chain(symbol, expiration, greeks=greeks))
@@ -0,0 +1,338 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+from pymongo import UpdateOne
+
+from .spread_pricing import FINAL_ORDER_STATUSES
+
+# Account activity kept in the mirror; cash movements, dividends and fees are skipped.
+HISTORY_EVENT_TYPES = ('trade', 'option')
+
+
+def _as_list(value):
+    """Tradier returns a bare object for one item and 'null' for none."""
+    if not value or value == 'null':
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _parse_date(value):
+    """ISO timestamp from Tradier -> naive UTC datetime, the way Mongo hands dates back."""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _label(value):
+    return str(value).replace('_', ' ').title() if value else None
+
+
+def order_key(user_id, order_id):
+    return f"{user_id}:order:{int(order_id):012d}"
+
+
+def order_entry(user_id, order):
+    """Mirror document for one order from /accounts/{id}/orders."""
+    fill_price = _float(order.get('avg_fill_price'))
+    return {
+        '_id': order_key(user_id, order['id']),
+        'user_id': user_id,
+        'kind': 'order',
+        'source_id': int(order['id']),
+        'date': _parse_date(order['create_date']),
+        'symbol': order.get('symbol'),
+        'type': ' '.join(filter(None, [_label(order.get('class')), _label(order.get('type'))])),
+        'side': _label(order.get('side') or order.get('strategy')),
+        'quantity': _float(order.get('quantity')),
+        'price': fill_price or _float(order.get('price')),
+        'status': order.get('status'),
+        'description': None
+    }
+
+
+def fill_entries(user_id, events):
+    """
+    Mirror documents for the trade and option events of /accounts/{id}/history.
+
+    History events carry no id, so each one is keyed by a digest of its
+    content plus its position among identical events. Re-reading a day gives
+    the same keys, which makes overlapping syncs idempotent.
+    """
+    seen, entries = {}, []
+    for event in events:
+        if event.get('type') not in HISTORY_EVENT_TYPES:
+            continue
+        detail = event.get(event['type']) or {}
+        digest = hashlib.sha1(json.dumps(event, sort_keys=True).encode()).hexdigest()
+        seen[digest] = seen.get(digest, -1) + 1
+        quantity = _float(detail.get('quantity'))
+        entries.append({
+            '_id': f"{user_id}:fill:{digest}:{seen[digest]}",
+            'user_id': user_id,
+            'kind': 'fill',
+            'source_id': None,
+            'date': _parse_date(event['date']),
+            'symbol': detail.get('symbol'),
+            'type': _label(detail.get('trade_type') or detail.get('option_type')),
+            'side': 'Buy' if quantity and quantity > 0 else 'Sell',
+            'quantity': abs(quantity) if quantity is not None else None,
+            'price': _float(detail.get('price')),
+            'status': 'filled' if event['type'] == 'trade' else _label(detail.get('option_type')),
+            'description': detail.get('description')
+        })
+    return entries
+
+
+def encode_cursor(entry):
+    raw = f"{entry['date'].isoformat()}|{entry['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (date, _id) for a cursor from encode_cursor, or None if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        when, entry_id = raw.split('|', 1)
+        return datetime.fromisoformat(when), entry_id
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+class OrderHistory:
+    """
+    Mirrors each user's Tradier orders and fills into the 'order_history' collection.
+
+    Syncs are incremental and run on a small background pool, one per user at
+    a time, so opening the history page never waits on Tradier. Orders are
+    read newest first, and paging stops at the first page that holds nothing
+    above the last order id seen, so a sync costs O(new orders). Orders still
+    open when mirrored are kept in a small per-user set, and each sync
+    re-checks just those by id until they settle. The id cursor never has to
+    rewind for them. Fills are re-read from the last day synced. Pages are served from Mongo with keyset
+    (date, _id) cursors on the (user_id, date) and (user_id, symbol) indexes,
+    so page 500 of a ten-year account costs the same as page 1 of a new one.
+    """
+    DEFAULTS = {
+        'ORDER_HISTORY_PAGE_SIZE': 50,
+        'ORDER_HISTORY_SYNC_INTERVAL': 60,
+        'ORDER_HISTORY_FETCH_LIMIT': 500,
+        'ORDER_HISTORY_SYNC_WORKERS': 2,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._entries = None
+        self._state = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._inflight = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            app.config.setdefault(key, type(default)(os.environ.get(key, default)))
+            self._settings[key] = app.config[key]
+        self._executor = None
+
+    def _pool(self):
+        # Created on first use so a preloading master never forks with live workers.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._settings['ORDER_HISTORY_SYNC_WORKERS'],
+                                                thread_name_prefix='history-sync')
+        return self._executor
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            from app import mongo
+            self._entries = mongo.db.order_history
+            self._entries.create_index([('user_id', 1), ('date', -1), ('_id', -1)])
+            self._entries.create_index([('user_id', 1), ('symbol', 1), ('date', -1), ('_id', -1)])
+        return self._entries
+
+    @property
+    def state(self):
+        if self._state is None:
+            from app import mongo
+            self._state = mongo.db.order_history_sync
+        return self._state
+
+    # --- Sync ---
+
+    def sync_in_background(self, api, user_id, account_number):
+        """
+        Starts sync() for the user on the sync pool unless one is already
+        running or the last one is younger than ORDER_HISTORY_SYNC_INTERVAL.
+
+        Returns:
+            bool: True while a sync for the user is in flight.
+        """
+        state = self.state.find_one({'_id': user_id}) or {}
+        if not self._due(state, account_number):
+            return False
+        with self._lock:
+            future = self._inflight.get(user_id)
+            if future is None or future.done():
+                future = self._inflight[user_id] = self._pool().submit(self._sync, api, user_id, account_number)
+            return not future.done()
+
+    def _sync(self, api, user_id, account_number):
+        try:
+            return self.sync(api, user_id, account_number)
+        except Exception as e:
+            print(f"Order history sync for {user_id} failed: {e}")
+            return None
+
+    def sync(self, api, user_id, account_number, force=False):
+        """
+        Pulls orders and fills added since the last sync.
+
+        Args:
+            api (TradierAPI): Client for the user's account.
+            user_id (str): Owner of the mirrored entries.
+            account_number (str): The account the mirror belongs to; a change starts it over.
+            force (bool): Sync even if the last one was less than ORDER_HISTORY_SYNC_INTERVAL ago.
+
+        Returns:
+            int: Entries written, or None if the sync was skipped or Tradier did not answer.
+        """
+        state = self.state.find_one({'_id': user_id}) or {}
+        if state and state.get('account_number') != account_number:
+            self.entries.delete_many({'user_id': user_id})
+            state = {}
+        if not force and not self._due(state, account_number):
+            return None
+
+        orders = self._fetch_orders(api, state.get('orders_through', 0))
+        fills = self._fetch_fills(api, state.get('fills_through'))
+        if orders is None or fills is None:
+            return None
+        fetched = {int(o['id']) for o in orders}
+        rechecked, still_open = self._recheck_open_orders(
+            api, [i for i in state.get('open_order_ids', []) if i not in fetched])
+
+        entries = [order_entry(user_id, o) for o in orders] + fill_entries(user_id, fills)
+        writes = [UpdateOne({'_id': e['_id']}, {'$set': {k: v for k, v in e.items() if k != '_id'}}, upsert=True)
+                  for e in entries]
+        # A re-checked order only changes its status and, once filled, its price.
+        writes += [UpdateOne({'_id': order_key(user_id, o['id'])}, {'$set': {
+            k: v for k, v in (('status', o.get('status')), ('price', _float(o.get('avg_fill_price')))) if v}})
+            for o in rechecked]
+        if writes:
+            self.entries.bulk_write(writes, ordered=False)
+
+        open_ids = still_open + [int(o['id']) for o in orders + rechecked
+                                 if o.get('status') not in FINAL_ORDER_STATUSES]
+        fill_days = [e['date'].date().isoformat() for e in entries if e['kind'] == 'fill']
+        self.state.update_one({'_id': user_id}, {'$set': {
+            'account_number': account_number,
+            'orders_through': max(list(fetched) + [state.get('orders_through', 0)]),
+            'open_order_ids': sorted(set(open_ids)),
+            'fills_through': max(fill_days + [state.get('fills_through') or '']) or None,
+            'synced_at': _utcnow()
+        }}, upsert=True)
+        return len(entries) + len(rechecked)
+
+    def _due(self, state, account_number):
+        synced_at = state.get('synced_at')
+        return not synced_at or state.get('account_number') != account_number or \
+            (_utcnow() - synced_at).total_seconds() >= self._settings['ORDER_HISTORY_SYNC_INTERVAL']
+
+    def _fetch_orders(self, api, through):
+        """Orders with an id above `through`, paging newest first until a page has none."""
+        limit, page, orders = self._settings['ORDER_HISTORY_FETCH_LIMIT'], 1, []
+        while True:
+            data = api.get_orders(page=page, limit=limit)
+            if data is None:
+                print(f"Order history sync stopped: no response for orders page {page}")
+                return None
+            batch = _as_list((data.get('orders') or {}).get('order') if isinstance(data.get('orders'), dict) else None)
+            new = [o for o in batch if int(o['id']) > through]
+            orders.extend(new)
+            if len(batch) < limit or not new:
+                return orders
+            page += 1
+
+    def _recheck_open_orders(self, api, order_ids):
+        """
+        Current state of orders that were open at the last sync.
+
+        Returns:
+            tuple: (orders Tradier answered for, ids it did not answer for, kept for the next sync).
+        """
+        orders, unanswered = [], []
+        for order_id in order_ids:
+            data = api.get_order(order_id)
+            order = data.get('order') if isinstance(data, dict) else None
+            if isinstance(order, dict) and order.get('status'):
+                orders.append(dict(order, id=order_id))
+            else:
+                unanswered.append(order_id)
+        return orders, unanswered
+
+    def _fetch_fills(self, api, through):
+        """Trade and option events from the day `through` (inclusive) onwards."""
+        start = date.fromisoformat(through) if through else None
+        limit, page, events = self._settings['ORDER_HISTORY_FETCH_LIMIT'], 1, []
+        while True:
+            data = api.get_account_history(page=page, limit=limit, start_date=start)
+            if data is None:
+                print(f"Order history sync stopped: no response for history page {page}")
+                return None
+            history = data.get('history')
+            batch = _as_list(history.get('event') if isinstance(history, dict) else None)
+            events.extend(batch)
+            if len(batch) < limit:
+                return events
+            page += 1
+
+    # --- Reading ---
+
+    def page(self, user_id, cursor=None, symbol=None, limit=None):
+        """
+        One page of the user's history, newest first.
+
+        Args:
+            user_id (str): Owner of the entries.
+            cursor (str): next_cursor from the previous page, or None for the first page.
+            symbol (str): Only entries for this symbol.
+            limit (int): Page size, defaults to ORDER_HISTORY_PAGE_SIZE.
+
+        Returns:
+            tuple: (entries, next_cursor); next_cursor is None on the last page.
+        """
+        limit = limit or self._settings['ORDER_HISTORY_PAGE_SIZE']
+        query = {'user_id': user_id}
+        if symbol:
+            query['symbol'] = symbol
+        position = decode_cursor(cursor)
+        if position:
+            when, entry_id = position
+            query['$or'] = [{'date': {'$lt': when}}, {'date': when, '_id': {'$lt': entry_id}}]
+        docs = list(self.entries.find(query).sort([('date', -1), ('_id', -1)]).limit(limit + 1))
+        next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+        return docs[:limit], next_cursor
+
+
+order_history = OrderHistory()
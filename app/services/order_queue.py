@@ -0,0 +1,280 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+from .spread_pricing import FINAL_ORDER_STATUSES
+
+# An order still resting at the broker is never final here, however long it rests.
+JOB_FINAL_STATUSES = FINAL_ORDER_STATUSES + ('failed',)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class _Scheduler:
+    """Runs callables after a delay on a small thread pool, from one timer thread."""
+    def __init__(self, workers, name):
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        threading.Thread(target=self._loop, name=f"{name}-timer", daemon=True).start()
+
+    def call_later(self, delay, fn, *args):
+        with self._condition:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._sequence), fn, args))
+            self._condition.notify()
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._condition.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, fn, args = heapq.heappop(self._heap)
+            self._pool.submit(fn, *args)
+
+
+class OrderQueue:
+    """
+    Submits broker orders on a background thread pool and tracks them in Mongo.
+
+    submit() records a job and returns its id straight away; a worker then
+    places the order and hands it to the status poller, which checks Tradier
+    every ORDER_STATUS_POLL_INTERVAL for ORDER_STATUS_POLL_TIMEOUT, then every
+    ORDER_STATUS_SLOW_POLL_INTERVAL while the order rests, writing every
+    status change into the job's history. Each check is a short task on its
+    own pool, so resting orders never hold up new placements. After
+    ORDER_STATUS_FOLLOW_TIMEOUT, or a restart, refresh() brings a job up to
+    date when it is read. Pages read progress from the 'order_jobs'
+    collection instead of waiting on the broker.
+
+    An order submitted with a price ladder starts at the first price and is
+    modified in place to each following one after an equal share of the
+    ladder's budget, until it fills; the ladder stops at the first modify
+    Tradier does not accept.
+    """
+    DEFAULTS = {
+        'ORDER_QUEUE_WORKERS': 4,
+        'ORDER_STATUS_WORKERS': 4,
+        'ORDER_STATUS_POLL_INTERVAL': 2.0,
+        'ORDER_STATUS_POLL_TIMEOUT': 120.0,
+        'ORDER_STATUS_SLOW_POLL_INTERVAL': 30.0,
+        'ORDER_STATUS_FOLLOW_TIMEOUT': 8 * 3600.0,
+        'ORDER_REPRICE_POLL_INTERVAL': 0.25,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._executor = None
+        self._scheduler = None
+        self._scheduler_lock = threading.Lock()
+        self._collection = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            app.config.setdefault(key, type(default)(os.environ.get(key, default)))
+            self._settings[key] = app.config[key]
+        self._executor = None
+        self._scheduler = None
+
+    @property
+    def jobs(self):
+        if self._collection is None:
+            from app import mongo
+            self._collection = mongo.db.order_jobs
+            self._collection.create_index([('user_id', 1), ('created_at', -1)])
+        return self._collection
+
+    def _pool(self):
+        # Created on first use so a preloading master never forks with live workers.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._settings['ORDER_QUEUE_WORKERS'],
+                                                thread_name_prefix='order-queue')
+        return self._executor
+
+    def _poller(self):
+        with self._scheduler_lock:
+            if self._scheduler is None:
+                self._scheduler = _Scheduler(self._settings['ORDER_STATUS_WORKERS'], 'order-status')
+            return self._scheduler
+
+    def submit(self, api, payload, user_id, description, ladder=None, ladder_budget=5.0):
+        """
+        Queues an order for background submission.
+
+        Args:
+            api (TradierAPI): Client to place and follow the order with.
+            payload (dict): The order, as sent to place_order.
+            user_id (str): Owner of the job.
+            description (str): Label shown with the job.
+            ladder (list): Optional limit prices to walk through; the first replaces payload['price'].
+            ladder_budget (float): Seconds to spread the ladder's steps over.
+
+        Returns:
+            str: The job id to poll for status.
+        """
+        if ladder:
+            payload = dict(payload, price=f"{ladder[0]:.2f}")
+        job_id = ObjectId()
+        self.jobs.insert_one({
+            '_id': job_id,
+            'user_id': user_id,
+            'description': description,
+            'symbol': payload.get('symbol'),
+            'payload': payload,
+            'status': 'queued',
+            'broker_order_id': None,
+            'price': float(payload['price']) if payload.get('price') else None,
+            'error': None,
+            'history': [{'status': 'queued', 'at': _now()}],
+            'created_at': _now(),
+            'updated_at': _now()
+        })
+        self._pool().submit(self._run, api, job_id, payload, ladder, ladder_budget)
+        return str(job_id)
+
+    def _transition(self, job_id, status, **fields):
+        self.jobs.update_one(
+            {'_id': job_id, 'status': {'$ne': status}},
+            {'$set': dict(fields, status=status, updated_at=_now()),
+             '$push': {'history': {'status': status, 'at': _now()}}}
+        )
+
+    def _run(self, api, job_id, payload, ladder=None, ladder_budget=0.0):
+        try:
+            self._transition(job_id, 'submitting')
+            response = api.place_order(payload)
+            if not response or not response.get('order'):
+                self._transition(job_id, 'rejected', error=_error_text(response))
+                return
+            order_id = response['order'].get('id')
+            self._transition(job_id, 'submitted', broker_order_id=order_id)
+        except Exception as e:
+            print(f"Order job {job_id} failed: {e}")
+            self._transition(job_id, 'failed', error=str(e))
+            return
+        follow = {'api': api, 'job_id': job_id, 'order_id': order_id, 'started': time.monotonic()}
+        if ladder and len(ladder) > 1:
+            follow.update(ladder=ladder, step=0, slice=ladder_budget / len(ladder),
+                          type=payload['type'], duration=payload['duration'])
+        self._poller().call_later(0, self._follow, follow)
+
+    def _check(self, api, job_id, order_id):
+        """Fetches the broker's status for the order and records it on the job."""
+        response = api.get_order(order_id)
+        status = response['order'].get('status') if response and response.get('order') else None
+        self.jobs.update_one({'_id': job_id}, {'$set': {'checked_at': _now()}})
+        if status:
+            self._transition(job_id, status)
+        return status
+
+    def _follow(self, follow):
+        """One status check on the poller; schedules the next until the order is final."""
+        try:
+            status = self._check(follow['api'], follow['job_id'], follow['order_id'])
+        except Exception as e:
+            print(f"Status check for order job {follow['job_id']} failed: {e}")
+            status = None
+        if status in FINAL_ORDER_STATUSES:
+            return
+        elapsed = time.monotonic() - follow['started']
+        if follow.get('ladder'):
+            due = (follow['step'] + 1) * follow['slice']
+            if elapsed >= due:
+                self._reprice(follow)
+                due = (follow['step'] + 1) * follow['slice']
+            if follow.get('ladder'):
+                delay = min(self._settings['ORDER_REPRICE_POLL_INTERVAL'], max(due - elapsed, 0.0))
+                self._poller().call_later(delay, self._follow, follow)
+                return
+        if elapsed >= self._settings['ORDER_STATUS_FOLLOW_TIMEOUT']:
+            return  # Still open at the broker; refresh() picks it up when the job is read.
+        fast = elapsed < self._settings['ORDER_STATUS_POLL_TIMEOUT']
+        interval = self._settings['ORDER_STATUS_POLL_INTERVAL' if fast else 'ORDER_STATUS_SLOW_POLL_INTERVAL']
+        self._poller().call_later(interval, self._follow, follow)
+
+    def _reprice(self, follow):
+        """Moves a laddered order to its next price; a modify Tradier does not accept ends the ladder."""
+        step = follow['step'] + 1
+        price = follow['ladder'][step]
+        try:
+            response = follow['api'].modify_order(follow['order_id'], {
+                'type': follow['type'], 'duration': follow['duration'], 'price': f"{price:.2f}"})
+        except Exception as e:
+            response = {'errors': {'error': str(e)}}
+        if response and response.get('order'):
+            follow['step'] = step
+            self.jobs.update_one({'_id': follow['job_id']}, {'$set': {'price': price, 'updated_at': _now()}})
+            if step == len(follow['ladder']) - 1:
+                follow['ladder'] = None
+        else:
+            follow['ladder'] = None
+            self.jobs.update_one({'_id': follow['job_id']}, {'$set': {
+                'error': f"Reprice to {price:.2f} failed: {_error_text(response)}", 'updated_at': _now()}})
+
+    def refresh(self, api, job_id, user_id):
+        """
+        Re-checks an open job with the broker if nothing has checked it for
+        ORDER_STATUS_SLOW_POLL_INTERVAL, e.g. after the poller gave up on it or
+        the worker that placed it restarted.
+        """
+        try:
+            doc = self.jobs.find_one({'_id': ObjectId(job_id), 'user_id': user_id},
+                                     {'status': 1, 'broker_order_id': 1, 'checked_at': 1, 'updated_at': 1})
+        except InvalidId:
+            return
+        if not doc or doc.get('status') in JOB_FINAL_STATUSES or not doc.get('broker_order_id'):
+            return
+        checked = (doc.get('checked_at') or doc['updated_at']).replace(tzinfo=timezone.utc)
+        if (_now() - checked).total_seconds() < self._settings['ORDER_STATUS_SLOW_POLL_INTERVAL']:
+            return
+        try:
+            self._check(api, doc['_id'], doc['broker_order_id'])
+        except Exception as e:
+            print(f"Status refresh for order job {job_id} failed: {e}")
+
+    def get(self, job_id, user_id):
+        """Returns a job as a JSON-ready dict, or None if it does not belong to the user."""
+        try:
+            doc = self.jobs.find_one({'_id': ObjectId(job_id), 'user_id': user_id}, {'payload': 0})
+        except InvalidId:
+            return None
+        return serialize_job(doc) if doc else None
+
+    def recent(self, user_id, limit=5):
+        """The user's most recent jobs, newest first."""
+        cursor = self.jobs.find({'user_id': user_id}, {'payload': 0}).sort('created_at', -1).limit(limit)
+        return [serialize_job(doc) for doc in cursor]
+
+
+def _error_text(response):
+    errors = ((response or {}).get('errors') or {}).get('error', 'Unknown error')
+    return ', '.join(errors) if isinstance(errors, list) else str(errors)
+
+
+def serialize_job(doc):
+    return {
+        'id': str(doc['_id']),
+        'description': doc.get('description'),
+        'symbol': doc.get('symbol'),
+        'status': doc.get('status'),
+        'final': doc.get('status') in JOB_FINAL_STATUSES,
+        'broker_order_id': doc.get('broker_order_id'),
+        'price': doc.get('price'),
+        'error': doc.get('error'),
+        'history': [{'status': h['status'], 'at': h['at'].isoformat()} for h in doc.get('history', [])],
+        'created_at': doc['created_at'].isoformat() if doc.get('created_at') else None
+    }
+
+
+order_queue = OrderQueue()
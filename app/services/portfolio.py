@@ -0,0 +1,113 @@
+import re
+
+import numpy as np
+
+OCC_SYMBOL = re.compile(r'^[A-Z]{1,6}\d{6}[CP]\d{8}$')
+OPTION_MULTIPLIER = 100
+
+
+def contract_multiplier(symbol):
+    """Shares per unit of quantity: 100 for standard OCC option symbols, 1 otherwise."""
+    if len(symbol or '') < 16:
+        return 1
+    return OPTION_MULTIPLIER if OCC_SYMBOL.match(symbol) else 1
+
+
+class Portfolio:
+    """
+    Position valuation kept as NumPy columns, one row per position.
+
+    Quantities, cost bases, contract multipliers and last prices live in
+    parallel arrays with a symbol -> rows index. Valuing a full quote map is a
+    handful of array operations, and a price update touches only the rows for
+    the symbols that changed, adjusting the running totals by the difference.
+    The KPIs are therefore available in O(changed) time after every tick,
+    which is how the dashboard's live stream keeps rows and totals current.
+    """
+    def __init__(self, positions):
+        self.positions = list(positions)
+        size = len(self.positions)
+        columns = list(zip(*[(p['symbol'], p['quantity'], p['cost_basis']) for p in self.positions])) or [(), (), ()]
+        self.symbols = list(columns[0])
+        self.quantity = np.asarray(columns[1], dtype=float)
+        self.cost_basis = np.asarray(columns[2], dtype=float)
+        self.multiplier = np.fromiter(map(contract_multiplier, self.symbols), float, count=size)
+        self.shares = self.quantity * self.multiplier
+        self.last = np.zeros(size)
+        self.market_value = np.zeros(size)
+        self.unrealized_pl = -self.cost_basis
+        # Per share, so an option's unit cost lines up with its quoted premium; 0 for shorts, as before.
+        self.unit_cost = np.divide(self.cost_basis, self.shares, out=np.zeros(size), where=self.shares > 0)
+
+        # A symbol can appear on more than one row (e.g. separate tax lots).
+        self._rows = {}
+        for row, symbol in enumerate(self.symbols):
+            self._rows.setdefault(symbol, []).append(row)
+
+        self.total_cost = float(self.cost_basis.sum())
+        self.total_value = 0.0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def apply_quotes(self, prices):
+        """
+        Values every position from a {symbol: last price} map in one pass.
+        Positions without a price are valued at 0, as before.
+        """
+        try:
+            self.last = np.fromiter((prices.get(s) or 0.0 for s in self.symbols), float, count=len(self))
+        except (TypeError, ValueError):
+            self.last = np.fromiter((_price(prices.get(s)) for s in self.symbols), float, count=len(self))
+        self.market_value = self.shares * self.last
+        self.unrealized_pl = self.market_value - self.cost_basis
+        self.total_value = float(self.market_value.sum())
+        return self
+
+    def update_prices(self, prices):
+        """
+        Applies new last prices for some symbols, touching only their rows.
+
+        Returns:
+            list: Row numbers whose valuation changed.
+        """
+        changed = []
+        for symbol, price in prices.items():
+            rows = self._rows.get(symbol)
+            price = _price(price)
+            if rows is None or not price:
+                continue
+            old_value = self.market_value[rows].sum()
+            self.last[rows] = price
+            self.market_value[rows] = self.shares[rows] * price
+            self.unrealized_pl[rows] = self.market_value[rows] - self.cost_basis[rows]
+            self.total_value += float(self.market_value[rows].sum() - old_value)
+            changed.extend(rows)
+        return changed
+
+    def kpis(self):
+        return {
+            'market_value': self.total_value,
+            'cost_basis': self.total_cost,
+            'unrealized_pl': self.total_value - self.total_cost,
+            'positions': len(self)
+        }
+
+    def rows(self):
+        """
+        Writes last_price, market_value, unrealized_pl, unit_cost and multiplier
+        onto the position dicts (in place, as the dashboard loop did) and returns them.
+        """
+        names = ('last_price', 'market_value', 'unrealized_pl', 'unit_cost', 'multiplier')
+        columns = zip(self.last.tolist(), self.market_value.tolist(), self.unrealized_pl.tolist(),
+                      self.unit_cost.tolist(), self.multiplier.astype(int).tolist())
+        for position, values in zip(self.positions, columns):
+            position.update(zip(names, values))
+        return self.positions
+
+
+def _price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
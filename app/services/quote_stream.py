@@ -0,0 +1,260 @@
+import json
+import os
+import threading
+import time
+
+import requests
+
+from .tradier_api import TradierAPI
+
+# Fields kept from each streaming event type; trade prices arrive as strings.
+EVENT_FIELDS = {
+    'quote': ('bid', 'ask', 'bidsz', 'asksz'),
+    'trade': ('last', 'size', 'cvol'),
+    'summary': ('open', 'high', 'low', 'prevClose'),
+}
+MAX_STREAM_SYMBOLS = 200
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Subscription:
+    """One browser's quote feed: the symbols it watches and the ticks not yet sent to it."""
+    def __init__(self, symbols):
+        self.symbols = frozenset(symbols)
+        self._pending = {}
+        self._cond = threading.Condition()
+
+    def offer(self, ticks):
+        """Merges ticks into the pending batch; a slow reader only ever sees the latest tick per symbol."""
+        with self._cond:
+            self._pending.update(ticks)
+            self._cond.notify()
+
+    def next_batch(self, timeout):
+        """Waits up to timeout for ticks and returns them as {symbol: tick} (empty on timeout)."""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            batch, self._pending = self._pending, {}
+        return batch
+
+
+class QuoteStreamHub:
+    """
+    Shares one upstream Tradier market stream between every connected browser.
+
+    The hub streams the union of the symbols its subscribers watch. Incoming
+    quote and trade events are merged into a latest-tick-per-symbol map, and a
+    flusher sends each subscriber the ticks that changed for its symbols, at
+    most once per QUOTE_STREAM_FLUSH_INTERVAL. A hundred users watching SPY
+    cost one upstream subscription, and a burst of SPY trades reaches them as
+    one update.
+
+    The upstream session is always opened with the app's own
+    QUOTE_STREAM_API_KEY, since market data is the same for every account;
+    without one, live quotes are off. Each gunicorn worker runs its own hub
+    and holds at most QUOTE_STREAM_MAX_CLIENTS browser streams, so open
+    dashboards cannot take every request thread.
+    """
+    DEFAULTS = {
+        'QUOTE_STREAM_API_KEY': '',
+        'QUOTE_STREAM_MAX_CLIENTS': 4,
+        'QUOTE_STREAM_FLUSH_INTERVAL': 0.25,
+        'QUOTE_STREAM_HEARTBEAT': 15.0,
+        'QUOTE_STREAM_MAX_SECONDS': 300,
+        'QUOTE_STREAM_READ_TIMEOUT': 60.0,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._clients = set()
+        self._latest = {}
+        self._dirty = set()
+        self._api = None
+        self._streaming = frozenset()
+        self._response = None
+        self._wake = threading.Event()
+        self._pid = None
+        self._stats = {'connects': 0, 'events': 0, 'batches': 0, 'ticks_sent': 0, 'rejected': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            app.config.setdefault(key, type(default)(os.environ.get(key, default)))
+            self._settings[key] = app.config[key]
+        self._api = None
+
+    @property
+    def settings(self):
+        return self._settings
+
+    @property
+    def enabled(self):
+        return bool(self._settings['QUOTE_STREAM_API_KEY'])
+
+    # --- Subscribers ---
+
+    def subscribe(self, symbols):
+        """
+        Registers a feed for symbols and returns its Subscription, or None when
+        this worker already serves QUOTE_STREAM_MAX_CLIENTS feeds. The latest
+        known tick for each symbol is queued straight away.
+        """
+        subscription = Subscription(symbols)
+        with self._lock:
+            if len(self._clients) >= self._settings['QUOTE_STREAM_MAX_CLIENTS']:
+                self._stats['rejected'] += 1
+                return None
+            self._clients.add(subscription)
+            for symbol in subscription.symbols:
+                self._subscribers.setdefault(symbol, set()).add(subscription)
+            if self._api is None:
+                self._api = TradierAPI(self._settings['QUOTE_STREAM_API_KEY'], None, use_cache=False)
+            snapshot = {s: dict(self._latest[s]) for s in subscription.symbols if s in self._latest}
+            reconnect = not subscription.symbols <= self._streaming
+        if snapshot:
+            subscription.offer(snapshot)
+        self._ensure_running()
+        if reconnect:
+            self._reconnect()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Drops a feed; safe to call more than once."""
+        with self._lock:
+            if subscription not in self._clients:
+                return
+            self._clients.discard(subscription)
+            for symbol in subscription.symbols:
+                watchers = self._subscribers.get(symbol)
+                if watchers is None:
+                    continue
+                watchers.discard(subscription)
+                if not watchers:
+                    del self._subscribers[symbol]
+                    self._latest.pop(symbol, None)
+                    self._dirty.discard(symbol)
+            idle = not self._subscribers
+        if idle:
+            self._reconnect()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, symbols=len(self._subscribers), streaming=len(self._streaming),
+                        subscriptions=len(self._clients))
+
+    # --- Upstream ---
+
+    def _ensure_running(self):
+        # Threads do not survive a fork, so each worker starts its own.
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._streaming, self._response = frozenset(), None
+        threading.Thread(target=self._run_upstream, name='quote-stream', daemon=True).start()
+        threading.Thread(target=self._run_flusher, name='quote-flush', daemon=True).start()
+
+    def _reconnect(self):
+        """Makes the upstream loop pick up the current symbol set."""
+        self._wake.set()
+        with self._lock:
+            response = self._response
+        if response is not None:
+            response.close()
+
+    def _run_upstream(self):
+        backoff = 1
+        while True:
+            self._wake.clear()
+            with self._lock:
+                wanted, api = frozenset(self._subscribers), self._api
+            if not wanted:
+                self._wake.wait()
+                continue
+            try:
+                self._stream(api, wanted)
+                backoff = 1
+            except Exception as e:
+                if self._wake.is_set():
+                    continue
+                print(f"Quote stream disconnected, retrying in {backoff}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _stream(self, api, symbols):
+        session = api.create_market_session() if api else None
+        if not session or not session.get('stream'):
+            raise RuntimeError(f"could not open a streaming session: {session}")
+        response = requests.post(
+            session['stream']['url'],
+            data={'sessionid': session['stream']['sessionid'], 'symbols': ','.join(sorted(symbols)),
+                  'filter': 'quote,trade,summary', 'linebreak': 'true'},
+            headers={'Accept': 'application/json'},
+            stream=True,
+            timeout=(5, self._settings['QUOTE_STREAM_READ_TIMEOUT'])
+        )
+        response.raise_for_status()
+        with self._lock:
+            self._response, self._streaming = response, symbols
+            self._stats['connects'] += 1
+        try:
+            for line in response.iter_lines():
+                if self._wake.is_set():
+                    break
+                if line:
+                    self._on_event(json.loads(line))
+        finally:
+            response.close()
+            with self._lock:
+                self._response, self._streaming = None, frozenset()
+
+    def _on_event(self, event):
+        fields = EVENT_FIELDS.get(event.get('type'))
+        symbol = event.get('symbol')
+        if not fields or not symbol:
+            return
+        with self._lock:
+            self._stats['events'] += 1
+            if symbol not in self._subscribers:
+                return
+            tick = self._latest.setdefault(symbol, {'symbol': symbol})
+            for field in fields:
+                if field in event:
+                    tick[field] = _number(event[field])
+            self._dirty.add(symbol)
+
+    # --- Fan-out ---
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self._settings['QUOTE_STREAM_FLUSH_INTERVAL'])
+            self.flush()
+
+    def flush(self):
+        """Sends every subscriber the ticks that changed for its symbols since the last flush."""
+        with self._lock:
+            if not self._dirty:
+                return
+            outgoing = {}
+            for symbol in self._dirty:
+                tick = dict(self._latest[symbol])
+                for subscription in self._subscribers.get(symbol, ()):
+                    outgoing.setdefault(subscription, {})[symbol] = tick
+            self._dirty = set()
+            self._stats['batches'] += 1
+            self._stats['ticks_sent'] += sum(len(ticks) for ticks in outgoing.values())
+        for subscription, ticks in outgoing.items():
+            subscription.offer(ticks)
+
+
+quote_hub = QuoteStreamHub()
@@ -0,0 +1,242 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """Raised instead of sending a call that would have to queue longer than TRADIER_RATE_MAX_WAIT."""
+
+
+class TokenBucket:
+    """
+    Allows `rate` calls per second with bursts of up to `burst`.
+
+    Callers reserve a token and sleep for the returned wait, so concurrent
+    callers queue in order instead of racing for the next refill. block_until()
+    holds every caller back until the server says the window has reset.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, max_wait=None):
+        """Takes a token; returns the seconds to wait before using it, or None if that exceeds max_wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(self._blocked_until - now, 0.0)
+            if self._tokens < 1:
+                wait = max(wait, (1 - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def acquire(self, max_wait=None):
+        """Blocks until a token is free. Returns False (without waiting) if that would exceed max_wait."""
+        wait = self.reserve(max_wait)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def sync(self, available=None, reset_in=None, rate=None):
+        """Aligns the bucket with what the server reports for the current window."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if rate:
+                self.rate = rate
+            if available is not None:
+                self._tokens = min(self._tokens, available)
+                if available <= 0 and reset_in:
+                    self._blocked_until = max(self._blocked_until, now + reset_in)
+
+
+class RateLimiter:
+    """
+    Client-side limits for Tradier calls, one token bucket per API key and endpoint group.
+
+    Tradier limits each access token per minute, separately for market data
+    (/markets), trading (order placement and changes) and everything else.
+    Each call takes a token before it is sent; when the bucket is empty the
+    call queues, and a call that would queue longer than TRADIER_RATE_MAX_WAIT
+    is rejected with RateLimitExceeded rather than tying up a worker thread.
+    The X-Ratelimit-* headers on every response correct the bucket, so
+    traffic from other processes on the same token is accounted for too.
+    """
+    DEFAULTS = {
+        'TRADIER_RATE_LIMIT_ENABLED': True,
+        'TRADIER_RATE_LIMIT_MARKET': 120,
+        'TRADIER_RATE_LIMIT_TRADING': 60,
+        'TRADIER_RATE_LIMIT_STANDARD': 120,
+        'TRADIER_RATE_BURST': 20,
+        'TRADIER_RATE_MAX_WAIT': 2.0,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            value = os.environ.get(key, default)
+            if isinstance(default, bool) and isinstance(value, str):
+                value = value.lower() in ('1', 'true', 'yes')
+            app.config.setdefault(key, type(default)(value))
+            self._settings[key] = app.config[key]
+        with self._lock:
+            self._buckets = {}
+
+    @staticmethod
+    def group_for(method, endpoint):
+        if endpoint.startswith('/markets'):
+            return 'market'
+        if method != 'GET' and '/orders' in endpoint:
+            return 'trading'
+        return 'standard'
+
+    def _bucket(self, api_key, group):
+        key = (hashlib.sha256(api_key.encode()).hexdigest()[:16], group)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                per_minute = self._settings[f"TRADIER_RATE_LIMIT_{group.upper()}"]
+                bucket = self._buckets[key] = TokenBucket(per_minute / 60.0,
+                                                          min(self._settings['TRADIER_RATE_BURST'], per_minute))
+            return bucket
+
+    def _count(self, group, **amounts):
+        with self._lock:
+            counters = self._stats.setdefault(group, {'allowed': 0, 'queued': 0, 'queued_seconds': 0.0,
+                                                      'rejected': 0, 'server_throttled': 0})
+            for name, amount in amounts.items():
+                counters[name] += amount
+
+    def acquire(self, api_key, method, endpoint):
+        """
+        Waits for a token for this key and endpoint group.
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed TRADIER_RATE_MAX_WAIT.
+        """
+        if not self._settings['TRADIER_RATE_LIMIT_ENABLED']:
+            return
+        group = self.group_for(method, endpoint)
+        wait = self._bucket(api_key, group).reserve(self._settings['TRADIER_RATE_MAX_WAIT'])
+        if wait is None:
+            self._count(group, rejected=1)
+            raise RateLimitExceeded(f"Tradier {group} rate limit reached for this API key; try again shortly.")
+        if wait > 0:
+            self._count(group, queued=1, queued_seconds=wait)
+            time.sleep(wait)
+        self._count(group, allowed=1)
+
+    def observe(self, api_key, method, endpoint, response):
+        """Feeds a response's X-Ratelimit-* headers (and 429s) back into the bucket."""
+        if not self._settings['TRADIER_RATE_LIMIT_ENABLED'] or response is None:
+            return
+        headers = response.headers
+        available, expiry, allowed = (headers.get(f"X-Ratelimit-{name}") for name in ('Available', 'Expiry', 'Allowed'))
+        if response.status_code != 429 and available is None:
+            return
+        group = self.group_for(method, endpoint)
+        try:
+            available = 0 if response.status_code == 429 else int(available)
+            reset_in = max(int(expiry) / 1000.0 - time.time(), 0.0) if expiry else 1.0
+            rate = int(allowed) / 60.0 if allowed else None
+        except ValueError:
+            return
+        if available <= 0:
+            self._count(group, server_throttled=1)
+        self._bucket(api_key, group).sync(available, reset_in, rate)
+
+    def stats(self):
+        """Per-group counters: calls allowed, queued (and total seconds queued), rejected, and server throttles."""
+        with self._lock:
+            stats = {group: dict(counters) for group, counters in self._stats.items()}
+            stats['buckets'] = len(self._buckets)
+        return stats
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one.
+
+    The first caller for a key runs the call; callers arriving while it is in
+    flight wait for and share its result (or exception). Shared results must
+    be treated as read-only. A result that fails the caller's shareable check
+    (e.g. a failed request) is returned to the leader only; each waiting
+    caller then makes its own call.
+    """
+    DEFAULTS = {
+        'TRADIER_COALESCE_ENABLED': True,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'coalesced': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            value = os.environ.get(key, default)
+            if isinstance(default, bool) and isinstance(value, str):
+                value = value.lower() in ('1', 'true', 'yes')
+            app.config.setdefault(key, value)
+            self._settings[key] = app.config[key]
+
+    def do(self, key, fn, shareable=None):
+        if not self._settings['TRADIER_COALESCE_ENABLED']:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+                self._stats['calls'] += 1
+            else:
+                self._stats['coalesced'] += 1
+        if not leader:
+            result = call.result()
+            if shareable is not None and not shareable(result):
+                return fn()
+            return result
+        try:
+            result = fn()
+            call.set_result(result)
+            return result
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
+
+
+rate_limiter = RateLimiter()
+single_flight = SingleFlight()
@@ -0,0 +1,65 @@
+FINAL_ORDER_STATUSES = ('filled', 'canceled', 'rejected', 'expired', 'error')
+
+
+def _quotes_by_symbol(quotes_data):
+    if not quotes_data or not quotes_data.get('quotes'):
+        return {}
+    quotes = quotes_data['quotes'].get('quote') or []
+    quotes = quotes if isinstance(quotes, list) else [quotes]
+    return {q['symbol']: q for q in quotes}
+
+
+def _price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def quote_credit_spreads(api, spreads):
+    """
+    Prices several credit spreads from a single batched quote request.
+
+    Args:
+        api (TradierAPI): The client used for the quote call.
+        spreads (dict): name -> (short OCC symbol, long OCC symbol).
+
+    Returns:
+        dict: name -> {'natural', 'mid', 'width'} net credit per share, or None
+              when either leg has no usable bid/ask.
+    """
+    symbols = list(dict.fromkeys(s for legs in spreads.values() for s in legs))
+    quotes = _quotes_by_symbol(api.get_quotes(symbols, fresh=True))
+    priced = {}
+    for name, (short_symbol, long_symbol) in spreads.items():
+        short_leg, long_leg = quotes.get(short_symbol), quotes.get(long_symbol)
+        if not short_leg or not long_leg:
+            priced[name] = None
+            continue
+        short_bid, short_ask = _price(short_leg.get('bid')), _price(short_leg.get('ask'))
+        long_bid, long_ask = _price(long_leg.get('bid')), _price(long_leg.get('ask'))
+        if None in (short_bid, short_ask, long_bid, long_ask):
+            priced[name] = None
+            continue
+        priced[name] = {
+            'natural': round(short_bid - long_ask, 2),
+            'mid': round((short_bid + short_ask) / 2 - (long_bid + long_ask) / 2, 2),
+            'width': round((short_ask - short_bid) + (long_ask - long_bid), 2)
+        }
+    return priced
+
+
+def limit_ladder(quote, offset=0.0, steps=4, start=None):
+    """
+    Limit prices for a credit order, from the starting credit toward natural.
+
+    The first price is `start` (or mid minus offset); the remaining steps walk
+    evenly down to the natural credit. Prices never go below $0.01.
+    """
+    floor = max(quote['natural'], 0.01)
+    first = max(start if start is not None else quote['mid'] - offset, floor)
+    if steps <= 1 or first <= floor:
+        return [round(first, 2)]
+    step = (first - floor) / (steps - 1)
+    ladder = [round(first - step * i, 2) for i in range(steps)]
+    return list(dict.fromkeys(ladder))
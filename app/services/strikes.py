@@ -0,0 +1,111 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from .market_cache import MemoryBackend
+from .option_chain import load_option_chain
+
+
+def ladder_from_strikes(strikes_data):
+    """Builds a sorted, de-duplicated float array from a /markets/options/strikes payload."""
+    if not strikes_data or not strikes_data.get('strikes') or strikes_data['strikes'] == 'null':
+        return None
+    strikes = strikes_data['strikes'].get('strike')
+    if strikes is None:
+        return None
+    strikes = strikes if isinstance(strikes, list) else [strikes]
+    return np.unique(np.asarray(strikes, dtype=float))
+
+
+class StrikeLadderService:
+    """
+    Serves strike ladders per (symbol, expiration) from a compact cache.
+
+    Ladders are kept as float arrays rather than option dicts. When a user loads
+    the expirations for a symbol, the nearest few ladders are fetched in the
+    background so picking an expiration is answered from memory. A lookup that
+    arrives while its prefetch is still running waits for that fetch instead of
+    starting another one.
+    """
+    DEFAULTS = {
+        'STRIKES_CACHE_TTL': 3600,
+        'STRIKES_CACHE_MAX_ENTRIES': 4096,
+        'STRIKES_PREFETCH_COUNT': 3,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._ladders = MemoryBackend(self._settings['STRIKES_CACHE_MAX_ENTRIES'])
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            app.config.setdefault(key, type(default)(os.environ.get(key, default)))
+            self._settings[key] = app.config[key]
+        self._ladders = MemoryBackend(self._settings['STRIKES_CACHE_MAX_ENTRIES'])
+        self._executor = None
+
+    def _pool(self):
+        # Created on first use so a preloading master never forks with live workers.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='strike-prefetch')
+        return self._executor
+
+    def _load(self, api, key, future):
+        try:
+            ladder = ladder_from_strikes(api.get_option_strikes(*key))
+            if ladder is None:
+                # Fall back to the full chain when the strikes endpoint has nothing.
+                chain = load_option_chain(api, *key, greeks=False)
+                ladder = chain.strikes() if chain is not None else None
+            if ladder is not None:
+                self._ladders.set(key, ladder, self._settings['STRIKES_CACHE_TTL'])
+            future.set_result(ladder)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _start(self, api, key, background):
+        """Returns the in-flight future for key, starting a fetch if none is running."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = Future()
+            self._inflight[key] = future
+        if background:
+            self._pool().submit(self._load, api, key, future)
+        else:
+            self._load(api, key, future)
+        return future
+
+    def get(self, api, symbol, expiration):
+        """
+        Returns the strike ladder for a symbol/expiration as a sorted float array.
+
+        Returns:
+            np.ndarray or None: None when Tradier has no strikes for the pair.
+        """
+        key = (symbol.upper(), expiration)
+        ladder, status = self._ladders.get(key)
+        if status == 'hit':
+            return ladder
+        return self._start(api, key, background=False).result()
+
+    def prefetch(self, api, symbol, expirations):
+        """Warms the ladders for the nearest expirations without blocking the caller."""
+        for expiration in expirations[:self._settings['STRIKES_PREFETCH_COUNT']]:
+            key = (symbol.upper(), expiration)
+            if self._ladders.get(key)[1] != 'hit':
+                self._start(api, key, background=True)
+
+
+strike_ladders = StrikeLadderService()
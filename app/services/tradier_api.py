@@ -1,13 +1,19 @@
+import time
 import requests
 from flask_login import current_user
 from datetime import date, timedelta 
+from .http_transport import transport
+from .market_cache import market_cache
+from .metrics import metrics
+from .rate_limit import rate_limiter, single_flight
 
 class TradierAPI:
     """
     A client class to interact with the Tradier API.
     """
-    def __init__(self, api_key, account_number):
-        self._base_url = "https://sandbox.tradier.com/v1"
+    def __init__(self, api_key, account_number, base_url=None, use_cache=True):
+        self._base_url = base_url or transport.base_url
+        self._use_cache = use_cache
         self._api_key = api_key
         self._account_number = account_number
         self._headers = {
@@ -15,42 +21,94 @@ class TradierAPI:
             'Accept': 'application/json'
         }
 
+    def _send(self, method, endpoint, **kwargs):
+        """Sends one call through the shared transport, within this key's rate limit."""
+        rate_limiter.acquire(self._api_key, method, endpoint)
+        started = time.perf_counter()
+        try:
+            response = transport.request(method, f"{self._base_url}{endpoint}", headers=self._headers, **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.observe_tradier(method, endpoint, time.perf_counter() - started, 'error')
+            raise
+        metrics.observe_tradier(method, endpoint, time.perf_counter() - started, response.status_code)
+        rate_limiter.observe(self._api_key, method, endpoint, response)
+        return response
+
     def _get(self, endpoint, params=None):
         # ... (This helper method is unchanged) ...
         if not self._api_key:
             return None
         try:
-            url = f"{self._base_url}{endpoint}"
-            response = requests.get(url, headers=self._headers, params=params)
+            response = self._send('GET', endpoint, params=params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Error making GET request to Tradier API: {e}")
             return None
 
+    def _cached_get(self, endpoint_name, endpoint, params, fresh=False):
+        """
+        GET for user-independent market data, served from the shared market cache.
+        Concurrent identical requests share one upstream call, whichever user made them.
+        Account and order endpoints must keep using _get directly.
+        Pass fresh=True to bypass the cache and coalescing (e.g. when pricing an order).
+        """
+        if not self._api_key:
+            return None
+        if fresh:
+            return self._get(endpoint, params=params)
+        if not self._use_cache:
+            return self._coalesced_get(endpoint_name, endpoint, params)
+        return market_cache.get_or_fetch(endpoint_name, params,
+                                         lambda: self._coalesced_get(endpoint_name, endpoint, params))
+
+    def _coalesced_get(self, endpoint_name, endpoint, params):
+        # Only successful payloads are shared: _get returns None for a rejected
+        # key, a throttled call or a network error, and a waiter with its own
+        # (possibly valid) key should not inherit that, so it retries itself.
+        key = (self._base_url, market_cache.make_key(endpoint_name, params))
+        return single_flight.do(key, lambda: self._get(endpoint, params=params),
+                                shareable=lambda result: result is not None)
+
     def _post(self, endpoint, payload):
         # ... (This helper method is unchanged) ...
         if not self._api_key:
             return None
+        response = None
         try:
-            url = f"{self._base_url}{endpoint}"
-            response = requests.post(url, headers=self._headers, data=payload)
+            response = self._send('POST', endpoint, data=payload)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Error making POST request to Tradier API: {e}")
             try:
                 return response.json()
-            except ValueError:
+            except (ValueError, AttributeError):
+                return {'error': str(e)}
+
+    def _put(self, endpoint, payload):
+        if not self._api_key:
+            return None
+        response = None
+        try:
+            response = self._send('PUT', endpoint, data=payload)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Error making PUT request to Tradier API: {e}")
+            try:
+                return response.json()
+            except (ValueError, AttributeError):
                 return {'error': str(e)}
             
-    def get_historical_prices(self, symbol, period_days=185):
+    def get_historical_prices(self, symbol, period_days=185, start_date=None, end_date=None):
         """
         Fetches historical price data for a given symbol.
+        Pass start_date/end_date to request an explicit range instead of the last period_days.
         Corresponds to: /v1/markets/history
         """
-        end_date = date.today()
-        start_date = end_date - timedelta(days=period_days)
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=period_days)
         
         params = {
             'symbol': symbol,
@@ -58,7 +116,7 @@ class TradierAPI:
             'start': start_date.strftime('%Y-%m-%d'),
             'end': end_date.strftime('%Y-%m-%d')
         }
-        return self._get('/markets/history', params=params)
+        return self._cached_get('history', '/markets/history', params)
 
     def get_account_balances(self):
         # ... (This method is unchanged) ...
@@ -70,34 +128,95 @@ class TradierAPI:
         endpoint = f'/accounts/{self._account_number}/positions'
         return self._get(endpoint)
 
-    def get_quotes(self, symbols):
-        # ... (This method is unchanged) ...
+    def get_quotes(self, symbols, fresh=False):
+        """
+        Fetches quotes for one or more (equity or OCC option) symbols in a single call.
+        Corresponds to: /v1/markets/quotes
+        """
         if not symbols:
             return None
         params = {'symbols': ','.join(symbols)}
-        return self._get('/markets/quotes', params=params)
-    
+        return self._cached_get('quotes', '/markets/quotes', params, fresh=fresh)
+
+    def create_market_session(self):
+        """
+        Opens a market streaming session.
+        Corresponds to: /v1/markets/events/session
+
+        Returns:
+            dict: {'stream': {'url': ..., 'sessionid': ...}} on success.
+        """
+        return self._post('/markets/events/session', {})
+
     def get_option_expirations(self, symbol):
         # ... (This method is unchanged) ...
         params = {'symbol': symbol}
-        return self._get('/markets/options/expirations', params=params)
+        return self._cached_get('expirations', '/markets/options/expirations', params)
     
-    def get_option_chain(self, symbol, expiration): # <-- ADDED NEW METHOD
+    def get_option_chain(self, symbol, expiration, greeks=False):
         """
         Fetches the option chain for a given symbol and expiration date.
+        Set greeks=True to include Tradier's greeks and implied volatility.
         Corresponds to: /v1/markets/options/chains
         """
         params = {'symbol': symbol, 'expiration': expiration}
-        return self._get('/markets/options/chains', params=params)
+        if greeks:
+            params['greeks'] = 'true'
+        return self._cached_get('chains', '/markets/options/chains', params)
         
+    def get_option_strikes(self, symbol, expiration):
+        """
+        Fetches only the strike prices for a symbol and expiration.
+        Not market-cached: the strike ladder service keeps its own compact cache.
+        Corresponds to: /v1/markets/options/strikes
+        """
+        params = {'symbol': symbol, 'expiration': expiration}
+        return self._coalesced_get('strikes', '/markets/options/strikes', params)
+
     def place_order(self, order_payload):
         # ... (This method is unchanged) ...
         endpoint = f'/accounts/{self._account_number}/orders'
         return self._post(endpoint, payload=order_payload)
 
+    def get_order(self, order_id):
+        """
+        Fetches the current state of one order.
+        Corresponds to: /v1/accounts/{account_id}/orders/{order_id}
+        """
+        endpoint = f'/accounts/{self._account_number}/orders/{order_id}'
+        return self._get(endpoint)
+
+    def get_orders(self, page=1, limit=100):
+        """
+        Fetches one page of the account's orders, newest first.
+        Corresponds to: /v1/accounts/{account_id}/orders
+        """
+        endpoint = f'/accounts/{self._account_number}/orders'
+        return self._get(endpoint, params={'page': page, 'limit': limit, 'includeTags': 'true'})
+
+    def get_account_history(self, page=1, limit=100, start_date=None):
+        """
+        Fetches one page of account activity (trades, option events, cash movements), newest first.
+        Pass start_date to skip events before that day.
+        Corresponds to: /v1/accounts/{account_id}/history
+        """
+        endpoint = f'/accounts/{self._account_number}/history'
+        params = {'page': page, 'limit': limit}
+        if start_date:
+            params['start'] = start_date.strftime('%Y-%m-%d')
+        return self._get(endpoint, params=params)
+
+    def modify_order(self, order_id, changes):
+        """
+        Changes the type, duration or price of an open order.
+        Corresponds to: PUT /v1/accounts/{account_id}/orders/{order_id}
+        """
+        endpoint = f'/accounts/{self._account_number}/orders/{order_id}'
+        return self._put(endpoint, payload=changes)
+
 # --- Helper Function ---
 def get_api_for_current_user():
-    # ... (This function is unchanged) ...
+    # Clients are cheap to build: connections live in the shared transport pool.
     if current_user.is_authenticated and current_user.tradier_api_key:
         return TradierAPI(
             api_key=current_user.tradier_api_key,
@@ -0,0 +1,76 @@
+import os
+import threading
+
+from .market_cache import MemoryBackend
+
+# The only user fields a logged-in request needs. The password hash is left in
+# Mongo; login reads the full document itself.
+USER_FIELDS = {'username': 1, 'email': 1, 'tradier_api_key': 1, 'tradier_account_number': 1, 'linked_accounts': 1}
+
+
+class UserCache:
+    """
+    Per-worker cache of the user documents behind Flask-Login sessions.
+
+    load_user runs on every authenticated request, including the small JSON
+    calls from custom.js, so the projected user document is kept in memory for
+    a short TTL. Updates made through this worker invalidate the entry at once;
+    other workers pick up the change when their entry expires.
+    """
+    DEFAULTS = {
+        'USER_CACHE_ENABLED': True,
+        'USER_CACHE_TTL': 30,
+        'USER_CACHE_MAX_ENTRIES': 1024,
+    }
+
+    def __init__(self, app=None):
+        self._settings = dict(self.DEFAULTS)
+        self._users = MemoryBackend(self._settings['USER_CACHE_MAX_ENTRIES'])
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, default in self.DEFAULTS.items():
+            value = os.environ.get(key, default)
+            if isinstance(default, bool) and isinstance(value, str):
+                value = value.lower() in ('1', 'true', 'yes')
+            app.config.setdefault(key, type(default)(value))
+            self._settings[key] = app.config[key]
+        self._users = MemoryBackend(self._settings['USER_CACHE_MAX_ENTRIES'])
+
+    def _count(self, event):
+        with self._stats_lock:
+            self._stats[event] += 1
+
+    def get_or_fetch(self, user_id, fetch):
+        """
+        Returns the user document for user_id, calling fetch() on a miss.
+
+        Missing users (None) are not cached, so a deleted account is rejected
+        on its next request.
+        """
+        if not self._settings['USER_CACHE_ENABLED']:
+            return fetch()
+        user_data, status = self._users.get(user_id)
+        if status == 'hit':
+            self._count('hits')
+            return user_data
+        self._count('misses')
+        user_data = fetch()
+        if user_data is not None:
+            self._users.set(user_id, user_data, self._settings['USER_CACHE_TTL'])
+        return user_data
+
+    def invalidate(self, user_id):
+        """Drops a user's cached document after it changes in Mongo."""
+        self._users.delete(user_id)
+        self._count('invalidations')
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats, entries=len(self._users))
+
+
+user_cache = UserCache()
@@ -36,6 +36,9 @@ document.addEventListener('DOMContentLoaded', function () {
         },
         getStrikes(symbol, expiration) {
             return this.fetch(`/get_strikes/${symbol}/${expiration}`);
+        },
+        getOrder(jobId) {
+            return this.fetch(`/orders/${jobId}`);
         }
     };
 
@@ -102,6 +105,29 @@ document.addEventListener('DOMContentLoaded', function () {
         form.init();
     });
 
+    // --- Status polling for queued orders ---
+    // Quick checks until the order reaches Tradier, slow ones while it rests, none once final.
+    const ORDER_POLL_MS = 2000;
+    const RESTING_POLL_MS = 30000;
+    const RESTING_STATUSES = ['open', 'partially_filled'];
+    document.querySelectorAll('tr[data-order-job][data-final="false"]').forEach(row => {
+        const poll = async () => {
+            const job = await api.getOrder(row.dataset.orderJob);
+            if (job.error && !job.status) {
+                setTimeout(poll, RESTING_POLL_MS);
+                return;
+            }
+            row.querySelector('.order-status').textContent = job.error ? `${job.status} (${job.error})` : job.status;
+            row.querySelector('.order-broker-id').textContent = job.broker_order_id || '';
+            if (job.final) {
+                row.dataset.final = 'true';
+                return;
+            }
+            setTimeout(poll, RESTING_STATUSES.includes(job.status) ? RESTING_POLL_MS : ORDER_POLL_MS);
+        };
+        setTimeout(poll, ORDER_POLL_MS);
+    });
+
     // --- Script to reinitialize MDB components on tab change ---
     const tradeTabLinks = document.querySelectorAll('#trade-tabs a[data-mdb-tab-init]');
     tradeTabLinks.forEach(tab => {
@@ -1,6 +1,8 @@
 from flask import render_template, redirect, url_for, flash, Blueprint, request, jsonify
-from flask_login import login_required
+from flask_login import login_required, current_user
 from app.services.tradier_api import get_api_for_current_user
+from app.services.strikes import strike_ladders
+from app.services.order_queue import order_queue
 from app.trade.forms import StockOrderForm, OptionOrderForm, VerticalSpreadForm, IronCondorForm
 from .trade_manager import (
     StockTradeHandler, OptionTradeHandler,
@@ -9,19 +11,30 @@ from .trade_manager import (
 
 trade = Blueprint('trade', __name__)
 
+
+def _wants_json():
+    return request.accept_mimetypes.best_match(['application/json', 'text/html']) == 'application/json'
+
+
 def handle_trade_request(form, handler_class):
     """
     Handles the trade request process for a given form and handler.
     """
     api = get_api_for_current_user()
     if not api:
+        if _wants_json():
+            return jsonify({'error': 'API client not available. Check profile.'}), 400
         flash('Cannot place order. Please check your API credentials in your profile.', 'danger')
         return redirect(url_for('trade.trading_page'))
 
     if form.validate_on_submit():
         handler = handler_class(api, form)
-        handler.execute_trade()
+        job_id = handler.execute_trade()
+        if _wants_json():
+            return jsonify(order_id=job_id, status_url=url_for('trade.order_status', job_id=job_id)), 202
     else:
+        if _wants_json():
+            return jsonify({'error': 'Form validation failed.', 'errors': form.errors}), 400
         flash(f"{handler_class.form_name} form validation failed. Errors: {form.errors}", 'danger')
 
     return redirect(url_for('trade.trading_page'))
@@ -42,7 +55,20 @@ def trading_page():
             if submit_key in request.form:
                 return handle_trade_request(form, handler)
 
-    return render_template('trade/trade.html', title='Trade', **{f'{key.split("_")[1]}_form': form_tuple[0] for key, form_tuple in forms.items()})
+    return render_template('trade/trade.html', title='Trade', recent_orders=order_queue.recent(current_user.id),
+                           **{f'{key.split("_")[1]}_form': form_tuple[0] for key, form_tuple in forms.items()})
+
+
+@trade.route('/orders/<string:job_id>')
+@login_required
+def order_status(job_id):
+    api = get_api_for_current_user()
+    if api:
+        order_queue.refresh(api, job_id, current_user.id)
+    job = order_queue.get(job_id, current_user.id)
+    if job is None:
+        return jsonify({'error': f'Order {job_id} not found.'}), 404
+    return jsonify(job)
 
 
 @trade.route('/get_expirations/<string:symbol>')
@@ -58,6 +84,8 @@ def get_expirations(symbol):
         # Ensure dates are always returned as a list
         if not isinstance(dates, list):
             dates = [dates]
+        # Warm the strike ladders the user is most likely to pick next.
+        strike_ladders.prefetch(api, symbol, dates)
         return jsonify(dates=dates)
     else:
         # Provide a more specific error message
@@ -71,15 +99,9 @@ def get_strikes(symbol, expiration):
     if not api:
         return jsonify({'error': 'API client not available.'}), 400
 
-    data = api.get_option_chain(symbol.upper(), expiration)
-    if data and data.get('options') and data['options'].get('option'):
-        options_list = data['options']['option']
-        # Ensure options_list is always a list
-        if not isinstance(options_list, list):
-            options_list = [options_list]
-        # Use a set for efficiency and to automatically handle duplicates
-        strikes = sorted(list(set(opt['strike'] for opt in options_list)))
-        return jsonify(strikes=strikes)
+    strikes = strike_ladders.get(api, symbol, expiration)
+    if strikes is not None and len(strikes):
+        return jsonify(strikes=strikes.tolist())
     else:
         # Provide a more specific error message
-        return jsonify({'error': f'Could not fetch strike prices for {symbol} on {expiration}. Response: {data}'}), 404
\ No newline at end of file
+        return jsonify({'error': f'Could not fetch strike prices for {symbol} on {expiration}.'}), 404
\ No newline at end of file
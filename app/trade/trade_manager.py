@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 from flask import flash
+from flask_login import current_user
+from app.services.order_queue import order_queue
 from .utils import generate_occ_symbol
 
 class TradeHandler(ABC):
@@ -12,11 +14,18 @@ class TradeHandler(ABC):
 
     def execute_trade(self):
         """
-        Executes the trade and handles the response.
+        Queues the trade for background submission.
+
+        The order is placed and followed by the order queue, so the request
+        returns without waiting on the broker.
+
+        Returns:
+            str: The order job id.
         """
         payload = self._create_payload()
-        response = self.api.place_order(payload)
-        self._process_response(response)
+        job_id = order_queue.submit(self.api, payload, current_user.id, self.form_name)
+        flash(f"{self.form_name} queued (order {job_id}). Its status is shown under Recent Orders.", 'info')
+        return job_id
 
     @abstractmethod
     def _create_payload(self):
@@ -25,19 +34,6 @@ class TradeHandler(ABC):
         """
         pass
 
-    def _process_response(self, response):
-        """
-        Processes the API response and flashes messages.
-        """
-        if response and response.get('order'):
-            status = response['order'].get('status', 'N/A')
-            flash(f"{self.form_name} submitted! Status: {status}", 'success')
-        elif response and response.get('errors'):
-            errors = ', '.join(response['errors']['error'])
-            flash(f"{self.form_name} failed: {errors}", 'danger')
-        else:
-            flash(f'An unknown error occurred while placing the {self.form_name.lower()}.', 'danger')
-
     @property
     @abstractmethod
     def form_name(self):
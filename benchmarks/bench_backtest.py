@@ -0,0 +1,80 @@
+"""
+Backtest engine: incremental levels vs. recomputing find_support_resistance
+for every simulated day, and one process vs. a process pool across symbols.
+
+Bars are a synthetic random walk per symbol (--years of weekdays).
+
+    python -m benchmarks.bench_backtest --symbols 16 --years 10 --workers 1 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.autotrade.backtest import DEFAULT_PARAMS, backtest_symbol, run_backtest
+from app.research.levels import extrema_flags, find_support_resistance, levels_between
+
+
+def synthetic_series(symbols, years, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64('2000-01-03'), np.datetime64('2000-01-03') + 365 * years, dtype='datetime64[D]')
+    dates = dates[np.is_busday(dates)]
+    series = {}
+    for i in range(symbols):
+        start = rng.uniform(20, 400)
+        closes = np.round(start * np.exp(np.cumsum(rng.normal(0.0002, 0.018, len(dates)))), 2)
+        series[f"SYM{i}"] = (dates, closes)
+    return series
+
+
+def level_passes(dates, closes):
+    """Levels for every entry day, recomputed from scratch and incrementally."""
+    params = DEFAULT_PARAMS
+    starts = np.searchsorted(dates, dates - np.timedelta64(params['lookback_days'], 'D'))
+    entries = range(0, len(dates), params['every'])
+
+    started = time.perf_counter()
+    full = [find_support_resistance(pd.DataFrame({'Close': closes[starts[e]:e + 1]})) for e in entries]
+    full_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    flags = extrema_flags(closes, params['window'])
+    incremental = [levels_between(closes, *flags, starts[e], e + 1, params['window']) for e in entries]
+    incremental_s = time.perf_counter() - started
+    assert full == incremental
+    return len(entries), full_s, incremental_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=16)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    series = synthetic_series(args.symbols, args.years)
+    dates, closes = next(iter(series.values()))
+    days, full_s, incremental_s = level_passes(dates, closes)
+    print(f"levels for {days} entry days of one symbol: recompute {full_s * 1000:.0f} ms, "
+          f"incremental {incremental_s * 1000:.0f} ms ({full_s / incremental_s:.0f}x)")
+
+    reference = None
+    for workers in args.workers:
+        started = time.perf_counter()
+        result = run_backtest(series, workers=workers)
+        elapsed = time.perf_counter() - started
+        summary = result['summary']
+        reference = reference or summary
+        assert summary == reference
+        print(f"{args.symbols} symbols x {args.years}y, {workers} worker(s): {elapsed:.2f}s, "
+              f"{summary['trades']} trades, win rate {summary['win_rate']}, P&L ${summary['total_pnl']:.0f}")
+
+    symbol, (dates, closes) = next(iter(series.items()))
+    started = time.perf_counter()
+    backtest_symbol(symbol, dates, closes)
+    print(f"one symbol in-process: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
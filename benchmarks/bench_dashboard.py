@@ -0,0 +1,55 @@
+"""
+Wall-clock comparison of the sequential and concurrent dashboard fetch paths.
+
+    python -m benchmarks.bench_dashboard --latency 0.1 --rounds 10
+"""
+import argparse
+import statistics
+import time
+
+from app.services.tradier_api import TradierAPI
+from app.main.dashboard_data import fetch_dashboard_data, extract_positions, extract_quotes_map
+from benchmarks.tradier_stub import TradierStub, StubConfig
+
+
+def fetch_sequential(api):
+    """The pre-fan-out dashboard: balances, then positions, then quotes."""
+    balances = api.get_account_balances()
+    positions = extract_positions(api.get_positions())
+    quotes = extract_quotes_map(api.get_quotes([p['symbol'] for p in positions]))
+    return balances, positions, quotes
+
+
+def _time(func, rounds):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.1, help='per-call stub latency in seconds')
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    with TradierStub(StubConfig(latency=args.latency)) as stub:
+        api = TradierAPI('bench-key', 'VA000000', base_url=stub.base_url)
+        fetch_sequential(api)  # warm the connection pool
+        sequential = _time(lambda: fetch_sequential(api), args.rounds)
+        concurrent = _time(lambda: fetch_dashboard_data(api), args.rounds)
+
+        stub.config.latency['balances'] = args.latency * 50
+        degraded = fetch_dashboard_data(api, call_timeout=args.latency * 5)
+
+    print(f"stub latency per call : {args.latency * 1000:.0f} ms")
+    print(f"sequential (median)   : {sequential * 1000:.1f} ms")
+    print(f"concurrent (median)   : {concurrent * 1000:.1f} ms")
+    print(f"speedup               : {sequential / concurrent:.2f}x")
+    print(f"slow balances call    : timed_out={degraded['timed_out']}, positions={len(degraded['positions'])}")
+
+
+if __name__ == '__main__':
+    main()
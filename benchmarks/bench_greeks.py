@@ -0,0 +1,94 @@
+"""
+Implied volatility and greeks for a whole chain: one vectorized pass vs. a
+per-contract Python loop, and a repeat call served from the snapshot cache.
+
+    python -m benchmarks.bench_greeks --strikes 100 1000 5000
+"""
+import argparse
+import math
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.greeks import chain_analytics, years_to_expiry
+from app.services.option_chain import OptionChain
+from benchmarks.tradier_stub import _chain
+
+RATE = 0.045
+
+
+def _cdf(x):
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+
+def scalar_greeks(option_type, spot, strike, years, price):
+    """One contract at a time: Newton/bisection for IV, then the greeks."""
+    is_call = option_type == 'call'
+    discount = math.exp(-RATE * years)
+    if not (max((spot - strike * discount) if is_call else (strike * discount - spot), 0) < price
+            < (spot if is_call else strike * discount)):
+        return None
+    lo, hi, vol = 1e-4, 5.0, 0.3
+    for _ in range(50):
+        root_t = math.sqrt(years)
+        d1 = (math.log(spot / strike) + (RATE + vol * vol / 2) * years) / (vol * root_t)
+        d2 = d1 - vol * root_t
+        call = spot * _cdf(d1) - strike * discount * _cdf(d2)
+        diff = (call if is_call else call - spot + strike * discount) - price
+        vega = spot * math.exp(-d1 * d1 / 2) / math.sqrt(2 * math.pi) * root_t
+        if abs(diff) < 1e-6:
+            break
+        hi, lo = (vol, lo) if diff > 0 else (hi, vol)
+        step = vol - diff / vega if vega else hi
+        vol = step if lo < step < hi else (lo + hi) / 2
+    pdf = math.exp(-d1 * d1 / 2) / math.sqrt(2 * math.pi)
+    return {
+        'iv': vol,
+        'delta': _cdf(d1) if is_call else _cdf(d1) - 1,
+        'gamma': pdf / (spot * vol * root_t),
+        'vega': spot * pdf * root_t / 100,
+    }
+
+
+def timed_ms(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--strikes', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    chain_analytics._settings.update(GREEKS_RISK_FREE_RATE=RATE, GREEKS_DIVIDEND_YIELD=0.0)
+
+    expiration = (date.today() + timedelta(days=45)).isoformat()
+    print(f"{'contracts':>10} {'loop ms':>9} {'vector ms':>10} {'cached ms':>10} {'speedup':>8} {'max |d delta|':>14} {'priced':>7}")
+    for strikes in args.strikes:
+        chain = OptionChain.from_response(_chain('BENCH', expiration, strikes))
+        spot = float(np.median(chain.columns['strike']))
+        years = years_to_expiry(expiration)
+        prices = chain.mid.tolist()
+        rows = list(zip(chain.option_types.tolist(), chain.columns['strike'].tolist(), prices))
+
+        loop_ms, loop = timed_ms(lambda: [scalar_greeks(t, spot, k, years, p) for t, k, p in rows], 1)
+
+        def cold():
+            chain_analytics._cache.clear()
+            return chain_analytics.compute(chain, spot, expiration)
+        vector_ms, result = timed_ms(cold, args.repeat)
+        cached_ms, _ = timed_ms(lambda: chain_analytics.compute(chain, spot, expiration), args.repeat)
+
+        priced = sum(1 for r in loop if r)
+        reference = np.array([r['delta'] if r else np.nan for r in loop])
+        both = ~np.isnan(reference) & ~np.isnan(result['delta'])
+        error = np.max(np.abs(reference[both] - result['delta'][both])) if both.any() else float('nan')
+        print(f"{len(chain):>10} {loop_ms:>9.1f} {vector_ms:>10.2f} {cached_ms:>10.3f} {loop_ms / vector_ms:>7.0f}x "
+              f"{error:>14.2e} {priced:>7}")
+
+
+if __name__ == '__main__':
+    main()
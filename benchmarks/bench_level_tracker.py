@@ -0,0 +1,57 @@
+"""
+Daily level refresh: find_support_resistance over the whole lookback vs. a
+LevelTracker that takes one new bar per day, replayed over --years of a
+synthetic random walk. Every day's levels are checked to be identical.
+
+    python -m benchmarks.bench_level_tracker --years 10 --period 185
+"""
+import argparse
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from app.research.level_tracker import LevelTracker
+from app.services.history_store import BAR_DTYPE, bars_to_frame
+from app.research.levels import find_support_resistance
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--period', type=int, default=185)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    dates = np.arange(np.datetime64('2010-01-04'), np.datetime64('2010-01-04') + 365 * args.years, dtype='datetime64[D]')
+    dates = dates[np.is_busday(dates)]
+    bars = np.zeros(len(dates), dtype=BAR_DTYPE)
+    bars['date'] = dates
+    bars['close'] = np.round(150 * np.exp(np.cumsum(rng.normal(0, 0.018, len(dates)))), 2)
+    days = dates.astype(object)
+
+    # What the pages did before: frame the lookback, then rescan it.
+    full = []
+    started = time.perf_counter()
+    for day in days:
+        window = bars[(bars['date'] >= np.datetime64(day - timedelta(days=args.period))) & (bars['date'] <= np.datetime64(day))]
+        full.append(find_support_resistance(bars_to_frame(window)))
+    full_s = time.perf_counter() - started
+
+    tracker, incremental = LevelTracker(10, args.period), []
+    started = time.perf_counter()
+    for day, close in zip(days, bars['close'].tolist()):
+        tracker.update(day, close)
+        incremental.append(tracker.levels())
+    incremental_s = time.perf_counter() - started
+
+    assert all(list(map(float, a[0])) == list(map(float, b[0])) and list(map(float, a[1])) == list(map(float, b[1]))
+               for a, b in zip(full, incremental))
+    print(f"{len(days)} daily refreshes over a {args.period}-day lookback, identical levels")
+    print(f"  rescan:      {full_s / len(days) * 1e6:8.0f} us/day")
+    print(f"  incremental: {incremental_s / len(days) * 1e6:8.0f} us/day ({full_s / incremental_s:.0f}x), "
+          f"state {len(tracker.days)} bars + {len(tracker.supports) + len(tracker.resistances)} levels")
+
+
+if __name__ == '__main__':
+    main()
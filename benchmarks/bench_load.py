@@ -0,0 +1,149 @@
+"""
+End-to-end load test: Locust (benchmarks/locustfile.py) against the real app
+under gunicorn, with Tradier replaced by the local stub.
+
+Each run's Locust CSVs and HTML report go to --results/load/, named by
+commit and time, and one line per run is appended to
+--results/load_history.jsonl. The run is then compared with the last one
+recorded with the same settings, per endpoint; with --max-regression the
+script exits non-zero when any endpoint's p95 grew by more than that
+percentage, or its throughput fell by more, so it can gate a change.
+
+Needs MongoDB at MONGO_URI (default mongodb://127.0.0.1:27017/bench) and
+locust (pip install -r benchmarks/requirements.txt).
+
+    python -m benchmarks.bench_load --users 20 --duration 60 --latency 0.05 --max-regression 15
+"""
+import argparse
+import csv
+import json
+import os
+import signal
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.bench_serving import ROOT, start_server
+from benchmarks.tradier_stub import TradierStub, StubConfig
+
+
+def git_commit():
+    """Short HEAD commit, with '+dirty' when tracked files have uncommitted changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('+dirty' if dirty else '')
+
+
+def read_stats(path):
+    """Per-endpoint numbers from Locust's <prefix>_stats.csv, keyed by request name."""
+    endpoints = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            name = row['Name'] if row['Name'] == 'Aggregated' else f"{row['Type']} {row['Name']}"
+            endpoints[name] = {
+                'requests': int(row['Request Count']),
+                'failures': int(row['Failure Count']),
+                'rps': round(float(row['Requests/s']), 2),
+                'p50': float(row['50%'] or 0),
+                'p95': float(row['95%'] or 0),
+                'p99': float(row['99%'] or 0),
+            }
+    return endpoints
+
+
+def previous_run(history_path, settings):
+    """The last recorded run with the same settings, or None."""
+    if not os.path.exists(history_path):
+        return None
+    last = None
+    with open(history_path) as f:
+        for line in f:
+            run = json.loads(line)
+            if run['settings'] == settings:
+                last = run
+    return last
+
+
+def _change(new, old):
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(current, baseline, max_regression):
+    """Prints per-endpoint deltas against the baseline run; returns the endpoints that regressed."""
+    print(f"\nvs {baseline['commit']} ({baseline['date']}):")
+    print(f"{'endpoint':<44} {'req/s':>8} {'Δ%':>6} {'p95 ms':>8} {'Δ%':>6} {'fail':>5}")
+    regressed = []
+    for name, stats in current['endpoints'].items():
+        old = baseline['endpoints'].get(name)
+        if old is None:
+            print(f"{name:<44} {stats['rps']:>8.1f} {'new':>6} {stats['p95']:>8.0f} {'':>6} {stats['failures']:>5}")
+            continue
+        rps, p95 = _change(stats['rps'], old['rps']), _change(stats['p95'], old['p95'])
+        flag = ''
+        if max_regression is not None and (p95 > max_regression or -rps > max_regression):
+            regressed.append(name)
+            flag = '  <- regression'
+        print(f"{name:<44} {stats['rps']:>8.1f} {rps:>+6.0f} {stats['p95']:>8.0f} {p95:>+6.0f} "
+              f"{stats['failures']:>5}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--spawn-rate', type=float, default=5)
+    parser.add_argument('--duration', type=int, default=60, help='seconds')
+    parser.add_argument('--config', default='gthread:2:8', help='gunicorn worker_class:workers:threads')
+    parser.add_argument('--latency', type=float, default=0.05, help='stub latency per Tradier call (s)')
+    parser.add_argument('--strikes', type=int, default=80, help='strikes per stub option chain')
+    parser.add_argument('--positions', type=int, default=5, help='positions in the stub account')
+    parser.add_argument('--padding', type=int, default=0, help='filler bytes per record in stub list payloads')
+    parser.add_argument('--results', default=os.path.join(ROOT, 'benchmarks', 'results'))
+    parser.add_argument('--max-regression', type=float, default=None,
+                        help='fail if p95 rises or req/s falls by more than this %% against the last run')
+    args = parser.parse_args()
+
+    settings = {'users': args.users, 'spawn_rate': args.spawn_rate, 'duration': args.duration,
+                'config': args.config, 'latency': args.latency, 'strikes': args.strikes,
+                'positions': args.positions, 'padding': args.padding}
+    commit = git_commit()
+    started_at = datetime.now(timezone.utc)
+    os.makedirs(os.path.join(args.results, 'load'), exist_ok=True)
+    prefix = os.path.join(args.results, 'load', f"{started_at:%Y%m%dT%H%M%S}-{commit}")
+    history_path = os.path.join(args.results, 'load_history.jsonl')
+    baseline = previous_run(history_path, settings)
+
+    worker_class, workers, threads = args.config.split(':')
+    config = StubConfig(latency=args.latency, positions=args.positions, strikes=args.strikes, padding=args.padding)
+    with TradierStub(config) as stub:
+        proc, base = start_server(worker_class, int(workers), int(threads), True, stub.base_url)
+        try:
+            subprocess.run([sys.executable, '-m', 'locust', '-f', os.path.join(ROOT, 'benchmarks', 'locustfile.py'),
+                            '--headless', '--users', str(args.users), '--spawn-rate', str(args.spawn_rate),
+                            '--run-time', f"{args.duration}s", '--host', base, '--csv', prefix,
+                            '--html', f"{prefix}.html", '--only-summary', '--exit-code-on-error', '0'],
+                           cwd=ROOT, check=True)
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=60)
+
+    run = {'commit': commit, 'date': started_at.isoformat(timespec='seconds'), 'settings': settings,
+           'cores': os.cpu_count(), 'stub_calls': dict(config.calls), 'endpoints': read_stats(f"{prefix}_stats.csv")}
+    with open(history_path, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f"\nresults: {prefix}_stats.csv, {prefix}.html; history: {history_path}")
+
+    if baseline is None:
+        print("no earlier run with these settings to compare against")
+        return
+    if compare(run, baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
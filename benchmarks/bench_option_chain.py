@@ -0,0 +1,67 @@
+"""
+OptionChain indexed lookups vs. scanning Tradier's list of option dicts.
+
+    python -m benchmarks.bench_option_chain --strikes 100 1000 10000
+"""
+import argparse
+import time
+
+from app.services.option_chain import OptionChain
+from benchmarks.tradier_stub import _chain
+
+
+def scan_nearest_strike(options, price, option_type):
+    return min((o['strike'] for o in options if o['option_type'] == option_type), key=lambda s: abs(s - price))
+
+
+def scan_nearest_delta(options, target, option_type):
+    target = -abs(target) if option_type == 'put' else abs(target)
+    return min((o for o in options if o['option_type'] == option_type), key=lambda o: abs(o['greeks']['delta'] - target))
+
+
+def scan_between(options, low, high):
+    return [o for o in options if low <= o['strike'] <= high]
+
+
+def per_call_us(func, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--strikes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'contracts':>10} {'lookup':>14} {'dict scan us':>13} {'indexed us':>11} {'speedup':>8}")
+    for strikes in args.strikes:
+        payload = _chain('BENCH', '2030-01-18', strikes, greeks=True)
+        options = payload['options']['option']
+        started = time.perf_counter()
+        chain = OptionChain.from_response(payload)
+        build_ms = (time.perf_counter() - started) * 1000
+        mid = options[len(options) // 2]['strike']
+
+        assert scan_nearest_strike(options, mid + 0.3, 'put') == chain.nearest_strike(mid + 0.3, 'put')
+        assert scan_nearest_delta(options, 0.20, 'put')['symbol'] == chain.nearest_delta(0.20, 'put')['symbol']
+        assert len(scan_between(options, mid - 5, mid + 5)) == len(chain.between(mid - 5, mid + 5))
+
+        cases = [
+            ('nearest strike', lambda: scan_nearest_strike(options, mid + 0.3, 'put'),
+             lambda: chain.nearest_strike(mid + 0.3, 'put')),
+            ('0.20-delta put', lambda: scan_nearest_delta(options, 0.20, 'put'),
+             lambda: chain.nearest_delta(0.20, 'put')),
+            ('strikes A..B', lambda: scan_between(options, mid - 5, mid + 5),
+             lambda: chain.between(mid - 5, mid + 5)),
+        ]
+        for name, scan, indexed in cases:
+            scan_us, indexed_us = per_call_us(scan, args.calls), per_call_us(indexed, args.calls)
+            print(f"{len(options):>10} {name:>14} {scan_us:>13.1f} {indexed_us:>11.1f} {scan_us / indexed_us:>7.1f}x")
+        print(f"{len(options):>10} {'index build':>14} {'':>13} {build_ms:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Dashboard position valuation: the per-position Python loop vs. the Portfolio engine.
+
+For each account size the report shows the time to value every position from
+a quote map (the dashboard request) and the time to apply one streamed quote
+and read the KPIs again, which the engine does by touching only the changed rows.
+
+    python -m benchmarks.bench_portfolio --positions 1000 5000 10000
+"""
+import argparse
+import random
+import time
+
+from app.services.portfolio import Portfolio
+
+
+def loop_valuation(positions, quotes_map):
+    """The dashboard loop before the engine: no option multiplier, totals summed afterwards."""
+    rows = []
+    for pos in positions:
+        pos = dict(pos)
+        quantity = float(pos['quantity'])
+        cost_basis = float(pos['cost_basis'])
+        last_price = quotes_map.get(pos['symbol'], 0)
+        pos['last_price'] = last_price
+        pos['market_value'] = quantity * float(last_price)
+        pos['unrealized_pl'] = pos['market_value'] - cost_basis
+        pos['unit_cost'] = cost_basis / quantity if quantity > 0 else 0
+        rows.append(pos)
+    return rows, sum(p['market_value'] for p in rows)
+
+
+def synthetic_account(count, seed=3):
+    rng = random.Random(seed)
+    positions, quotes = [], {}
+    for i in range(count):
+        if i % 2:
+            strike = (50 + i // 2 % 400) * 1000
+            symbol = f"OPT{chr(65 + i // 800 % 26)}{260116 + i % 28:06d}{'CP'[i // 2 % 2]}{strike:08d}"
+            price = round(rng.uniform(0.05, 20), 2)
+        else:
+            symbol = f"S{i}"
+            price = round(rng.uniform(5, 500), 2)
+        quantity = rng.choice([-5, -1, 1, 2, 10, 100])
+        positions.append({'symbol': symbol, 'quantity': quantity, 'cost_basis': quantity * price * 0.95,
+                          'date_acquired': '2026-01-02T00:00:00.000Z', 'id': i})
+        quotes[symbol] = price
+    return positions, quotes
+
+
+def best_of(func, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--positions', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--ticks', type=int, default=1000, help='single-symbol updates to time')
+    args = parser.parse_args()
+
+    print(f"{'positions':>9} {'loop ms':>8} {'engine ms':>10} {'rows ms':>8} "
+          f"{'loop tick ms':>13} {'engine tick us':>15}")
+    for count in args.positions:
+        positions, quotes = synthetic_account(count)
+        loop_s, _ = best_of(lambda: loop_valuation(positions, quotes), args.rounds)
+        engine_s, portfolio = best_of(lambda: Portfolio(positions).apply_quotes(quotes), args.rounds)
+        rows_s, _ = best_of(portfolio.rows, args.rounds)
+
+        # Without the engine a new quote means revaluing the whole account.
+        symbol = positions[count // 2]['symbol']
+        loop_tick_s, _ = best_of(lambda: loop_valuation(positions, dict(quotes, **{symbol: quotes[symbol] + 0.01})),
+                                 args.rounds)
+        rng = random.Random(count)
+        symbols = [p['symbol'] for p in positions]
+        updates = [{rng.choice(symbols): round(rng.uniform(1, 500), 2)} for _ in range(args.ticks)]
+        started = time.perf_counter()
+        for update in updates:
+            portfolio.update_prices(update)
+            portfolio.kpis()
+        tick_s = (time.perf_counter() - started) / args.ticks
+
+        full = Portfolio(positions).apply_quotes(dict(quotes, **{s: p for u in updates for s, p in u.items()}))
+        assert abs(full.kpis()['market_value'] - portfolio.kpis()['market_value']) < 1e-6 * max(1, abs(full.total_value))
+        print(f"{count:>9} {loop_s * 1000:>8.2f} {engine_s * 1000:>10.2f} {rows_s * 1000:>8.2f} "
+              f"{loop_tick_s * 1000:>13.2f} {tick_s * 1e6:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
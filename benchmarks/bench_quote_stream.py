@@ -0,0 +1,95 @@
+"""
+Quote streaming fan-out: many subscribers on one upstream stream from the Tradier stub.
+
+Subscribers watch random subsets of a symbol pool and drain their feeds for
+--duration seconds. The report shows how many upstream connections served
+them, and how the per-symbol coalescing turns the upstream event rate into at
+most one message per subscriber per flush interval. A last check reads a few
+messages from /quotes/stream itself.
+
+    python -m benchmarks.bench_quote_stream --subscribers 500 --symbols 50 --tick-rate 1000
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+from benchmarks.tradier_stub import TradierStub, StubConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, default=500)
+    parser.add_argument('--symbols', type=int, default=50, help='size of the symbol pool')
+    parser.add_argument('--per-subscriber', type=int, default=8, help='symbols each subscriber watches')
+    parser.add_argument('--tick-rate', type=float, default=1000, help='upstream events per second')
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    with TradierStub(StubConfig(tick_rate=args.tick_rate)) as stub:
+        os.environ.setdefault('MONGO_URI', 'mongodb://127.0.0.1:27017/bench')
+        os.environ.setdefault('SECRET_KEY', 'bench')
+        os.environ['TRADIER_BASE_URL'] = stub.base_url
+        os.environ['QUOTE_STREAM_API_KEY'] = 'bench-key'
+        os.environ['QUOTE_STREAM_MAX_CLIENTS'] = str(args.subscribers + 1)
+        from app import create_app
+        from app.services.quote_stream import quote_hub
+        
+        app = create_app()
+        pool = [f"SYM{i}" for i in range(args.symbols)]
+        rng = random.Random(1)
+
+        subscriptions = [quote_hub.subscribe(rng.sample(pool, args.per_subscriber))
+                         for _ in range(args.subscribers)]
+        received = [[0, 0] for _ in subscriptions]
+        stop_at = time.monotonic() + args.duration
+
+        def drain(i, subscription):
+            while time.monotonic() < stop_at:
+                ticks = subscription.next_batch(0.5)
+                if ticks:
+                    received[i][0] += 1
+                    received[i][1] += len(ticks)
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=drain, args=(i, s)) for i, s in enumerate(subscriptions)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+        for subscription in subscriptions:
+            quote_hub.unsubscribe(subscription)
+
+        stats = quote_hub.stats()
+        messages = sum(m for m, _ in received)
+        ticks = sum(t for _, t in received)
+        events = stub.config.calls.get('stream_events', 0)
+        watched_events = events * args.per_subscriber / args.symbols * args.subscribers
+        print(f"subscribers              : {args.subscribers} watching {args.per_subscriber} of {args.symbols} symbols")
+        print(f"upstream sessions/streams: {stub.config.calls.get('stream_session', 0)} / {stub.config.calls.get('stream', 0)}")
+        print(f"upstream events          : {events} ({events / elapsed:.0f}/s)")
+        print(f"messages per subscriber  : {messages / args.subscribers / elapsed:.1f}/s "
+              f"(flush every {quote_hub.settings['QUOTE_STREAM_FLUSH_INTERVAL'] * 1000:.0f} ms)")
+        print(f"ticks delivered          : {ticks} vs {watched_events:.0f} uncoalesced "
+              f"({watched_events / max(ticks, 1):.1f}x fewer)")
+        print(f"hub                      : {stats}")
+
+        app.config.update(LOGIN_DISABLED=True)
+        response = app.test_client().get('/quotes/stream?symbols=SYM1,SYM2', buffered=False)
+        frames = []
+        for chunk in response.response:
+            text = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if text.startswith('data: '):
+                frames.append(json.loads(text[6:]))
+            if len(frames) == 3:
+                break
+        response.close()
+        print(f"/quotes/stream           : {response.status_code} {response.mimetype}, "
+              f"symbols in first frames {sorted({s for f in frames for s in f})}")
+
+
+if __name__ == '__main__':
+    main()
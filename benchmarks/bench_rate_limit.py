@@ -0,0 +1,96 @@
+"""
+Tradier call discipline: single-flight coalescing and the per-key rate limiter.
+
+1. Coalescing: --threads callers ask for the same option chain at the same
+   moment, --rounds times with a cold market cache, with coalescing off and on.
+   The report shows how many chain requests reached the stub.
+2. Rate limiting: --calls quote requests for distinct symbols on one key
+   against a stub that allows --stub-limit calls per minute, with the limiter
+   off and on. Without it the overflow comes back as 429s; with it calls
+   queue up to TRADIER_RATE_MAX_WAIT and the rest are rejected locally.
+
+    python -m benchmarks.bench_rate_limit --threads 50 --calls 120 --stub-limit 60
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+from app.services.http_transport import transport
+from app.services.market_cache import market_cache
+from app.services.rate_limit import rate_limiter, single_flight
+from app.services.tradier_api import TradierAPI
+from benchmarks.tradier_stub import TradierStub, StubConfig
+
+
+def configure(base_url, **config):
+    app = Flask('bench')
+    app.config.update(TRADIER_BASE_URL=base_url, TRADIER_MAX_RETRIES=0, **config)
+    for extension in (transport, market_cache, rate_limiter, single_flight):
+        extension.init_app(app)
+
+
+def coalescing(args, enabled):
+    with TradierStub(StubConfig(latency=args.latency)) as stub:
+        configure(stub.base_url, TRADIER_COALESCE_ENABLED=enabled, TRADIER_RATE_LIMIT_ENABLED=False)
+        before = single_flight.stats()
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            market_cache.clear()
+            barrier = threading.Barrier(args.threads)
+
+            def call(i):
+                barrier.wait()
+                return TradierAPI(f"key-{i}", 'VA000000').get_option_chain('SPY', '2026-11-20')
+
+            with ThreadPoolExecutor(args.threads) as pool:
+                results = list(pool.map(call, range(args.threads)))
+            assert all(r and r.get('options') for r in results)
+        elapsed = time.perf_counter() - started
+        stats = single_flight.stats()
+        print(f"coalescing {'on ' if enabled else 'off'}: {args.rounds * args.threads} calls -> "
+              f"{stub.config.calls.get('chains', 0)} upstream, {stats['coalesced'] - before['coalesced']} shared, "
+              f"{elapsed / args.rounds * 1000:.0f} ms per round")
+
+
+def limiting(args, enabled):
+    with TradierStub(StubConfig(rate_limit=args.stub_limit)) as stub:
+        configure(stub.base_url, TRADIER_COALESCE_ENABLED=True, TRADIER_RATE_LIMIT_ENABLED=enabled,
+                  TRADIER_RATE_LIMIT_MARKET=args.stub_limit, TRADIER_RATE_BURST=args.burst,
+                  TRADIER_RATE_MAX_WAIT=args.max_wait)
+        api = TradierAPI('bench-key', 'VA000000')
+        before = rate_limiter.stats().get('market', {})
+        started = time.perf_counter()
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda i: api.get_quotes([f"S{i}"], fresh=True), range(args.calls)))
+        elapsed = time.perf_counter() - started
+        ok = sum(1 for r in results if r and r.get('quotes'))
+        after = rate_limiter.stats().get('market', {})
+        market = {name: after.get(name, 0) - before.get(name, 0) for name in after}
+        print(f"limiter {'on ' if enabled else 'off'}: {ok}/{args.calls} ok in {elapsed:.1f}s, "
+              f"{stub.config.calls.get('rate_limited', 0)} upstream 429s, "
+              f"{market.get('queued', 0)} queued ({market.get('queued_seconds', 0):.1f}s), "
+              f"{market.get('rejected', 0)} rejected locally")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.1, help='stub latency per call (s)')
+    parser.add_argument('--calls', type=int, default=120)
+    parser.add_argument('--stub-limit', type=int, default=60, help='calls per minute the stub allows')
+    parser.add_argument('--burst', type=int, default=20)
+    parser.add_argument('--max-wait', type=float, default=2.0)
+    args = parser.parse_args()
+
+    for enabled in (False, True):
+        coalescing(args, enabled)
+    for enabled in (False, True):
+        limiting(args, enabled)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Research chart: the original plotly Figure pipeline vs. the array-built spec.
+
+Reports build time and JSON payload size for several series lengths. The
+reference pipeline needs the plotly package; without it only the new
+pipeline is measured.
+
+    python -m benchmarks.bench_research_chart --bars 252 2520 10000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.research.batch_scan import analyze_closes
+from app.research.charts import chart_json, level_chart, lttb
+
+
+def plotly_figure_json(symbol, period, frame, support, resistance):
+    """The research page's chart before the array pipeline, shapes added twice included."""
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=frame['Date'], y=frame['Close'], mode='lines',
+                             name=f'{symbol} Close Price', line=dict(color='blue')))
+    for s_level in support:
+        fig.add_shape(type="line", x0=frame['Date'].min(), y0=s_level, x1=frame['Date'].max(), y1=s_level,
+                      line=dict(color="green", width=2, dash="dash"), name='Support')
+    for r_level in resistance:
+        fig.add_shape(type="line", x0=frame['Date'].min(), y0=r_level, x1=frame['Date'].max(), y1=r_level,
+                      line=dict(color="red", width=2, dash="dash"), name='Resistance')
+    fig.update_layout(
+        title=f'{symbol} Support & Resistance Levels (Last {period} Days)',
+        xaxis_title='Date', yaxis_title='Price (USD)', template='plotly_white', height=800,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        shapes=[dict(type='line', yref='y', y0=s, x0=frame['Date'].min(), x1=frame['Date'].max(),
+                     line=dict(color='green', dash='dash')) for s in support] +
+               [dict(type='line', yref='y', y0=r, x0=frame['Date'].min(), x1=frame['Date'].max(),
+                     line=dict(color='red', dash='dash')) for r in resistance]
+    )
+    return pio.to_json(fig)
+
+
+def synthetic_series(bars, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64('2000-01-03') + np.arange(bars).astype('timedelta64[D]')
+    close = 100 + np.cumsum(rng.normal(0, 1.5, bars))
+    return dates, np.maximum(close, 1.0)
+
+
+def best_of(func, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bars', type=int, nargs='+', default=[252, 2520, 10000])
+    parser.add_argument('--max-points', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        import pandas as pd
+        import plotly  # noqa: F401
+        have_plotly = True
+    except ImportError:
+        have_plotly = False
+        print("plotly is not installed; measuring the array pipeline only.\n")
+
+    print(f"{'bars':>7} {'figure ms':>10} {'figure KB':>10} {'spec ms':>8} {'spec KB':>8} {'points':>7}")
+    for bars in args.bars:
+        dates, close = synthetic_series(bars)
+        analysis = analyze_closes('BENCH', close)
+        support, resistance = analysis['support'], analysis['resistance']
+
+        spec_s, spec = best_of(lambda: chart_json(level_chart('BENCH', bars, dates, close, support, resistance,
+                                                              max_points=args.max_points)), args.rounds)
+        points = len(json.loads(spec)['data'][0]['x'])
+        kept = lttb(dates.astype('int64'), close, args.max_points)
+        assert kept[0] == 0 and kept[-1] == bars - 1 and np.all(np.diff(kept) > 0)
+
+        figure_ms = figure_kb = '-'
+        if have_plotly:
+            frame = pd.DataFrame({'Date': dates.astype('datetime64[ns]'), 'Close': close})
+            figure_s, figure = best_of(lambda: plotly_figure_json('BENCH', bars, frame, support, resistance), args.rounds)
+            figure_ms, figure_kb = f"{figure_s * 1000:.1f}", f"{len(figure) / 1024:.1f}"
+        print(f"{bars:>7} {figure_ms:>10} {figure_kb:>10} {spec_s * 1000:>8.1f} {len(spec) / 1024:>8.1f} {points:>7}")
+
+
+if __name__ == '__main__':
+    main()
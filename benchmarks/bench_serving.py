@@ -0,0 +1,153 @@
+"""
+Load test for gunicorn worker settings, against the real app and a stubbed Tradier.
+
+Each configuration (worker class, workers, threads) is started as its own
+gunicorn master from gunicorn.conf.py. A closed loop of --clients drives a mix of
+/dashboard, /get_strikes and /research for --duration seconds. The report gives
+throughput, latency percentiles, errors, and the PSS (proportional set size) of
+the whole process tree, which shows how much memory preloading saves.
+
+    python -m benchmarks.bench_serving --configs gthread:2:8 gthread:4:4 sync:4:1 --latency 0.05
+"""
+import argparse
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from benchmarks.tradier_stub import TradierStub, StubConfig
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (weight, method, path, form data)
+MIX = [
+    (5, 'GET', '/get_strikes/SPY/2030-01-18', None),
+    (3, 'GET', '/dashboard', None),
+    (1, 'POST', '/research', {'symbol': 'SPY', 'period': '185'}),
+]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def tree_pss_mb(pid):
+    """PSS of a process and its children in MB, or None where /proc is unavailable."""
+    total = 0
+    for p in [pid] + _children(pid):
+        try:
+            with open(f"/proc/{p}/smaps_rollup") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('Pss:'))
+        except (OSError, StopIteration):
+            return None
+    return total / 1024
+
+
+def start_server(worker_class, workers, threads, preload, stub_url):
+    port = _free_port()
+    env = dict(os.environ, TRADIER_BASE_URL=stub_url, GUNICORN_BIND=f"127.0.0.1:{port}",
+               GUNICORN_WORKER_CLASS=worker_class, GUNICORN_WORKERS=str(workers),
+               GUNICORN_THREADS=str(threads), GUNICORN_PRELOAD='true' if preload else 'false',
+               GUNICORN_ACCESSLOG='', GUNICORN_LOGLEVEL='warning')
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+                             'benchmarks.serving_app:app'], cwd=ROOT, env=env)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline and proc.poll() is None:
+        if len(_children(proc.pid)) >= workers:
+            try:
+                requests.get(base + '/', timeout=30)
+                return proc, base
+            except requests.RequestException:
+                pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError('gunicorn did not start')
+
+
+def drive(base, clients, duration):
+    """Closed-loop load: each client sends its next request as soon as the last one returns."""
+    weighted = [(method, path, data) for weight, method, path, data in MIX for _ in range(weight)]
+    samples, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(seed):
+        rng = random.Random(seed)
+        session = requests.Session()
+        local = []
+        while time.monotonic() < stop_at:
+            method, path, data = rng.choice(weighted)
+            started = time.perf_counter()
+            try:
+                ok = session.request(method, base + path, data=data, timeout=30).status_code < 400
+            except requests.RequestException:
+                ok = False
+            local.append(time.perf_counter() - started)
+            if not ok:
+                with lock:
+                    errors[0] += 1
+        session.close()
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, errors[0]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', nargs='+', default=['gthread:2:8', 'gthread:2:4', 'sync:4:1'],
+                        help='worker_class:workers:threads')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--latency', type=float, default=0.05, help='stub latency per Tradier call (s)')
+    parser.add_argument('--no-preload', action='store_true', help='also run each config without preload_app')
+    args = parser.parse_args()
+
+    runs = [(c, True) for c in args.configs] + ([(c, False) for c in args.configs] if args.no_preload else [])
+    print(f"cores={os.cpu_count()} clients={args.clients} duration={args.duration}s stub latency={args.latency * 1000:.0f} ms")
+    print(f"{'config':>14} {'preload':>7} {'req/s':>7} {'p50 ms':>7} {'p99 ms':>7} {'errors':>6} {'PSS MB':>7}")
+    with TradierStub(StubConfig(latency=args.latency)) as stub:
+        for config, preload in runs:
+            worker_class, workers, threads = config.split(':')
+            proc, base = start_server(worker_class, int(workers), int(threads), preload, stub.base_url)
+            try:
+                drive(base, args.clients, min(2.0, args.duration))  # warm caches and imports
+                pss = tree_pss_mb(proc.pid)
+                samples, errors = drive(base, args.clients, args.duration)
+            finally:
+                proc.send_signal(signal.SIGTERM)
+                proc.wait(timeout=60)
+            pss = f"{pss:.0f}" if pss is not None else '-'
+            print(f"{config:>14} {'yes' if preload else 'no':>7} {len(samples) / args.duration:>7.1f} "
+                  f"{percentile(samples, 50) * 1000:>7.1f} {percentile(samples, 99) * 1000:>7.1f} {errors:>6} {pss:>7}")
+
+
+if __name__ == '__main__':
+    main()
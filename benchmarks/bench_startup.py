@@ -0,0 +1,90 @@
+"""
+Import-time profile and cold start of create_app().
+
+Each run is a fresh interpreter. The report shows median wall time and RSS
+after create_app(), which heavy libraries were already loaded, and the slowest
+top-level imports from `python -X importtime`. Use --first-request to also
+time the first /research analysis.
+
+    python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('numpy', 'pandas', 'plotly', 'matplotlib', 'yfinance')
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+app = create_app()
+elapsed = time.perf_counter() - started
+rss = next(int(l.split()[1]) for l in open('/proc/self/status') if l.startswith('VmRSS:'))
+result = {'create_app': elapsed, 'rss_kb': rss, 'loaded': [m for m in %r if m in sys.modules]}
+if %r:
+    from benchmarks.tradier_stub import TradierStub, StubConfig
+    from app.services.tradier_api import TradierAPI
+    from app.research import routes as research_routes
+    with TradierStub(StubConfig()) as stub:
+        research_routes.get_api_for_current_user = lambda: TradierAPI('k', 'A', base_url=stub.base_url)
+        app.config.update(LOGIN_DISABLED=True, WTF_CSRF_ENABLED=False, HISTORY_STORE_ENABLED=False)
+        started = time.perf_counter()
+        app.test_client().post('/research', data={'symbol': 'SPY', 'period': '185'})
+        result['first_research'] = time.perf_counter() - started
+print(json.dumps(result))
+'''
+
+
+def _env():
+    return dict(os.environ, MONGO_URI=os.environ.get('MONGO_URI', 'mongodb://127.0.0.1:27017/bench'),
+                SECRET_KEY=os.environ.get('SECRET_KEY', 'bench'), PYTHONPATH=ROOT)
+
+
+def probe(first_request):
+    out = subprocess.run([sys.executable, '-c', PROBE % (HEAVY, first_request)], cwd=ROOT, env=_env(),
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def import_profile(top):
+    """(cumulative us, module) for the slowest top-level imports under create_app()."""
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'from app import create_app; create_app()'],
+                         cwd=ROOT, env=_env(), capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--first-request', action='store_true')
+    args = parser.parse_args()
+
+    results = [probe(args.first_request) for _ in range(args.runs)]
+    print(f"create_app() cold start : {statistics.median(r['create_app'] for r in results) * 1000:.0f} ms "
+          f"(median of {args.runs})")
+    print(f"RSS after create_app()  : {statistics.median(r['rss_kb'] for r in results) / 1024:.1f} MB")
+    print(f"heavy modules loaded    : {', '.join(results[-1]['loaded']) or 'none'}")
+    if args.first_request:
+        print(f"first /research request: {statistics.median(r['first_research'] for r in results) * 1000:.0f} ms")
+
+    print(f"\n{'cumulative ms':>14}  top-level import")
+    for cumulative, name in import_profile(args.top):
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+
+if __name__ == '__main__':
+    main()
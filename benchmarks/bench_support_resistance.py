@@ -0,0 +1,93 @@
+"""
+Speed and parity check for find_support_resistance against the original loop.
+
+    python -m benchmarks.bench_support_resistance --sizes 32 252 1000 10000 20000
+
+Exits non-zero if the vectorized levels ever differ from the reference, or if
+a speedup falls below --min-speedup (for sizes of at least 1,000 bars).
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.research.routes import find_support_resistance
+
+
+def reference_find_support_resistance(data, window=10):
+    """The original per-bar .iloc implementation, kept as the parity oracle."""
+    all_support, all_resistance = [], []
+    if data.empty: return [], []
+    for i in range(window, len(data) - window):
+        window_slice = data['Close'].iloc[i-window:i+window+1]
+        current_price = data['Close'].iloc[i]
+        price = current_price.item() if isinstance(current_price, (pd.Series, pd.DataFrame)) else current_price
+        if np.isclose(price, window_slice.min()): all_support.append(price)
+        if np.isclose(price, window_slice.max()): all_resistance.append(price)
+    unique_supports = sorted(list(set(all_support)))
+    unique_resistances = sorted(list(set(all_resistance)))
+    plotted_support = []
+    if unique_supports:
+        last_support = unique_supports[0]
+        plotted_support.append(last_support)
+        for level in unique_supports:
+            required_diff = 1 if last_support < 100 else 2
+            if abs(level - last_support) >= required_diff:
+                plotted_support.append(level)
+                last_support = level
+    plotted_resistance = []
+    if unique_resistances:
+        last_resistance = unique_resistances[0]
+        plotted_resistance.append(last_resistance)
+        for level in unique_resistances:
+            required_diff = 1 if last_resistance < 100 else 2
+            if abs(level - last_resistance) >= required_diff:
+                plotted_resistance.append(level)
+                last_resistance = level
+    return plotted_support, plotted_resistance
+
+
+def make_bars(n, seed=0, start=150.0):
+    """A random walk of daily closes, rounded to cents like Tradier's history."""
+    rng = np.random.default_rng(seed)
+    closes = np.round(np.maximum(start + np.cumsum(rng.normal(0, 1.5, n)), 1.0), 2)
+    return pd.DataFrame({'Date': pd.date_range('2000-01-03', periods=n, freq='B'), 'Close': closes})
+
+
+def best_of(func, data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[32, 94, 252, 1000, 5000, 10000, 20000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seeds', type=int, default=5, help='random series checked for parity per size')
+    parser.add_argument('--min-speedup', type=float, default=10.0)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'bars':>8} {'loop ms':>10} {'numpy ms':>10} {'speedup':>9}  parity")
+    for n in args.sizes:
+        parity = all(
+            reference_find_support_resistance(make_bars(n, seed)) == find_support_resistance(make_bars(n, seed))
+            for seed in range(args.seeds)
+        )
+        data = make_bars(n)
+        loop = best_of(reference_find_support_resistance, data, args.repeat)
+        vectorized = best_of(find_support_resistance, data, args.repeat)
+        speedup = loop / vectorized
+        print(f"{n:>8} {loop * 1000:>10.2f} {vectorized * 1000:>10.3f} {speedup:>8.1f}x  {'ok' if parity else 'MISMATCH'}")
+        failed |= not parity or (n >= 1000 and speedup < args.min_speedup)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Load test for the cached user loader: Mongo user lookups and /get_strikes latency
+with USER_CACHE_ENABLED off and on.
+
+Needs a reachable MongoDB (MONGO_URI, or --mongo-uri); Tradier is the local stub.
+A throwaway user is created for the run and removed afterwards. Requests run
+in-process through the test client; with more than one thread they share a GIL,
+so the tail at high --concurrency reflects thread scheduling as much as Mongo.
+
+    python -m benchmarks.bench_user_loader --requests 500 --concurrency 1
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bson.objectid import ObjectId
+from pymongo import monitoring
+
+from benchmarks.tradier_stub import TradierStub, StubConfig
+
+
+class FindCounter(monitoring.CommandListener):
+    """Counts find commands sent to the users collection."""
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name == 'find' and event.command.get('find') == 'users':
+            with self._lock:
+                self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(app, user_id, requests, concurrency):
+    local = threading.local()
+
+    def one(_):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+            with local.client.session_transaction() as session:
+                session['_user_id'] = user_id
+                session['_fresh'] = True
+        started = time.perf_counter()
+        response = local.client.get('/get_strikes/SPY/2030-01-18')
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mongo-uri', default=os.environ.get('MONGO_URI'))
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=1)
+    args = parser.parse_args()
+    if not args.mongo_uri:
+        parser.error('a MongoDB URI is required (MONGO_URI or --mongo-uri)')
+
+    counter = FindCounter()
+    monitoring.register(counter)
+
+    with TradierStub(StubConfig(latency=0.0)) as stub:
+        os.environ.update(MONGO_URI=args.mongo_uri, TRADIER_BASE_URL=stub.base_url,
+                          SECRET_KEY=os.environ.get('SECRET_KEY', 'bench'))
+        from app import create_app, mongo
+        from app.services.user_cache import user_cache
+
+        app = create_app()
+        with app.app_context():
+            user_id = str(mongo.db.users.insert_one({
+                'username': 'bench-user', 'email': 'bench@example.invalid', 'password': 'x',
+                'tradier_api_key': 'bench-key', 'tradier_account_number': 'VA000000'
+            }).inserted_id)
+        try:
+            results = {}
+            for enabled in (False, True):
+                app.config['USER_CACHE_ENABLED'] = enabled
+                user_cache.init_app(app)
+                run(app, user_id, args.concurrency, args.concurrency)  # warm up
+                before = counter.count
+                samples = run(app, user_id, args.requests, args.concurrency)
+                results[enabled] = (counter.count - before, samples)
+        finally:
+            with app.app_context():
+                mongo.db.users.delete_one({'_id': ObjectId(user_id)})
+
+    print(f"{args.requests} x GET /get_strikes, concurrency {args.concurrency}")
+    print(f"{'user cache':>10} {'user finds':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for enabled, (finds, samples) in results.items():
+        print(f"{'on' if enabled else 'off':>10} {finds:>11} {statistics.median(samples) * 1000:>8.2f} "
+              f"{percentile(samples, 99) * 1000:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
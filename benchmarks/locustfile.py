@@ -0,0 +1,59 @@
+"""
+Locust load test for the main pages, against benchmarks.serving_app (login off,
+Tradier stubbed). Each user opens with the expirations call the trade page
+makes, then mixes:
+
+    /get_strikes   strike ladders as the trade form's selects change
+    /dashboard     account KPIs and positions
+    /research      support/resistance analysis (POST)
+    /trade         the trade page, and stock orders submitted as JSON
+
+Run it through benchmarks.bench_load, which starts the stub and gunicorn and
+keeps the results, or directly against a running server:
+
+    locust -f benchmarks/locustfile.py --headless -u 20 -r 5 -t 60s --host http://127.0.0.1:8000
+"""
+import random
+
+from locust import HttpUser, between, task
+
+SYMBOLS = ['SPY', 'QQQ', 'IWM', 'AAPL', 'MSFT']
+PERIODS = [32, 94, 185, 366]
+
+
+class DashboardUser(HttpUser):
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        self.expirations = {}
+        for symbol in SYMBOLS:
+            response = self.client.get(f"/get_expirations/{symbol}", name='/get_expirations/[symbol]')
+            if response.ok:
+                self.expirations[symbol] = response.json()['dates'][:6]
+
+    @task(5)
+    def get_strikes(self):
+        symbol = random.choice(list(self.expirations) or SYMBOLS)
+        expiration = random.choice(self.expirations.get(symbol) or ['2030-01-18'])
+        self.client.get(f"/get_strikes/{symbol}/{expiration}", name='/get_strikes/[symbol]/[expiration]')
+
+    @task(3)
+    def dashboard(self):
+        self.client.get('/dashboard')
+
+    @task(2)
+    def research(self):
+        self.client.post('/research', data={'symbol': random.choice(SYMBOLS), 'period': random.choice(PERIODS)})
+
+    @task(1)
+    def trade_page(self):
+        self.client.get('/trade')
+
+    @task(1)
+    def stock_order(self):
+        form = {'stock-symbol': random.choice(SYMBOLS), 'stock-side': 'buy', 'stock-quantity': 1,
+                'stock-order_type': 'market', 'stock-duration': 'day', 'submit_stock': 'Submit'}
+        with self.client.post('/trade', data=form, headers={'Accept': 'application/json'},
+                              catch_response=True) as response:
+            if response.status_code != 202:
+                response.failure(f"order not queued: {response.status_code}")
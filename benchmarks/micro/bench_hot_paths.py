@@ -0,0 +1,46 @@
+"""
+Microbenchmarks for the code on the research and trade request paths.
+
+    pytest benchmarks/micro
+    pytest benchmarks/micro --benchmark-compare-fail=median:10%   # fail on a >10% slowdown vs the last run
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.research.charts import chart_json, level_chart
+from app.research.levels import find_support_resistance
+from app.trade.utils import generate_occ_symbol
+
+# Bars in the research page's periods (32 to 366 days) and a long backfill.
+SIZES = [32, 252, 2520]
+
+
+def random_walk(bars, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64('2020-01-02') + np.arange(bars).astype('timedelta64[D]')
+    close = np.round(np.maximum(150 * np.exp(np.cumsum(rng.normal(0, 0.018, bars))), 1.0), 2)
+    return dates, close
+
+
+@pytest.mark.parametrize('bars', SIZES)
+def bench_find_support_resistance(benchmark, bars):
+    _, close = random_walk(bars)
+    frame = pd.DataFrame({'Close': close})
+    benchmark(find_support_resistance, frame)
+
+
+def bench_generate_occ_symbol(benchmark):
+    # One iron condor: four legs per order.
+    legs = [('SPY', '2030-01-18', 'put', 390), ('SPY', '2030-01-18', 'put', 395.5),
+            ('SPY', '2030-01-18', 'call', 450), ('SPY', '2030-01-18', 'call', 455.5)]
+    symbols = benchmark(lambda: [generate_occ_symbol(*leg) for leg in legs])
+    assert symbols[1] == 'SPY300118P00395500'
+
+
+@pytest.mark.parametrize('bars', SIZES)
+def bench_chart_json(benchmark, bars):
+    dates, close = random_walk(bars)
+    support, resistance = find_support_resistance(pd.DataFrame({'Close': close}))
+    payload = benchmark(lambda: chart_json(level_chart('BENCH', bars, dates, close, support, resistance)))
+    assert payload.startswith('{"data":')
@@ -0,0 +1,42 @@
+"""
+WSGI entry point for load tests: the real app, with login switched off and every
+blueprint talking to the Tradier stub at TRADIER_BASE_URL.
+
+    gunicorn --config gunicorn.conf.py benchmarks.serving_app:app
+"""
+import os
+
+os.environ.setdefault('MONGO_URI', 'mongodb://127.0.0.1:27017/bench')
+os.environ.setdefault('SECRET_KEY', 'bench')
+os.environ.setdefault('HISTORY_STORE_ENABLED', 'false')
+
+from flask_login import AnonymousUserMixin
+
+from app import create_app, login_manager
+from app.services.tradier_api import TradierAPI
+from app.main import routes as main_routes
+from app.research import routes as research_routes
+from app.trade import routes as trade_routes
+from app.autotrade import routes as autotrade_routes
+
+app = create_app()
+app.config.update(LOGIN_DISABLED=True, WTF_CSRF_ENABLED=False)
+
+
+class BenchUser(AnonymousUserMixin):
+    """Stands in for a logged-in user where routes key data (orders, history) by user id."""
+    id = '0' * 24
+    accounts = []
+    tradier_api_key = 'bench-key'
+    tradier_account_number = 'VA000000'
+
+
+login_manager.anonymous_user = BenchUser
+
+
+def _stub_api():
+    return TradierAPI('bench-key', 'VA000000')
+
+
+for module in (main_routes, research_routes, trade_routes, autotrade_routes):
+    module.get_api_for_current_user = _stub_api
@@ -0,0 +1,405 @@
+"""
+A local fake of the Tradier REST API for benchmarks and load tests.
+
+Run it standalone with `python -m benchmarks.tradier_stub --port 8099 --latency 0.05`
+and point the app at it with TRADIER_BASE_URL=http://127.0.0.1:8099/v1.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+def _history(symbol, start, end):
+    days, price, current = [], 100.0 + (sum(map(ord, symbol)) % 200), start
+    while current <= end:
+        if current.weekday() < 5:
+            price = max(price + ((current.toordinal() * 7919) % 11 - 5) * 0.37, 1.0)
+            days.append({'date': current.isoformat(), 'open': price, 'high': price + 1,
+                         'low': price - 1, 'close': round(price, 2), 'volume': 1000000})
+        current += timedelta(days=1)
+    return {'history': {'day': days} if days else 'null'}
+
+
+OCC_PATTERN = re.compile(r'^([A-Z]+)(\d{6})([CP])(\d{8})$')
+
+
+def _base_price(symbol):
+    return 100.0 + (sum(map(ord, symbol)) % 200)
+
+
+def _quote(symbol):
+    occ = OCC_PATTERN.match(symbol)
+    if not occ:
+        last = _base_price(symbol)
+        return {'symbol': symbol, 'last': last, 'bid': last - 0.05, 'ask': last + 0.05}
+    underlying, strike = occ.group(1), int(occ.group(4)) / 1000
+    base = _base_price(underlying)
+    intrinsic = max(base - strike, 0) if occ.group(3) == 'C' else max(strike - base, 0)
+    value = intrinsic + 3 * math.exp(-abs(base - strike) / (0.05 * base))
+    return {'symbol': symbol, 'last': round(value, 2), 'bid': round(value * 0.95, 2), 'ask': round(value * 1.05 + 0.01, 2)}
+
+
+def _quotes(symbols):
+    quotes = [_quote(s) for s in symbols]
+    return {'quotes': {'quote': quotes[0] if len(quotes) == 1 else quotes}}
+
+
+def _expirations(count=12):
+    first = date.today() + timedelta(days=(4 - date.today().weekday()) % 7)
+    return {'expirations': {'date': [(first + timedelta(weeks=i)).isoformat() for i in range(count)]}}
+
+
+def _pad(body, key, item, padding):
+    """Adds `padding` bytes of description to every record under body[key][item], like Tradier's wider payloads."""
+    records = body[key][item] if isinstance(body.get(key), dict) else []
+    for record in records if isinstance(records, list) else [records]:
+        record['description'] = 'x' * padding
+    return body
+
+
+# Route -> where its records live in the response body.
+PADDED = {'history': ('history', 'day'), 'chains': ('options', 'option'),
+          'positions': ('positions', 'position'), 'orders': ('orders', 'order')}
+
+
+def _chain(symbol, expiration, strikes, greeks=False):
+    base = 100.0 + (sum(map(ord, symbol)) % 200)
+    options = []
+    for i in range(strikes):
+        strike = round(base - strikes / 2 + i, 1)
+        for option_type in ('call', 'put'):
+            intrinsic = max(base - strike, 0) if option_type == 'call' else max(strike - base, 0)
+            moneyness = (base - strike) / (0.1 * base)
+            call_delta = round(1 / (1 + 2.718281828 ** (-1.7 * moneyness)), 4)
+            option = {
+                'symbol': f"{symbol}{expiration.replace('-', '')[2:]}{option_type[0].upper()}{int(strike * 1000):08d}",
+                'underlying': symbol, 'strike': strike, 'option_type': option_type,
+                'expiration_date': expiration, 'bid': round(intrinsic + 0.50, 2),
+                'ask': round(intrinsic + 0.60, 2), 'last': round(intrinsic + 0.55, 2),
+                'open_interest': 100 + i, 'volume': 10 + i
+            }
+            if greeks:
+                delta = call_delta if option_type == 'call' else round(call_delta - 1, 4)
+                option['greeks'] = {'delta': delta, 'gamma': 0.02, 'theta': -0.05, 'vega': 0.1, 'mid_iv': 0.3}
+            options.append(option)
+    return {'options': {'option': options}}
+
+
+def _positions(count):
+    positions = [{'symbol': f"SYM{i}", 'quantity': 10.0, 'cost_basis': 1000.0,
+                  'date_acquired': '2024-01-02T00:00:00.000Z', 'id': i} for i in range(count)]
+    if not positions:
+        return {'positions': 'null'}
+    return {'positions': {'position': positions[0] if count == 1 else positions}}
+
+
+def _order_page(count, page, limit, open_orders=0):
+    """Page `page` of `count` past orders, newest (highest id) first; the newest `open_orders` are still open."""
+    newest = datetime(2026, 1, 2, 15, 30, tzinfo=timezone.utc)
+    orders = []
+    for order_id in range(count - (page - 1) * limit, max(count - page * limit, 0), -1):
+        created = newest - timedelta(hours=6 * (count - order_id))
+        price = round(_base_price(f"SYM{order_id % 50}") + order_id % 7 * 0.25, 2)
+        orders.append({
+            'id': order_id, 'type': 'limit', 'symbol': f"SYM{order_id % 50}",
+            'side': 'buy' if order_id % 3 else 'sell', 'quantity': float(order_id % 9 + 1),
+            'status': 'open' if count - order_id < open_orders else 'filled', 'duration': 'day',
+            'price': price, 'avg_fill_price': price, 'exec_quantity': float(order_id % 9 + 1),
+            'create_date': created.isoformat().replace('+00:00', 'Z'),
+            'transaction_date': created.isoformat().replace('+00:00', 'Z'), 'class': 'equity'
+        })
+    if not orders:
+        return {'orders': 'null'}
+    return {'orders': {'order': orders[0] if len(orders) == 1 else orders}}
+
+
+def _account_history(count, page, limit, start=None):
+    """Trade events for the filled orders of _order_page, newest first, from `start` on."""
+    events = []
+    for order in _order_list(_order_page(count, 1, count)['orders']):
+        when = order['create_date'][:10]
+        if order['status'] != 'filled' or (start and when < start):
+            continue
+        quantity = order['quantity'] if order['side'] == 'buy' else -order['quantity']
+        events.append({'amount': round(-quantity * order['price'], 2), 'date': f"{when}T00:00:00Z", 'type': 'trade',
+                       'trade': {'commission': 0.0, 'description': f"{order['symbol']} {order['side']}",
+                                 'price': order['price'], 'quantity': quantity, 'symbol': order['symbol'],
+                                 'trade_type': 'Equity'}})
+    events = events[(page - 1) * limit:page * limit]
+    if not events:
+        return {'history': 'null'}
+    return {'history': {'event': events[0] if len(events) == 1 else events}}
+
+
+def _order_list(orders):
+    if not isinstance(orders, dict):
+        return []
+    return orders['order'] if isinstance(orders['order'], list) else [orders['order']]
+
+
+def _stream_events(symbols, rng):
+    """Endless quote/trade events in the shape of Tradier's market streaming API."""
+    prices = {s: _base_price(s) for s in symbols}
+    while True:
+        symbol = rng.choice(symbols)
+        prices[symbol] = max(prices[symbol] + rng.choice((-0.01, 0.01)) * rng.randint(1, 5), 0.01)
+        price = round(prices[symbol], 2)
+        if rng.random() < 0.5:
+            yield {'type': 'quote', 'symbol': symbol, 'bid': round(price - 0.01, 2), 'bidsz': rng.randint(1, 50),
+                   'ask': round(price + 0.01, 2), 'asksz': rng.randint(1, 50),
+                   'biddate': str(int(time.time() * 1000)), 'askdate': str(int(time.time() * 1000))}
+        else:
+            yield {'type': 'trade', 'symbol': symbol, 'exch': 'Q', 'price': f"{price:.2f}",
+                   'size': str(rng.randint(1, 500)), 'cvol': str(rng.randint(1, 10 ** 6)),
+                   'date': str(int(time.time() * 1000)), 'last': f"{price:.2f}"}
+
+
+class StubConfig:
+    """
+    Latency (seconds) per route name, payload sizes (positions, strikes per
+    chain, listed expirations, and `padding` bytes of filler per record in
+    chains, positions, orders and history), how many status checks an
+    order takes to fill, how many events per second the market stream sends,
+    how many past orders (the newest `open_orders` of them still open) the
+    account's order list and history hold, and the GET calls allowed per token
+    per minute (0 = unlimited) before X-Ratelimit-* headers turn into 429s.
+    """
+    def __init__(self, latency=0.0, positions=5, strikes=80, fill_after=2, tick_rate=50, past_orders=0,
+                 open_orders=0, rate_limit=0, expirations=12, padding=0):
+        self.latency = {'default': latency}
+        self.positions = positions
+        self.strikes = strikes
+        self.expirations = expirations
+        self.padding = padding
+        self.fill_after = fill_after
+        self.tick_rate = tick_rate
+        self.past_orders = past_orders
+        self.open_orders = open_orders
+        self.rate_limit = rate_limit
+        self.windows = {}
+        self.orders = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def take(self, token):
+        """Counts a call against the token's one-minute window; returns (used, expiry in epoch ms)."""
+        with self._lock:
+            now = time.time()
+            start, used = self.windows.get(token, (now, 0))
+            if now - start >= 60:
+                start, used = now, 0
+            self.windows[token] = (start, used + 1)
+            return used + 1, int((start + 60) * 1000)
+
+    def delay(self, route):
+        return self.latency.get(route, self.latency['default'])
+
+    def record(self, route):
+        with self._lock:
+            self.calls[route] = self.calls.get(route, 0) + 1
+
+
+def _make_handler(config):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Send headers and body in one segment; avoids delayed-ACK stalls on keep-alive.
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def _route(self, path, query):
+            route, body = self._build(path, query)
+            if route in PADDED and config.padding:
+                _pad(body, *PADDED[route], config.padding)
+            return route, body
+
+        def _build(self, path, query):
+            parts = path.rstrip('/').split('/')
+            if path.endswith('/markets/history'):
+                end = date.fromisoformat(query.get('end', [date.today().isoformat()])[0])
+                start = date.fromisoformat(query.get('start', [(end - timedelta(days=185)).isoformat()])[0])
+                return 'history', _history(query['symbol'][0], start, end)
+            if path.endswith('/markets/quotes'):
+                return 'quotes', _quotes(query['symbols'][0].split(','))
+            if path.endswith('/markets/options/expirations'):
+                return 'expirations', _expirations(config.expirations)
+            if path.endswith('/markets/options/strikes'):
+                chain = _chain(query['symbol'][0], query['expiration'][0], config.strikes)['options']['option']
+                return 'strikes', {'strikes': {'strike': sorted({o['strike'] for o in chain})}}
+            if path.endswith('/markets/options/chains'):
+                greeks = query.get('greeks', ['false'])[0] == 'true'
+                return 'chains', _chain(query['symbol'][0], query['expiration'][0], config.strikes, greeks)
+            if parts[-1] == 'balances':
+                return 'balances', {'balances': {'total_equity': 25000.0, 'total_cash': 5000.0,
+                                                 'unrealized_pl': 120.0, 'pnl': {'todays_pnl': 12.5}}}
+            if parts[-1] == 'positions':
+                return 'positions', _positions(config.positions)
+            if parts[-1] == 'orders':
+                page, limit = int(query.get('page', ['1'])[0]), int(query.get('limit', ['100'])[0])
+                return 'orders', _order_page(config.past_orders, page, limit, config.open_orders)
+            if parts[-1] == 'history':
+                page, limit = int(query.get('page', ['1'])[0]), int(query.get('limit', ['100'])[0])
+                return 'account_history', _account_history(config.past_orders, page, limit, query.get('start', [None])[0])
+            if len(parts) > 1 and parts[-2] == 'orders':
+                order_id = parts[-1]
+                with config._lock:
+                    checks = config.orders[order_id] = config.orders.get(order_id, 0) + 1
+                status = 'filled' if checks >= config.fill_after else 'open'
+                return 'order_status', {'order': {'id': order_id, 'status': status}}
+            return None, None
+
+        def _respond(self, query):
+            route, body = self._route(urlparse(self.path).path, query)
+            if route is None:
+                self.send_error(404)
+                return
+            headers, status = {}, 200
+            if config.rate_limit:
+                used, expiry = config.take(self.headers.get('Authorization'))
+                headers = {'X-Ratelimit-Allowed': config.rate_limit, 'X-Ratelimit-Used': min(used, config.rate_limit),
+                           'X-Ratelimit-Available': max(config.rate_limit - used, 0), 'X-Ratelimit-Expiry': expiry}
+                if used > config.rate_limit:
+                    config.record('rate_limited')
+                    self._send_json({'fault': {'faultstring': 'Rate limit exceeded'}}, 429, headers)
+                    return
+            config.record(route)
+            time.sleep(config.delay(route))
+            self._send_json(body, status, headers)
+
+        def _send_json(self, body, status=200, headers=None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, str(value))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._respond(parse_qs(urlparse(self.path).query))
+
+        def _stream(self, form):
+            """Writes newline-delimited events until the client disconnects."""
+            symbols = [s for s in form.get('symbols', [''])[0].split(',') if s]
+            if not symbols:
+                self.send_error(400)
+                return
+            config.record('stream')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            rng = random.Random(','.join(symbols))
+            try:
+                for event in _stream_events(symbols, rng):
+                    self.wfile.write(json.dumps(event).encode() + b'\n')
+                    self.wfile.flush()
+                    config.record('stream_events')
+                    time.sleep(1 / config.tick_rate)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            form = parse_qs(self.rfile.read(length).decode())
+            path = urlparse(self.path).path
+            if path.endswith('/orders'):
+                config.record('place_order')
+                time.sleep(config.delay('place_order'))
+                self._send_json({'order': {'id': int(time.time() * 1000), 'status': 'ok'}})
+            elif path.endswith('/markets/events/session'):
+                config.record('stream_session')
+                host, port = self.server.server_address[:2]
+                self._send_json({'stream': {'url': f"http://{host}:{port}/v1/markets/events",
+                                            'sessionid': f"stub-{int(time.time() * 1000)}"}})
+            elif path.endswith('/markets/events'):
+                self._stream(form)
+            else:
+                self.send_error(404)
+
+        def do_PUT(self):
+            length = int(self.headers.get('Content-Length', 0))
+            self.rfile.read(length)
+            config.record('modify_order')
+            time.sleep(config.delay('modify_order'))
+            self._send_json({'order': {'id': urlparse(self.path).path.rstrip('/').split('/')[-1], 'status': 'ok'}})
+
+        # Streaming clients hang up mid-write; that is how a stream ends.
+        def handle(self):
+            try:
+                super().handle()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def finish(self):
+            try:
+                super().finish()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class TradierStub:
+    """Runs the fake API on a background thread; usable as a context manager."""
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        self.config = config or StubConfig()
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self.config))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--route-latency', nargs='*', default=[], metavar='ROUTE=SECONDS',
+                        help='per-route latency, e.g. chains=0.2 history=0.1')
+    parser.add_argument('--positions', type=int, default=5)
+    parser.add_argument('--strikes', type=int, default=80)
+    parser.add_argument('--expirations', type=int, default=12)
+    parser.add_argument('--padding', type=int, default=0, help='filler bytes per record in list payloads')
+    parser.add_argument('--tick-rate', type=float, default=50, help='market stream events per second')
+    parser.add_argument('--past-orders', type=int, default=0, help='orders in the account history')
+    parser.add_argument('--rate-limit', type=int, default=0, help='GET calls per token per minute (0 = unlimited)')
+    args = parser.parse_args()
+    stub = TradierStub(StubConfig(args.latency, args.positions, args.strikes, tick_rate=args.tick_rate,
+                                  past_orders=args.past_orders, rate_limit=args.rate_limit,
+                                  expirations=args.expirations, padding=args.padding),
+                       args.host, args.port)
+    for item in args.route_latency:
+        route, seconds = item.split('=')
+        stub.config.latency[route] = float(seconds)
+    print(f"Fake Tradier API listening on {stub.base_url}")
+    stub._server.serve_forever()
@@ -0,0 +1,75 @@
+"""
+Gunicorn settings for serving the dashboard in production.
+
+    gunicorn --config gunicorn.conf.py run:app
+
+Every setting can be overridden from the environment (see below). The app is
+created once in the master (preload_app) and the heavy libraries are imported
+there too, so workers share that memory copy-on-write instead of each loading
+numpy and pandas on their own.
+
+Reloading:
+    kill -HUP <master>   restarts the workers gracefully with the *already loaded*
+                         code (config changes, leaked memory).
+    kill -USR2 <master>  starts a new master with fresh code; once it is serving,
+                         kill -QUIT the old master (its pid is in <pidfile>.oldbin).
+"""
+import gc
+import glob
+import importlib
+import multiprocessing
+import os
+import tempfile
+
+_cores = multiprocessing.cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+
+# Requests spend most of their time waiting on Tradier and Mongo, so a thread
+# per in-flight request on one process per core beats more sync processes.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', max(2, _cores)))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+
+# Slow upstream calls (large chains, history backfills) can hold a request for a while.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 90))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then; the jitter keeps them from restarting together.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+pidfile = os.environ.get('GUNICORN_PIDFILE')
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+# Each worker writes its metrics here and /metrics adds up every file, so a
+# scrape reports all workers whichever one answers. A fresh directory per master.
+if 'METRICS_DIR' not in os.environ:
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='tradier-metrics-')
+
+# Imported in the master before forking so workers inherit them.
+SHARED_MODULES = ('numpy', 'pandas')
+
+
+def on_starting(server):
+    # Files left by an earlier master's workers would be added to this one's counters.
+    for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], '*.json')):
+        os.remove(path)
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    for name in SHARED_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            server.log.warning(f"Could not preload {name}: {e}")
+    # Move everything loaded so far out of the collector's view, so the first
+    # collection in a worker does not touch (and copy) every shared page.
+    gc.freeze()
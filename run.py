@@ -1,8 +1,11 @@
+import os
 from app import create_app
 
 # The app instance is created by the factory function in app/__init__.py
 app = create_app()
 
 if __name__ == "__main__":
-    # Runs the app on port 5003 in debug mode for development
-    app.run(debug=True, port=5003)
\ No newline at end of file
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py).
+    # Set FLASK_DEBUG=1 for the debugger and reloader.
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+    app.run(debug=debug, port=int(os.environ.get('PORT', 5003)))
\ No newline at end of file